@@ -0,0 +1,585 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class compares many fields between two model files in one process.
+# Both files are opened once (by the model objects passed in), the common
+# fields are read in bulk and the 2D slice and zonal mean figures are rendered
+# by a bounded pool of local worker processes. Fields whose plots are up to
+# date in the plot directory's manifest are skipped.
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import multiprocessing
+import numpy
+
+import matplotlib
+matplotlib.use('pdf')
+import matplotlib.pyplot as plt
+import matplotlib.colors as colors
+import matplotlib.ticker as ticker
+
+from RegridTools import RegridTools
+from MapTools import returnMapObjects
+from SliceFigureTools import SliceFigureTools
+from ManifestTools import ManifestTools, returnCodeVersion, returnOutputRecord
+
+
+
+# Plotting objects for one worker process; created once by _initRenderWorker
+_workerGrid = None
+
+
+
+def _initRenderWorker (gridInfo):
+
+   global _workerGrid
+
+   # a serial run reinitializes in the main process; drop its old figure
+   if _workerGrid != None and _workerGrid.get('sliceFigure') != None:
+      _workerGrid['sliceFigure'].close ()
+
+   baseMap, gridLons, gridLats, X_grid, Y_grid = \
+       returnMapObjects (gridInfo['minLat'], gridInfo['maxLat'], \
+                            gridInfo['minLong'], gridInfo['maxLong'], \
+                            gridInfo['latSize'], gridInfo['longSize'])
+
+   _workerGrid = dict(gridInfo)
+   _workerGrid['baseMap'] = baseMap
+   _workerGrid['X_grid'] = X_grid
+   _workerGrid['Y_grid'] = Y_grid
+
+
+
+#---------------------------------------------------------------------------
+# The slice figure of a worker is built for its first task and then reused:
+# later tasks only update the panel data, limits and titles.
+#---------------------------------------------------------------------------
+
+def _returnSliceFigure ():
+
+   if _workerGrid.get('sliceFigure') == None:
+      _workerGrid['sliceFigure'] = SliceFigureTools (_workerGrid['baseMap'], \
+                                                        _workerGrid['X_grid'], \
+                                                        _workerGrid['Y_grid'], \
+                                                        [_workerGrid['minLat'], \
+                                                            _workerGrid['maxLat']], \
+                                                        [_workerGrid['minLong'], \
+                                                            _workerGrid['maxLong']], \
+                                                        renderMode=_workerGrid['renderMode'])
+   return _workerGrid['sliceFigure']
+
+
+
+def _plotZonalMeanPanel (data, x, y, fig, ax1, colorMap, dataMin, dataMax, \
+                            xAxisLabel, title):
+
+   clevs = numpy.linspace(dataMin, dataMax, 20)
+   norm = colors.BoundaryNorm(clevs, ncolors=256, clip=False)
+
+   contour = ax1.contourf(x, y, data, levels=clevs, norm=norm, cmap=colorMap, \
+                             vmin = dataMin, vmax = dataMax, extend='both')
+   ax1.set_title(title)
+
+   fmt = ticker.FormatStrFormatter("%.2g")
+   cbar = fig.colorbar(contour, ax=ax1, orientation='horizontal', shrink=0.8, \
+                          format=fmt)
+   for t in cbar.ax.get_xticklabels():
+      t.set_fontsize("x-small")
+
+   for t in ax1.get_xticklabels():
+      t.set_fontsize("x-small")
+
+   ax1.set_ylabel("hPa")
+   ax1.set_yscale('log')
+   ax1.set_ylim(y.max(), y.min())
+   ax1.set_xlabel(xAxisLabel)
+
+   subs = [1,2,5]
+   if y.max()/y.min() < 30.:
+      subs = [1,2,3,4,5,6,7,8,9]
+   ax1.yaxis.set_major_locator(ticker.LogLocator(base=10., subs=subs))
+   ax1.yaxis.set_major_formatter(ticker.FormatStrFormatter("%g"))
+   for t in ax1.get_yticklabels():
+      t.set_fontsize("x-small")
+
+
+
+def _renderSliceTask (task):
+
+   sliceFigure = _returnSliceFigure ()
+
+   sliceFigure.updatePanel (task['z1'], task['minMaxVals'], 311, task['title1'], "jet")
+   sliceFigure.updatePanel (task['z2'], task['minMaxVals'], 312, task['title2'], "jet")
+   sliceFigure.updatePanel (task['zRatio'], task['ratioRange'], 313, task['titleRatio'], \
+                               task['ratioColorMap'])
+
+   sliceFigure.savePlot (task['outFile'])
+
+
+
+def _renderZonalMeanTask (task):
+
+   fig = plt.figure(figsize=(20,20))
+
+   ax1 = fig.add_subplot(311)
+   _plotZonalMeanPanel (task['z1'], task['lat'], task['levels'], fig, ax1, 'jet', \
+                           task['minMaxVals'][0], task['minMaxVals'][1], \
+                           "Model values", task['title1'])
+
+   ax2 = fig.add_subplot(312)
+   _plotZonalMeanPanel (task['z2'], task['lat'], task['levels'], fig, ax2, 'jet', \
+                           task['minMaxVals'][0], task['minMaxVals'][1], \
+                           "Model values", task['title2'])
+
+   ax3 = fig.add_subplot(313)
+   _plotZonalMeanPanel (task['zRatio'], task['lat'], task['levels'], fig, ax3, \
+                           task['ratioColorMap'], \
+                           task['ratioRange'][0], task['ratioRange'][1], \
+                           "Model ratios", task['titleRatio'])
+
+   fig.savefig(task['outFile'], bbox_inches='tight')
+   plt.close(fig)
+
+
+
+#---------------------------------------------------------------------------
+# Pool entry point. Returns the output file name and None on success or the
+# error message on failure, so one bad field does not stop the batch.
+#---------------------------------------------------------------------------
+def _renderTask (task):
+
+   try:
+      if task['type'] == "slice":
+         _renderSliceTask (task)
+      else:
+         _renderZonalMeanTask (task)
+   except Exception as err:
+      plt.close('all')
+      if _workerGrid != None: _workerGrid['sliceFigure'] = None
+      return task['outFile'], str(err)
+
+   return task['outFile'], None
+
+
+
+
+class BatchCompareTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. model1Object and model2Object are already opened
+   # GeosCtmPlotTools or GmiPlotTools objects. Model 2 is put on the grid of
+   # model 1 before comparing.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, model1Object, model2Object, model1Title, model2Title, \
+                   dateYearMonth, numProcesses, fileTag, plotDir="plots/"):
+
+      self.model1Object = model1Object
+      self.model2Object = model2Object
+      self.model1Title = model1Title
+      self.model2Title = model2Title
+      self.dateYearMonth = dateYearMonth
+      self.numProcesses = numProcesses
+      self.fileTag = fileTag
+      self.plotDir = plotDir
+
+      # Options the drivers may change after construction
+      self.levelUnit = "mb"
+      self.ratioRange = [.5, 1.5]
+      self.ratioColorMap = "nipy_spectral"
+      self.doZonalMeans = True
+      self.zonalMeanFileTag = fileTag
+      self.renderMode = "pcolormesh"
+
+      # label -> model 2 level index
+      self.mapLevels = {}
+
+      # fields read together from each file
+      self.readBatchSize = 25
+
+      # GEOS is stored top-down and GMI bottom-up
+      self.flipModel1Levels = model1Object.MODEL_NAME != model2Object.MODEL_NAME
+
+      # GMI is on 0-360 longitude; model 2 fields are then read in
+      # -180 to 180 order
+      if model2Object.MODEL_NAME == "GMI" and model1Object.MODEL_NAME != "GMI":
+         model2Object.setLongStart (-180.0)
+
+      # "bilinear" or "conservative"; weights are built on first use
+      self.regridMethod = "bilinear"
+      self.regridder = None
+
+      self.gridInfo = {'minLat' : float(model1Object.minLat), \
+                          'maxLat' : float(model1Object.maxLat), \
+                          'minLong' : float(model1Object.minLong), \
+                          'maxLong' : float(model1Object.maxLong), \
+                          'cenLat' : float(model1Object.cenLat), \
+                          'cenLong' : float(model1Object.cenLong), \
+                          'latSize' : model1Object.latSize, \
+                          'longSize' : model1Object.longSize}
+
+      self.failedFields = []
+
+      # skip fields whose plots the manifest says are up to date
+      self.incremental = True
+      self.manifest = None
+
+      # the code that makes the plots: the driver and the modules it uses
+      sourceDir = os.path.dirname(os.path.abspath(__file__))
+      self.codeVersion = returnCodeVersion \
+          ([os.path.abspath(sys.argv[0])] + \
+              [os.path.join(sourceDir, module + ".py") for module in \
+                  ["BatchCompareTools", "SliceFigureTools", "MapTools", \
+                      "RegridTools", "GenericModelPlotTools", \
+                      model1Object.__class__.__name__, \
+                      model2Object.__class__.__name__]])
+
+
+
+   #---------------------------------------------------------------------------
+   # Select the model 2 levels to map by value (i.e. 992, 506, 192 mb).
+   #---------------------------------------------------------------------------
+
+   def setMapLevelsFromValues (self, levelValues):
+
+      self.mapLevels = {}
+      levCount = 0
+      for lev in self.model2Object.lev[:]:
+         if int(lev) in levelValues:
+            self.mapLevels[int(lev)] = levCount
+         levCount = levCount + 1
+
+      print ""
+      print "Map levels (label : model 2 index): ", self.mapLevels
+      print ""
+
+
+   def returnModelField (self, modelObject, field, timeRecord, variableExtractField):
+
+      if modelObject.MODEL_NAME == "GMI":
+         return modelObject.returnField (field, timeRecord, variableExtractField)
+
+      if variableExtractField == 'scav':
+         return modelObject.returnField (field, timeRecord, "SCAV_")
+
+      return modelObject.returnField (field, timeRecord)
+
+
+   #---------------------------------------------------------------------------
+   # Returns field name -> array for the fields that could be read. GMI
+   # species come from one read of the const array.
+   #---------------------------------------------------------------------------
+
+   def returnModelFields (self, modelObject, fieldNames, timeRecord, \
+                             variableExtractField):
+
+      if modelObject.MODEL_NAME == "GMI":
+         try:
+            return modelObject.returnFields (fieldNames, timeRecord, \
+                                                variableExtractField)
+         except (KeyError, IndexError) as err:
+            print "WARNING: batched read failed, reading one field at a time: ", err
+
+      fields = {}
+      for field in fieldNames[:]:
+         try:
+            fields[field] = self.returnModelField (modelObject, field, timeRecord, \
+                                                      variableExtractField)
+         except (KeyError, IndexError) as err:
+            print "WARNING: could not read ", field, " : ", err
+
+      return fields
+
+
+   #---------------------------------------------------------------------------
+   # Puts a model 2 array (lev, lat, lon) or (lat, lon) on the horizontal
+   # grid of model 1.
+   #---------------------------------------------------------------------------
+
+   def putOnModel1Grid (self, array2):
+
+      model1Long = self.model1Object.long[:]
+      model1Lat = self.model1Object.lat[:]
+      model2Long = self.model2Object.returnLongitudes ()
+      model2Lat = self.model2Object.lat[:]
+
+      if array2.shape[-2:] == (len(model1Lat), len(model1Long)):
+         return array2
+
+      if self.regridder == None:
+         print "Horizontal shapes differ. Interpolating model 2 to model 1 grid"
+         self.regridder = RegridTools (model2Lat, model2Long, model1Lat, \
+                                          model1Long, self.regridMethod)
+
+      return self.regridder.regrid (array2)
+
+
+   def returnRatio (self, z1, z2):
+
+      return self.model1Object.returnRatio (z1, z2, \
+                                               positiveOverZero=self.ratioRange[1], \
+                                               negativeOverZero=self.ratioRange[0])
+
+
+   def createSliceTask (self, field, variableExtractField, label, z1, z2):
+
+      minMaxVals = [min(z1.min(), z2.min()), max(z1.max(), z2.max())]
+
+      if variableExtractField != "":
+         fieldPrefix = variableExtractField + "_"
+      else:
+         fieldPrefix = ""
+
+      titleEnd = fieldPrefix + field + " @ " + str(label) + \
+          " " + self.levelUnit + " " + self.dateYearMonth
+
+      task = {'type' : "slice", 'field' : field, 'label' : label, \
+                 'z1' : z1, 'z2' : z2, 'zRatio' : self.returnRatio(z1, z2), \
+                 'minMaxVals' : minMaxVals, \
+                 'ratioRange' : self.ratioRange, \
+                 'ratioColorMap' : self.ratioColorMap, \
+                 'title1' : self.model1Title + "        " + titleEnd, \
+                 'title2' : self.model2Title + "        " + titleEnd, \
+                 'titleRatio' : "Model ratio        " + titleEnd, \
+                 'outFile' : self.plotDir + fieldPrefix + field + \
+                 self.fileTag + str(label) + ".pdf"}
+      return task
+
+
+   def createZonalMeanTask (self, field, variableExtractField, array1, array2):
+
+      zm1 = numpy.mean(array1, axis=2)
+      zm2 = numpy.mean(array2, axis=2)
+
+      if self.model2Object.lev[0] == 0:
+         useLevels = self.model2Object.lev[:] + 1
+      else:
+         useLevels = self.model2Object.lev[:]
+
+      titleEnd = variableExtractField + " " + field + " ZM " + self.dateYearMonth
+
+      task = {'type' : "zonal", 'field' : field, 'label' : "zonalMean", \
+                 'z1' : zm1, 'z2' : zm2, 'zRatio' : self.returnRatio(zm1, zm2), \
+                 'lat' : numpy.asarray(self.model1Object.lat[:]), \
+                 'levels' : numpy.asarray(useLevels), \
+                 'minMaxVals' : [min(zm1.min(), zm2.min()), max(zm1.max(), zm2.max())], \
+                 'ratioRange' : self.ratioRange, \
+                 'ratioColorMap' : self.ratioColorMap, \
+                 'title1' : self.model1Title + "        " + titleEnd, \
+                 'title2' : self.model2Title + "        " + titleEnd, \
+                 'titleRatio' : "Ratios        " + titleEnd, \
+                 'outFile' : self.plotDir + field + self.zonalMeanFileTag + ".pdf"}
+      return task
+
+
+   #---------------------------------------------------------------------------
+   # Reads the fields from both models readBatchSize at a time and turns
+   # each into its plot tasks.
+   #---------------------------------------------------------------------------
+
+   def createTasks (self, fieldNames, timeRecord, variableExtractField):
+
+      tasks = []
+
+      for batchStart in range(0, len(fieldNames), self.readBatchSize):
+
+         batchNames = fieldNames[batchStart:batchStart + self.readBatchSize]
+
+         print ""
+         print "Reading: ", batchNames
+         print ""
+
+         fields1 = self.returnModelFields (self.model1Object, batchNames, \
+                                              timeRecord, variableExtractField)
+         fields2 = self.returnModelFields (self.model2Object, batchNames, \
+                                              timeRecord, variableExtractField)
+
+         for field in batchNames[:]:
+
+            if field not in fields1 or field not in fields2:
+               self.failedFields.append(field)
+               continue
+
+            tasks.extend(self.createFieldTasks (field, variableExtractField, \
+                                                   fields1.pop(field), \
+                                                   fields2.pop(field)))
+
+      return tasks
+
+
+   #---------------------------------------------------------------------------
+   # Extracts only what is plotted from one field (level slices and zonal
+   # means), so the task list stays small.
+   #---------------------------------------------------------------------------
+
+   def createFieldTasks (self, field, variableExtractField, array1, array2):
+
+      array1 = numpy.asarray(array1)
+      array2 = self.putOnModel1Grid (numpy.asarray(array2))
+
+      if len(array1.shape) != len(array2.shape):
+         print "WARNING: ", field, " is not the same rank in each file!"
+         self.failedFields.append(field)
+         return []
+
+      if len(array1.shape) == 2:
+         return [self.createSliceTask (field, variableExtractField, \
+                                          "sfc", array1, array2)]
+
+      if array1.shape[0] != array2.shape[0]:
+         print "WARNING: ", field, " has a different number of levels in each file!"
+         self.failedFields.append(field)
+         return []
+
+      if self.flipModel1Levels:
+         array1 = array1[::-1, :, :]
+
+      tasks = []
+      for label in sorted(self.mapLevels.keys()):
+         levIndex = self.mapLevels[label]
+         tasks.append(self.createSliceTask (field, variableExtractField, label, \
+                                               array1[levIndex, :, :], \
+                                               array2[levIndex, :, :]))
+
+      if self.doZonalMeans:
+         tasks.append(self.createZonalMeanTask (field, variableExtractField, \
+                                                   array1, array2))
+
+      return tasks
+
+
+   def runTasks (self, tasks):
+
+      if len(tasks) == 0: return []
+
+      numWorkers = min(self.numProcesses, len(tasks))
+
+      self.gridInfo['renderMode'] = self.renderMode
+
+      print ""
+      print "Rendering ", len(tasks), " figures with ", numWorkers, " workers"
+      print ""
+
+      if numWorkers == 1:
+         _initRenderWorker (self.gridInfo)
+         results = [_renderTask(task) for task in tasks]
+      else:
+         pool = multiprocessing.Pool(processes=numWorkers, \
+                                        initializer=_initRenderWorker, \
+                                        initargs=(self.gridInfo,))
+         results = pool.map(_renderTask, tasks, chunksize=1)
+         pool.close()
+         pool.join()
+
+      return results
+
+
+   #---------------------------------------------------------------------------
+   # Manifest key of one field's plots: both model files as they are now and
+   # everything that changes the plots.
+   #---------------------------------------------------------------------------
+
+   def returnFieldKey (self, field, timeRecord, variableExtractField):
+
+      parameters = {'field' : field, 'variableExtractField' : variableExtractField, \
+                       'timeRecord' : timeRecord, 'analysisType' : "ratio", \
+                       'mapLevels' : sorted(self.mapLevels.items()), \
+                       'levelUnit' : self.levelUnit, 'ratioRange' : self.ratioRange, \
+                       'ratioColorMap' : self.ratioColorMap, \
+                       'doZonalMeans' : self.doZonalMeans, 'fileTag' : self.fileTag, \
+                       'zonalMeanFileTag' : self.zonalMeanFileTag, \
+                       'regridMethod' : self.regridMethod, \
+                       'renderMode' : self.renderMode, \
+                       'titles' : [self.model1Title, self.model2Title, self.dateYearMonth], \
+                       'codeVersion' : self.codeVersion}
+
+      return self.manifest.returnTaskKey ([self.model1Object.fileName, \
+                                              self.model2Object.fileName], parameters)
+
+
+   #---------------------------------------------------------------------------
+   # Records the plots of every field whose figures were all rendered. The
+   # task outFile names are the files written (with their extension), so a
+   # recorded field is up to date until its inputs or plots change.
+   #---------------------------------------------------------------------------
+
+   def recordFields (self, tasks, results, fieldKeys, timeRecord):
+
+      inputFiles = [self.model1Object.fileName, self.model2Object.fileName]
+
+      fieldRecords = {}
+      failed = set()
+      for task, (outFile, error) in zip(tasks, results):
+         if error != None: failed.add(task['field'])
+         fieldRecords.setdefault(task['field'], {})[outFile] = \
+             returnOutputRecord (inputFiles, task['field'], task['label'], \
+                                    timeRecord, "ratio", self.codeVersion)
+
+      for field in fieldRecords.keys():
+         if field in failed: continue
+         self.manifest.recordTask (fieldKeys[field], fieldRecords[field])
+         if not self.manifest.isUpToDate (fieldKeys[field]):
+            print "WARNING: plots of ", field, " were not all written; ", \
+                "they will be made again next run"
+
+      self.manifest.save ()
+
+
+   #---------------------------------------------------------------------------
+   # Plots fieldNames and returns the names of the fields that could not be
+   # read, compared or plotted.
+   #---------------------------------------------------------------------------
+
+   def plotFields (self, fieldNames, timeRecord, variableExtractField):
+
+      self.failedFields = []
+
+      if not os.path.exists(self.plotDir): os.makedirs(self.plotDir)
+
+      self.manifest = ManifestTools (os.path.join(self.plotDir, "manifest.json"))
+
+      fieldKeys = {}
+      fieldsToPlot = []
+      for field in fieldNames:
+         fieldKeys[field] = self.returnFieldKey (field, timeRecord, variableExtractField)
+         if self.incremental and self.manifest.isUpToDate (fieldKeys[field]):
+            continue
+         fieldsToPlot.append(field)
+
+      print ""
+      print "Skipping ", len(fieldNames) - len(fieldsToPlot), " fields with plots up to date"
+      print ""
+
+      tasks = self.createTasks (fieldsToPlot, timeRecord, variableExtractField)
+      results = self.runTasks (tasks)
+
+      numFailed = 0
+      for task, (outFile, error) in zip(tasks, results):
+         if error != None:
+            print "ERROR: failed to plot ", outFile, " : ", error
+            if task['field'] not in self.failedFields:
+               self.failedFields.append(task['field'])
+            numFailed = numFailed + 1
+
+      self.recordFields (tasks, results, fieldKeys, timeRecord)
+
+      print ""
+      print "Plotted ", len(results) - numFailed, " of ", \
+          len(results), " figures to ", self.plotDir
+      print ""
+
+      sys.stdout.flush()
+
+      return self.failedFields
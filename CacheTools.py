@@ -0,0 +1,80 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# Helpers for the on-disk caches (regrid weights, file inventories, etc.).
+# Everything lives under GMI_PLOT_CACHE_DIR (default ~/.GmiGeosCtmVisualize).
+# Cache files are written to a temporary file and renamed, so a run never
+# reads a partially written file from another run.
+#------------------------------------------------------------------------------
+
+import os
+import hashlib
+import tempfile
+import pickle
+
+
+
+def returnCacheDir (subDir):
+
+   baseDir = os.environ.get('GMI_PLOT_CACHE_DIR', \
+                               os.path.join(os.path.expanduser("~"), \
+                                               ".GmiGeosCtmVisualize"))
+   return os.path.join(baseDir, subDir)
+
+
+#---------------------------------------------------------------------------
+# Key for data derived from a file: changes whenever the file is rewritten
+# (path, modification time and size) or extraKeys change.
+#---------------------------------------------------------------------------
+
+def returnFileKey (fileName, extraKeys=[]):
+
+   fileStat = os.stat(fileName)
+
+   md5 = hashlib.md5()
+   for key in [os.path.abspath(fileName), fileStat.st_mtime, fileStat.st_size] + \
+          list(extraKeys):
+      md5.update(str(key).encode('utf-8'))
+      md5.update(b'|')
+
+   return md5.hexdigest()
+
+
+def readCacheObject (cacheFile):
+
+   if not os.path.exists(cacheFile): return None
+
+   try:
+      myFile = open(cacheFile, "rb")
+      try:
+         return pickle.load(myFile)
+      finally:
+         myFile.close()
+   except Exception:
+      print ("WARNING: ignoring unreadable cache file: " + cacheFile)
+      return None
+
+
+def writeCacheObject (cacheFile, cacheObject):
+
+   cacheDir = os.path.dirname(cacheFile)
+
+   try:
+      if not os.path.exists(cacheDir): os.makedirs(cacheDir)
+
+      fileDesc, tmpFile = tempfile.mkstemp(dir=cacheDir)
+      myFile = os.fdopen(fileDesc, "wb")
+      try:
+         pickle.dump(cacheObject, myFile, 2)
+      finally:
+         myFile.close()
+      os.rename(tmpFile, cacheFile)
+   except (IOError, OSError):
+      print ("WARNING: could not write cache file: " + cacheFile)
@@ -0,0 +1,160 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class splits (lev, lat, lon) fields into troposphere and stratosphere
+# columns. The split is a fixed level, a pressure or a per-cell tropopause,
+# and the trop, strat and total columns come from one segmented reduction
+# of the (optionally mass weighted) field.
+#------------------------------------------------------------------------------
+
+import numpy
+
+
+
+GRAVITY = 9.80616   # m/s2
+
+
+
+#---------------------------------------------------------------------------
+# Index of the level closest to value (i.e. the level nearest 100 hPa)
+#---------------------------------------------------------------------------
+
+def returnNearestLevel (levels, value):
+
+   return int(numpy.abs(numpy.asarray(levels[:]) - value).argmin())
+
+
+#---------------------------------------------------------------------------
+# Layer mass per unit area (kg/m2) on a hybrid grid: dp/g from the ak/bk of
+# a PressureTools object and a PS (Pa) field, in the field's level order.
+#---------------------------------------------------------------------------
+
+def returnHybridMassWeights (pressureObject, ps, bottomUp=True):
+
+   weights = pressureObject.returnLayerThickness (ps) / GRAVITY
+   if bottomUp: weights = weights[::-1]
+
+   return weights
+
+
+#---------------------------------------------------------------------------
+# Layer mass per unit area (kg/m2) on pressure levels (hPa, either order),
+# with the layer edges half way between levels. Shape (lev, 1, 1).
+#---------------------------------------------------------------------------
+
+def returnLevelMassWeights (levPressures):
+
+   levPressures = numpy.asarray(levPressures[:], numpy.float64) * 100.
+
+   edges = numpy.zeros(len(levPressures) + 1, numpy.float64)
+   edges[1:-1] = (levPressures[1:] + levPressures[:-1]) / 2.
+   edges[0] = levPressures[0] - (levPressures[1] - levPressures[0]) / 2.
+   edges[-1] = levPressures[-1] + (levPressures[-1] - levPressures[-2]) / 2.
+   edges = numpy.clip(edges, 0.0, None)
+
+   weights = numpy.abs(numpy.diff(edges)) / GRAVITY
+
+   return weights[:, numpy.newaxis, numpy.newaxis]
+
+
+
+class ColumnTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. weights (optional) multiply the field before the
+   # column sums, i.e. returnHybridMassWeights or returnLevelMassWeights.
+   # bottomUp tells whether level 0 is the surface.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, weights=None, bottomUp=True):
+
+      self.weights = weights
+      self.bottomUp = bottomUp
+
+
+   #---------------------------------------------------------------------------
+   # Split index for a pressure: the number of levels, counted from level 0,
+   # on level 0's side of the pressure. levPressures is (lev,) or the
+   # (lev, lat, lon) mid pressures; pressure is a number or a (lat, lon)
+   # field such as the tropopause pressure (same units). A (lat, lon) index
+   # is returned when either varies by cell.
+   #---------------------------------------------------------------------------
+
+   def returnSplitAtPressure (self, levPressures, pressure):
+
+      levPressures = numpy.asarray(levPressures, numpy.float64)
+      pressure = numpy.asarray(pressure, numpy.float64)
+
+      if levPressures.ndim == 1 and pressure.ndim > 0:
+         levPressures = levPressures[:, numpy.newaxis, numpy.newaxis]
+
+      if self.bottomUp:
+         split = (levPressures >= pressure).sum(axis=0)
+      else:
+         split = (levPressures < pressure).sum(axis=0)
+
+      if numpy.ndim(split) == 0: return int(split)
+      return split
+
+
+   #---------------------------------------------------------------------------
+   # Trop, strat and total columns of a (lev, lat, lon) field. splitIndex is
+   # an int (levels [0:splitIndex] are on level 0's side) or a (lat, lon)
+   # array of them (see returnSplitAtPressure).
+   #---------------------------------------------------------------------------
+
+   def returnColumns (self, field, splitIndex):
+
+      weighted = numpy.ma.filled(field, 0.0)
+      if self.weights is not None:
+         weighted = weighted * self.weights
+
+      numLevels = weighted.shape[0]
+
+      if numpy.ndim(splitIndex) == 0:
+         split = min(max(int(splitIndex), 0), numLevels)
+         if split == 0 or split == numLevels:
+            total = weighted.sum(axis=0)
+            lower = total * (split == numLevels)
+            upper = total - lower
+         else:
+            # one segmented sum gives both parts
+            lower, upper = numpy.add.reduceat(weighted, [0, split], axis=0)
+            total = lower + upper
+      else:
+         # one cumulative sum gives the part below every cell's split
+         split = numpy.clip(numpy.asarray(splitIndex, int), 0, numLevels)
+         cumulative = numpy.cumsum(weighted, axis=0)
+         total = cumulative[-1]
+         latIndex, longIndex = numpy.ogrid[0:split.shape[0], 0:split.shape[1]]
+         lower = numpy.where(split > 0, \
+                                cumulative[numpy.maximum(split - 1, 0), latIndex, longIndex], \
+                                0.0)
+         upper = total - lower
+
+      if self.bottomUp:
+         return lower, upper, total
+
+      return upper, lower, total
+
+
+   #---------------------------------------------------------------------------
+   # Zonal means of the trop, strat and total columns.
+   #---------------------------------------------------------------------------
+
+   def returnColumnZonalMeans (self, field, splitIndex):
+
+      columns = self.returnColumns (field, splitIndex)
+
+      return [column.mean(axis=-1) for column in columns]
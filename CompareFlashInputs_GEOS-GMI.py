@@ -45,6 +45,7 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
 from GmiPlotTools import GmiPlotTools
+from RegridTools import RegridTools
 
 
 NUM_ARGS = 4
@@ -135,18 +136,6 @@ gmiObject.fieldName = "ratio_local"
 geosCtmObject.fieldName = gmiObject.fieldName
 
 
-# Arrays (one time record, one species)
-longRecords = numpy.zeros(gmiObject.longSize, numpy.float32)
-
-remappedGmiArray = numpy.zeros((gmiObject.latSize, \
-                                    gmiObject.longSize), numpy.float32)
-
-newGmiArray = numpy.zeros((gmiObject.latSize, \
-                               geosCtmObject.longSize), numpy.float32)
-
-                             
-
-
 plt.figure(figsize=(20,20))
 
 print ""
@@ -158,7 +147,10 @@ geosCtmFieldArray = geosCtmObject.returnField (geosCtmObject.fieldName, timeReco
 year = dateYearMonth[0:4]
 month = dateYearMonth[4:6]
 
+# GMI is on 0-360 longitude; read it in GEOS (-180 to 180) order
+gmiObject.setLongStart (-180.0)
 gmiFieldArray = gmiObject.returnFlashRateData (gmiObject.fieldName, int(year)-1980, int(month)-1)
+remappedLong = gmiObject.returnLongitudes ()
 
 
 print ""
@@ -168,25 +160,6 @@ print ""
 
 
 
-# put GMI on -180 to 0 to 180
-lenGmiLong = len(gmiObject.long[:])
-        
-remappedGmiArray [:,0:lenGmiLong/2] = gmiFieldArray[:,lenGmiLong/2:lenGmiLong]
-
-remappedGmiArray [:,lenGmiLong/2:lenGmiLong] = gmiFieldArray[:,0:lenGmiLong/2]
-remappedLong = numpy.zeros(lenGmiLong, float32)
-remappedLong [0:lenGmiLong/2] = gmiObject.long[lenGmiLong/2:lenGmiLong] - 360.0
-remappedLong [lenGmiLong/2:lenGmiLong] = gmiObject.long[0:lenGmiLong/2]
-        
-
-remappedLongPlus180 = numpy.zeros(lenGmiLong, float32)
-remappedLongPlus180[:] = remappedLong[:] + 180.0
-
-geosCtmLongPlus180 = numpy.zeros(geosCtmObject.longSize, float32)
-geosCtmLongPlus180 [:] = geosCtmObject.long[:] + 180.0
-
-
-
 # Prepares basemap objects for plotting
 print ""
 print "Creating GEOS-CTM plot objects..."
@@ -196,25 +169,16 @@ gmiObject.createPlotObjects()
 print ""
 
 
-
-
 if gmiFieldArray.shape != geosCtmFieldArray.shape:
     print "Array shapes are different. Interpolation needed!"
 
-    latCount = 0
-    for lat in gmiObject.lat[:]:
-
-        longRecords[:] = remappedGmiArray [latCount,:]
-        
-        yinterp =  numpy.interp(geosCtmLongPlus180, remappedLongPlus180, longRecords)
-        
-        newGmiArray[latCount, :] = yinterp [:]
-        
-        latCount = latCount + 1
-
+    # Weights are cached, so repeated runs on these grids skip this step
+    regridObject = RegridTools (gmiObject.lat[:], remappedLong[:], \
+                                    geosCtmObject.lat[:], geosCtmObject.long[:])
+    newGmiArray = regridObject.regrid (gmiFieldArray)
 
 else:
-    newGmiArray[:,:] = remappedGmiArray[:,:]
+    newGmiArray = gmiFieldArray
 
 
 
@@ -222,7 +186,7 @@ else:
 z_GeosCtm = geosCtmFieldArray
                              
 z_Gmi = newGmiArray[:, :]
-z_Diff = z_GeosCtm / z_Gmi
+z_Diff = geosCtmObject.returnRatio (z_GeosCtm, z_Gmi)
 
 print ""
 print "Min/max of GMI: ", z_Gmi.min(), "/", z_Gmi.max()
@@ -246,12 +210,6 @@ if z_Gmi.min() < minValueOfBoth:
 if z_Gmi.max() > maxValueOfBoth:
     maxValueOfBoth = z_Gmi.max()
 
-for lat in range(0, size(geosCtmObject.lat)):
-    for long in range(0, size(geosCtmObject.long)):
-
-        if z_Gmi[lat, long] == 0 and z_GeosCtm[lat, long] == 0:
-            #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-            z_Diff[lat, long] = 1.0
 
 
 
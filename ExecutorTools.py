@@ -0,0 +1,349 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# Executors run a list of tasks (one per field, i.e. a PlotField_* command)
+# with a fixed number of workers, whatever the number of tasks. Tasks wait
+# in a queue ordered by estimated cost (largest first, so 3D fields start
+# before 2D ones and the workers finish together), failed tasks are retried
+# and tasks running longer than the timeout are killed. Backends:
+#    LocalExecutor - shell commands as local subprocesses
+#    SshExecutor   - shell commands over ssh on the nodes of a PBS node file
+#    PoolExecutor  - python functions in a local multiprocessing pool
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import signal
+import subprocess
+import multiprocessing
+import collections
+
+
+
+#---------------------------------------------------------------------------
+# A task for runTasks. command is a shell command (Local/SshExecutor) or a
+# (function, args) pair (PoolExecutor). cost only orders the queue.
+#---------------------------------------------------------------------------
+
+def createTask (name, command, cost=1):
+
+   return {'name':name, 'command':command, 'cost':cost}
+
+
+#---------------------------------------------------------------------------
+# Estimated cost of plotting a field: its number of points per time record
+# (a 72 level field costs 72 times a 2D field).
+#---------------------------------------------------------------------------
+
+def returnFieldCost (modelObject, fieldName, prefix=''):
+
+   variableName = modelObject.returnVariableName (prefix + fieldName)
+   if variableName == None: return 1
+
+   shape = modelObject.fieldShapes[variableName]
+   if len(shape) >= 3 or (len(shape) == 2 and modelObject.time is not None and \
+                             shape[0] == modelObject.timeLength):
+      shape = shape[1:]
+
+   cost = 1
+   for dimSize in shape: cost = cost * dimSize
+
+   return cost
+
+
+#---------------------------------------------------------------------------
+# PBS node file: unique node names in the order first listed (the file has
+# one line per processor).
+#---------------------------------------------------------------------------
+
+def readNodeFile (nodeFile):
+
+   nodes = []
+   nodesSeen = set()
+
+   myFile = open (nodeFile, "r")
+   try:
+      for line in myFile:
+         node = line.strip()
+         if node == '' or node in nodesSeen: continue
+         nodesSeen.add(node)
+         nodes.append(node)
+   finally:
+      myFile.close()
+
+   return nodes
+
+
+
+class ExecutorTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. At most numWorkers tasks run at once. A failed
+   # task is run up to numRetries more times; timeout (seconds, None for no
+   # limit) counts as a failure. Subclasses start, poll and kill tasks.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, numWorkers, timeout=None, numRetries=0, pollInterval=0.5):
+
+      if numWorkers < 1:
+         raise ValueError("Number of workers must be at least 1: " + str(numWorkers))
+
+      self.numWorkers = numWorkers
+      self.timeout = timeout
+      self.numRetries = numRetries
+      self.pollInterval = pollInterval
+
+
+   def returnSlots (self):
+
+      return range(0, self.numWorkers)
+
+
+   #---------------------------------------------------------------------------
+   # Runs every task and returns one result per task, in the order given:
+   # {'name', 'returnCode', 'error', 'attempts', 'elapsed'}. returnCode 0 is
+   # success. Slots may repeat (a node name once per worker), so running
+   # tasks are kept by their position in the slot list.
+   #---------------------------------------------------------------------------
+
+   def runTasks (self, tasks):
+
+      results = [None] * len(tasks)
+
+      # largest first; the sort is stable, so equal costs keep their order
+      order = sorted(range(0, len(tasks)), key=lambda index: -tasks[index]['cost'])
+      pending = collections.deque([(index, 0) for index in order])
+
+      slots = list(self.returnSlots())
+      freeSlots = list(range(0, len(slots)))
+      running = {}
+
+      print ("Running " + str(len(tasks)) + " tasks on " + str(len(freeSlots)) + \
+                " workers")
+
+      while len(pending) > 0 or len(running) > 0:
+
+         while len(pending) > 0 and len(freeSlots) > 0:
+            index, attempts = pending.popleft()
+            slotIndex = freeSlots.pop(0)
+            print ("Starting: " + tasks[index]['name'] + " on " + str(slots[slotIndex]))
+            running[slotIndex] = (index, attempts + 1, time.time(), \
+                                     self.startTask (tasks[index], slots[slotIndex]))
+
+         time.sleep(self.pollInterval)
+
+         for slotIndex in list(running.keys()):
+            index, attempts, startTime, handle = running[slotIndex]
+            elapsed = time.time() - startTime
+
+            status = self.pollTask (handle)
+            if status == None and self.timeout != None and elapsed > self.timeout:
+               self.killTask (handle)
+               status = (-1, "timed out after " + str(int(elapsed)) + " s")
+            if status == None: continue
+
+            del running[slotIndex]
+            freeSlots.append(slotIndex)
+            returnCode, error = status
+
+            # lost with another task's worker (PoolExecutor); not an attempt
+            if returnCode == None:
+               pending.appendleft((index, attempts - 1))
+               continue
+
+            if returnCode != 0 and attempts <= self.numRetries:
+               print ("Retrying: " + tasks[index]['name'] + " (" + str(error) + ")")
+               pending.append((index, attempts))
+               continue
+
+            results[index] = {'name':tasks[index]['name'], 'returnCode':returnCode, \
+                                 'error':error, 'attempts':attempts, 'elapsed':elapsed}
+
+         sys.stdout.flush()
+
+      self.finish ()
+
+      return results
+
+
+   def finish (self):
+
+      return
+
+
+
+class LocalExecutor (ExecutorTools):
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Shell commands run as subprocesses of this process. Each command gets
+   # its own process group so a timeout kills everything it started.
+   #---------------------------------------------------------------------------
+
+   def startTask (self, task, slot):
+
+      return subprocess.Popen(self.returnCommand (task['command'], slot), \
+                                 shell=True, preexec_fn=os.setsid)
+
+
+   def returnCommand (self, command, slot):
+
+      return command
+
+
+   def pollTask (self, process):
+
+      returnCode = process.poll()
+      if returnCode == None: return None
+
+      error = None
+      if returnCode != 0: error = "exit status " + str(returnCode)
+
+      return returnCode, error
+
+
+   def killTask (self, process):
+
+      try:
+         os.killpg(process.pid, signal.SIGKILL)
+      except OSError:
+         pass
+      process.wait()
+
+
+
+class SshExecutor (LocalExecutor):
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Shell commands run over ssh, workersPerNode at a time on each node.
+   # Each command runs in workDir after sourcing setupFile (if given).
+   # A timeout kills the local ssh, which ends the remote command with it.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, nodes, workersPerNode, workDir=None, setupFile=None, \
+                   timeout=None, numRetries=0, pollInterval=0.5):
+
+      if len(nodes) == 0:
+         raise ValueError("No nodes to run on")
+
+      ExecutorTools.__init__(self, len(nodes) * workersPerNode, timeout, \
+                                numRetries, pollInterval)
+
+      self.nodes = nodes
+      self.workersPerNode = workersPerNode
+
+      self.workDir = workDir
+      if workDir == None: self.workDir = os.getcwd()
+      self.setupFile = setupFile
+
+
+   #---------------------------------------------------------------------------
+   # Slots go round the nodes, so a few tasks are spread over all of them.
+   #---------------------------------------------------------------------------
+
+   def returnSlots (self):
+
+      return [node for workerCount in range(0, self.workersPerNode) \
+                 for node in self.nodes]
+
+
+   def returnCommand (self, command, node):
+
+      remoteCommand = ""
+      if self.setupFile != None: remoteCommand = ". " + self.setupFile + " ; "
+      remoteCommand = remoteCommand + " cd " + self.workDir + " ; " + command
+
+      return "ssh -XYqt " + node + " \'" + remoteCommand + "\' "
+
+
+
+#---------------------------------------------------------------------------
+# PoolExecutor worker: runs function(*args). A function that returns
+# without raising is a success.
+#---------------------------------------------------------------------------
+
+def _runPoolTask (function, args):
+
+   try:
+      function(*args)
+   except Exception as err:
+      return 1, str(err)
+
+   return 0, None
+
+
+
+class PoolExecutor (ExecutorTools):
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Python functions (module level, so they can be pickled) run in a local
+   # multiprocessing pool. A pool worker cannot be killed on its own, so a
+   # timeout restarts the pool and the other running tasks are queued again.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, numWorkers, timeout=None, numRetries=0, pollInterval=0.5):
+
+      ExecutorTools.__init__(self, numWorkers, timeout, numRetries, pollInterval)
+
+      self.pool = None
+      self.poolCount = 0
+
+
+   def startTask (self, task, slot):
+
+      if self.pool == None:
+         self.pool = multiprocessing.Pool(processes=self.numWorkers)
+         self.poolCount = self.poolCount + 1
+
+      function, args = task['command']
+
+      return (self.poolCount, self.pool.apply_async(_runPoolTask, (function, args)))
+
+
+   def pollTask (self, handle):
+
+      poolCount, asyncResult = handle
+
+      if poolCount != self.poolCount: return None, "pool restarted"
+      if not asyncResult.ready(): return None
+
+      return asyncResult.get()
+
+
+   def killTask (self, handle):
+
+      self.pool.terminate()
+      self.pool.join()
+      self.pool = None
+      self.poolCount = self.poolCount + 1
+
+
+   def finish (self):
+
+      if self.pool != None:
+         self.pool.close()
+         self.pool.join()
+         self.pool = None
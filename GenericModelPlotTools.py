@@ -32,6 +32,12 @@ import matplotlib.colors as colors
 from matplotlib.ticker import MaxNLocator
 from mpl_toolkits.basemap import Basemap
 
+from CacheTools import returnCacheDir, returnFileKey, readCacheObject, writeCacheObject
+from MapTools import returnMapObjects, drawMapBoundaries, drawMapField
+from SliceFigureTools import SliceFigureTools
+from ZonalStatsTools import ZonalStatsTools
+from ExecutorTools import readNodeFile
+
 
 
 
@@ -53,24 +59,38 @@ class GenericModelPlotTools:
       
       self.dateTime = None
 
-      self.latSize = len(self.hdfData.dimensions[latDim])
-      self.longSize = len(self.hdfData.dimensions[lonDim])
-      self.levelSize = len(self.hdfData.dimensions[levDim])
+      # The file metadata comes from the inventory cache if this file
+      # (same path, modification time and size) has been opened before
+      inventoryKey = returnFileKey (fileName, [latDim, lonDim, levDim, timeDim, \
+                                                  latVar, lonVar, levVar, timeVar])
+      self.inventoryFile = os.path.join(returnCacheDir("inventory"), \
+                                           inventoryKey + ".pkl")
 
-      ncDims = [dim for dim in self.hdfData.dimensions]  # list of nc dimensions
-      if timeDim in ncDims[:]:
-         self.timeLength = len(self.hdfData.dimensions[timeDim])
-         self.time = self.hdfData.variables[timeVar]
-         self.timeVarName = timeVar
-      else:
-         self.timeLength = 1
-         self.time = None
-         self.timeVarName = None
+      self.inventory = readCacheObject (self.inventoryFile)
+      if self.inventory == None:
+         self.inventory = self.createInventory (latDim, lonDim, levDim, timeDim, \
+                                                   latVar, lonVar, levVar, timeVar)
+         writeCacheObject (self.inventoryFile, self.inventory)
 
+      self.latSize = self.inventory['latSize']
+      self.longSize = self.inventory['longSize']
+      self.levelSize = self.inventory['levelSize']
+      self.timeLength = self.inventory['timeLength']
+      self.time = self.inventory['time']
+      self.timeVarName = self.inventory['timeVarName']
 
-      self.lat = self.hdfData.variables[latVar]
-      self.long = self.hdfData.variables[lonVar]
-      self.lev = self.hdfData.variables[levVar]
+      self.lat = self.inventory['lat']
+      self.long = self.inventory['long']
+      self.lev = self.inventory['lev']
+
+      # variable name -> shape
+      self.fieldShapes = self.inventory['fieldShapes']
+
+      # lower case variable name -> variable name in the file
+      self.variableNames = {}
+      for var in self.inventory['variables']:
+         if var.lower() not in self.variableNames:
+            self.variableNames[var.lower()] = var
 
 
       self.latVarName = latVar
@@ -86,6 +106,10 @@ class GenericModelPlotTools:
       self.cenLat = (self.minLat + self.maxLat)/2.
       self.cenLong =  (self.minLong + self.maxLong)/2.
 
+      # Longitude order of returned fields; None keeps the file order
+      self.longStart = None
+      self.longShift = 0
+
       # User must call "createPlotObjects" to create these
       self.baseMap = None
       self.gridLons = None
@@ -93,21 +117,87 @@ class GenericModelPlotTools:
       self.X_grid = None
       self.Y_grid = None
 
+      # How 2D slices are drawn (see MapTools.RENDER_MODES)
+      self.renderMode = "pcolormesh"
+
       self.populateFieldList ()
 
 
+   #---------------------------------------------------------------------------  
+   # AUTHORS: Megan Damon NASA GSFC 
+   #
+   # DESCRIPTION: 
+   # Reads what the constructor needs from the file: dimension sizes,
+   # coordinates, variable names and shapes. Subclasses add to the
+   # "speciesNames" entry.
+   #---------------------------------------------------------------------------  
+
+   def createInventory (self, latDim, lonDim, levDim, timeDim, \
+                           latVar, lonVar, levVar, timeVar):
+
+      inventory = {}
+
+      inventory['latSize'] = len(self.hdfData.dimensions[latDim])
+      inventory['longSize'] = len(self.hdfData.dimensions[lonDim])
+      inventory['levelSize'] = len(self.hdfData.dimensions[levDim])
+
+      ncDims = [dim for dim in self.hdfData.dimensions]  # list of nc dimensions
+      if timeDim in ncDims[:]:
+         inventory['timeLength'] = len(self.hdfData.dimensions[timeDim])
+         inventory['time'] = numpy.asarray(self.hdfData.variables[timeVar][:])
+         inventory['timeVarName'] = timeVar
+      else:
+         inventory['timeLength'] = 1
+         inventory['time'] = None
+         inventory['timeVarName'] = None
+
+      inventory['lat'] = numpy.asarray(self.hdfData.variables[latVar][:])
+      inventory['long'] = numpy.asarray(self.hdfData.variables[lonVar][:])
+      inventory['lev'] = numpy.asarray(self.hdfData.variables[levVar][:])
+
+      inventory['variables'] = []
+      inventory['fieldShapes'] = {}
+      for var in self.hdfData.variables:
+         inventory['variables'].append(str(var))
+         inventory['fieldShapes'][str(var)] = self.hdfData.variables[var].shape
+
+      inventory['speciesNames'] = {}
+
+      return inventory
+
+
+   #---------------------------------------------------------------------------  
+   # AUTHORS: Megan Damon NASA GSFC 
+   #
+   # DESCRIPTION: 
+   # Sets the Basemap and plotting grid for this file. Both come from the
+   # map cache (MapTools), so files on the same grid share them.
+   #---------------------------------------------------------------------------  
+
    def createPlotObjects (self):
 
-      self.baseMap = Basemap(llcrnrlon=self.minLong, \
-                                llcrnrlat=self.minLat, \
-                                urcrnrlon=self.maxLong, \
-                                urcrnrlat=self.maxLat, \
-                                projection='cyl', \
-                                lat_0=self.cenLat,lon_0=self.cenLong)
+      self.baseMap, self.gridLons, self.gridLats, self.X_grid, self.Y_grid = \
+          returnMapObjects (self.minLat, self.maxLat, self.minLong, self.maxLong, \
+                               self.latSize, self.longSize)
 
-      self.gridLons,self.gridLats = self.baseMap.makegrid \
-          (self.longSize, self.latSize)
-      self.X_grid, self.Y_grid = self.baseMap(self.gridLons,self.gridLats)
+
+   #---------------------------------------------------------------------------  
+   # AUTHORS: Megan Damon NASA GSFC 
+   #
+   # DESCRIPTION: 
+   # Returns a comparison figure on this file's grid whose panels are
+   # updated in place (see SliceFigureTools); use it instead of
+   # create2dSlice2 when one process plots many fields or levels.
+   #---------------------------------------------------------------------------  
+
+   def createSliceFigure (self, subplotNums=[311, 312, 313]):
+
+      if self.baseMap == None: self.createPlotObjects ()
+
+      return SliceFigureTools (self.baseMap, self.X_grid, self.Y_grid, \
+                                  [self.minLat, self.maxLat], \
+                                  [self.minLong, self.maxLong], subplotNums, \
+                                  renderMode=self.renderMode)
 
 
    #---------------------------------------------------------------------------  
@@ -136,11 +226,9 @@ class GenericModelPlotTools:
       print ""
       
 
-      imSlice = self.baseMap.pcolor(self.X_grid, self.Y_grid, z, \
-                                       cmap=colorMap, \
-                                       vmin = minMaxVals[0], \
-                                       vmax = minMaxVals[1])
-      plt.colorbar()
+      imSlice = drawMapField (self.baseMap, self.X_grid, self.Y_grid, z, \
+                                 colorMap, minMaxVals, self.renderMode)
+      plt.colorbar(imSlice)
         
       plt.title(plotTitle)
       plt.axis([self.X_grid.min(), self.X_grid.max(), self.Y_grid.min(), self.Y_grid.max()])
@@ -151,8 +239,7 @@ class GenericModelPlotTools:
 #      baseMap.drawmeridians(numpy.arange(minMaxLong[0],minMaxLong[1],80),labels=[0,1,0,1])
       self.baseMap.drawmeridians(numpy.arange(self.minLong, self.maxLong,80),labels=[0,1,0,1])
  
-      self.baseMap.drawcoastlines()
-      self.baseMap.drawstates()
+      drawMapBoundaries (self.baseMap)
 
 
 
@@ -170,45 +257,27 @@ class GenericModelPlotTools:
 
 
 
-      imSlice = baseMap.pcolor(X_model, Y_model, z, \
-                                  cmap=colorMap, \
-                                  vmin = minMaxVals[0], \
-                                  vmax = minMaxVals[1])
-      plt.colorbar()
+      imSlice = drawMapField (baseMap, X_model, Y_model, z, \
+                                 colorMap, minMaxVals, self.renderMode)
+      plt.colorbar(imSlice)
         
       plt.title(plotTitle)
       plt.axis([X_model.min(), X_model.max(), Y_model.min(), Y_model.max()])
 
       baseMap.drawparallels(numpy.arange(minMaxLat[0],minMaxLat[1],40),labels=[1,0,0,0])
       baseMap.drawmeridians(numpy.arange(minMaxLong[0],minMaxLong[1],80),labels=[0,1,0,1])
-      baseMap.drawcoastlines()
-      baseMap.drawstates()
-
-
+      drawMapBoundaries (baseMap)
 
 
-   def readNodesIntoArray (self, nodeFile):
-
-      nodesRead = []
 
-      myFile = open (nodeFile, "r")
 
-      count = 0
-      line = myFile.readline().rstrip()
-      while line != '':
-         nodesRead.append(line)
+   #---------------------------------------------------------------------------  
+   # Unique node names of a PBS node file, in the order first listed.
+   #---------------------------------------------------------------------------  
 
-         if count == 10000: break
-         count = count + 1
-         line = myFile.readline().rstrip()
+   def readNodesIntoArray (self, nodeFile):
 
-      myFile.close()
-
-      nodesToReturn = []
-      for node in nodesRead:
-         if node not in nodesToReturn: nodesToReturn.append(node)
-      
-      return nodesToReturn
+      return readNodeFile (nodeFile)
 
 
    def populateFieldList (self):
@@ -218,86 +287,207 @@ class GenericModelPlotTools:
 
 
       self.fieldList = []
-      for var in self.hdfData.variables:
+      for var in self.inventory['variables']:
 
 
          if var not in [self.latVarName, self.longVarName, \
                            self.levVarName, self.timeVarName]:
             self.fieldList.append (var)
 
-   def returnFieldsInCommonNew (self, list1, list2):
+   #---------------------------------------------------------------------------  
+   # AUTHORS: Megan Damon NASA GSFC 
+   #
+   # DESCRIPTION: 
+   # Field matching. Names are compared case-insensitively through one
+   # dictionary of list2, so matching is linear in the number of fields.
+   # prefixes2 are alias prefixes on the list2 side (i.e. SCAV_ or a
+   # deposition prefix): "SCAV_O3" matches "O3" in list1 and is preferred
+   # over a plain "O3" in list2. With prefixedOnly only prefixed list2
+   # names are matched. Returns (list1 name, list2 name) pairs in list1
+   # order, each list1 name once, with the names as spelled in each file.
+   #---------------------------------------------------------------------------  
 
-      fieldsToCompare = []
-      for item in list1[:]:
-         
+   def returnFieldPairs (self, list1, list2, prefixes2=[], prefixedOnly=False):
+
+      index2 = {}
+      if not prefixedOnly:
          for item2 in list2[:]:
-            if item.lower() == item2.lower():
-               fieldsToCompare.append(item)
+            if item2.lower() not in index2: index2[item2.lower()] = item2
+
+      lowerPrefixes = [prefix.lower() for prefix in prefixes2]
+      for item2 in list2[:]:
+         lowerItem2 = item2.lower()
+         for prefix in lowerPrefixes:
+            if lowerItem2.startswith(prefix) and len(lowerItem2) > len(prefix):
+               index2[lowerItem2[len(prefix):]] = item2
+               break
+
+      fieldPairs = []
+      matched = set()
+      for item in list1[:]:
+         lowerItem = item.lower()
+         if lowerItem in index2 and lowerItem not in matched:
+            matched.add(lowerItem)
+            fieldPairs.append((item, index2[lowerItem]))
 
-      return fieldsToCompare
-               
-   def returnFieldsInCommon (self, list1, list2, order):
+      return fieldPairs
 
-      print order, " has more fields than the other model!"
-      print ""
 
+   #---------------------------------------------------------------------------  
+   # Returns the variable name as spelled in the file (exact match first,
+   # then case-insensitive) or None.
+   #---------------------------------------------------------------------------  
+
+   def returnVariableName (self, fieldName):
 
-      if order == "GEOS-CTM": # GEOS-CTM has more fields
-         scanList = list1
-      else:
-         scanList = list2 # GMI has more fields
+      if fieldName in self.fieldShapes: return fieldName
+
+      if fieldName.lower() in self.variableNames:
+         return self.variableNames[fieldName.lower()]
+
+      return None
+
+
+   #---------------------------------------------------------------------------
+   # Level selection. levels are either values of the lev coordinate (i.e.
+   # pressures in hPa) or, with byIndex, model level indices (negative ones
+   # count from the last level). The coordinate may be in either order.
+   #---------------------------------------------------------------------------
+
+   def returnLevelIndices (self, levels, byIndex=False, tolerance=None):
+
+      levels = numpy.atleast_1d(numpy.asarray(levels, numpy.float64))
 
-      print "Scanning GEOS-CTM fields- "
-      count = 0
-      for item in scanList[:]:
-         if item[0:4] != "Var_" and \
-                item[0:3] != "EM_" and \
-                item[0:7] != "Var_EM_":
-            scanList[count] = item
+      if byIndex:
+         indices = levels.astype(int)
+         indices = numpy.where(indices < 0, indices + self.levelSize, indices)
+         if (indices < 0).any() or (indices >= self.levelSize).any():
+            raise ValueError("Level indices out of range 0:" + str(self.levelSize) + \
+                                ": " + str(levels))
+         return indices
 
-         count = count + 1
+      levValues = numpy.asarray(self.lev[:], numpy.float64)
+      order = numpy.argsort(levValues)
+      sortedValues = levValues[order]
 
-      if order == "GEOS-CTM": 
-         list1 = scanList
+      # nearest coordinate value: one of the two neighbours of each insertion point
+      upper = numpy.clip(numpy.searchsorted(sortedValues, levels), 0, len(sortedValues) - 1)
+      lower = numpy.clip(upper - 1, 0, len(sortedValues) - 1)
+      nearest = numpy.where(numpy.abs(levels - sortedValues[lower]) <= \
+                               numpy.abs(sortedValues[upper] - levels), lower, upper)
+      indices = order[nearest]
+
+      if tolerance != None:
+         missing = numpy.abs(levValues[indices] - levels) > tolerance
+         if missing.any():
+            raise ValueError("No level within " + str(tolerance) + " of: " + \
+                                str(levels[missing]) + " in " + self.fileName)
+
+      return indices
+
+
+   #---------------------------------------------------------------------------
+   # Log-pressure interpolation between levels: the indices of the two
+   # levels around each pressure and the weight of the upper index
+   # (lower * (1 - weight) + upper * weight). Pressures outside the lev
+   # coordinate are an error.
+   #---------------------------------------------------------------------------
+
+   def returnLevelWeights (self, pressures):
+
+      logPressures = numpy.log(numpy.atleast_1d(numpy.asarray(pressures, numpy.float64)))
+
+      logValues = numpy.log(numpy.asarray(self.lev[:], numpy.float64))
+      order = numpy.argsort(logValues)
+      sortedValues = logValues[order]
+
+      outside = (logPressures < sortedValues[0]) | (logPressures > sortedValues[-1])
+      if outside.any():
+         raise ValueError("Pressures outside the levels of " + self.fileName + ": " + \
+                             str(numpy.exp(logPressures[outside])))
+
+      if len(sortedValues) == 1:
+         return order[[0] * len(logPressures)], order[[0] * len(logPressures)], \
+             numpy.zeros(len(logPressures))
+
+      upper = numpy.clip(numpy.searchsorted(sortedValues, logPressures), \
+                            1, len(sortedValues) - 1)
+      lower = upper - 1
+      weight = (logPressures - sortedValues[lower]) / \
+          (sortedValues[upper] - sortedValues[lower])
+
+      return order[lower], order[upper], weight
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Returns one time record of a field at the given levels, (levels, lat,
+   # lon), in the order the levels were given. Only the levels needed are
+   # read from the file, so 20 levels cost about what 3 do. readArgs are
+   # passed to returnField after the time record (i.e. a prefix or GMI
+   # array name). Without interpolate each level is the nearest model
+   # level (see returnLevelIndices); with it, fields are interpolated
+   # linearly in log-pressure between the two levels around each pressure.
+   #---------------------------------------------------------------------------
+
+   def returnFieldAtLevels (self, fieldName, timeRecord, levels, readArgs=[], \
+                               byIndex=False, interpolate=False, tolerance=None):
+
+      if interpolate and not byIndex:
+         lower, upper, weight = self.returnLevelWeights (levels)
+         readLevels = numpy.unique(numpy.concatenate([lower, upper]))
       else:
-         list2 = scanList
+         lower = self.returnLevelIndices (levels, byIndex, tolerance)
+         readLevels = numpy.unique(lower)
+
+      # netCDF reads take an increasing list of indices
+      fieldArray = self.returnField (fieldName, timeRecord, *readArgs, \
+                                        levIndex=[int(index) for index in readLevels])
+
+      if numpy.ndim(fieldArray) != 3:
+         raise ValueError("Field " + fieldName + " has no levels in " + self.fileName)
+
+      lowerArray = fieldArray[numpy.searchsorted(readLevels, lower)]
+      if not (interpolate and not byIndex): return lowerArray
+
+      upperArray = fieldArray[numpy.searchsorted(readLevels, upper)]
+      weight = weight[:, numpy.newaxis, numpy.newaxis]
+
+      return lowerArray * (1.0 - weight) + upperArray * weight
+
+
+   def returnFieldsInCommonNew (self, list1, list2):
+
+      return [fieldPair[0] for fieldPair in self.returnFieldPairs (list1, list2)]
+               
 
+   def returnFieldsInCommon (self, list1, list2, order):
+
+      print order, " has more fields than the other model!"
       print ""
-      print "Scanning ", order, " fields for matches in other model."
-      
+
       if hasattr(self, 'fieldName'):
          print "Field name is: ", self.fieldName
       else:
          print "Field name does not exist!"
          self.fieldName = None
 
+      prefixes2 = []
+      if self.fieldName == 'scav':
+         for item in list1[:]:
+            if item.upper().startswith("SCAV_"):
+               print "found scav field: ", item
+               print "ERROR: Logic reversed. This code needs help"
+               sys.exit(-1)
+         prefixes2 = ["SCAV_"]
 
-      count = 0
-      fieldsToCompare = []
-      for item in list1[:]:
-
-         if self.fieldName == 'scav' and "SCAV_" in item:
-            print "found scav field: ", item
-            print "ERROR: Logic reversed. This code needs help"
-            sys.exit(-1)
-            
+      print ""
+      print "Scanning ", order, " fields for matches in other model."
 
-         # need to take out case insensitivity 
-         for item2 in list2[:]:
-            
-            if self.fieldName == 'scav' and "SCAV_" in item2:
-               splitItem2 = item2.split("_")
-               if item.lower() == splitItem2[1].lower():
-                  print "Found SCAV match: ", item
-                  fieldsToCompare.append(item)
-            
-            if item.lower() == item2.lower():
-               fieldsToCompare.append(item)
-            
-
-         count = count + 1
-
-      return fieldsToCompare
+      return [fieldPair[0] for fieldPair in \
+                 self.returnFieldPairs (list1, list2, prefixes2)]
         
 
    def printMe (self) :
@@ -340,93 +530,279 @@ class GenericModelPlotTools:
          self.long = self.g_long + 360.0
 
 
-   def doDifferenceAnalysis (self, field1, field2, analysisType, fieldDiff):
-      
-      if field1.shape != field2.shape:
-         print ("Fields of different sizes are not supported for difference analysis!")
-         sys.exit(0)
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Longitude alignment. After setLongStart(-180.) fields and longitudes
+   # are returned in -180 to 180 (GEOS) order; setLongStart(0.) gives 0 to
+   # 360 (GMI) order and setLongStart(None) the order in the file. Any seam
+   # and odd longitude counts are handled. Fields are rotated while being
+   # read: the two longitude pieces are read straight into the returned
+   # array, so no second full size copy is made.
+   #---------------------------------------------------------------------------
 
-      # Generic array to contain differences 
-      levPoints = field1.shape[0]
-      latPoints = field2.shape[1]
+   def returnLongShift (self, longStart):
 
-      # User requested percent difference
-      if analysisType == "d":
+      longValues = numpy.asarray(self.long[:], numpy.float64)
 
-         print ("")
-         print ("Doing analysis type percent diff")
-         print ("")
+      # first longitude at or east of the seam
+      return int(numpy.argmin((longValues - longStart) % 360.0))
 
-         for lev in range(0,levPoints):
-            for lat in range(0,latPoints):
 
-               absVal = abs(field1[lev,lat]-field2[lev,lat])
-               denVal = (field1[lev,lat]+field2[lev,lat]) / 2.0
-               fieldDiff [lev,lat] = (absVal/denVal) * 100.
+   def setLongStart (self, longStart):
 
-               if math.isnan(fieldDiff[lev,lat]): 
-                  fieldDiff[lev,lat] = 0
+      self.longStart = longStart
+      self.longShift = 0
+      if longStart != None:
+         self.longShift = self.returnLongShift (longStart)
 
-         minDiff = fieldDiff.min()
-         maxDiff = fieldDiff.max()
-    
+      # plot objects follow the new longitude range
+      longValues = self.returnLongitudes ()
+      self.minLong = longValues.min()
+      self.maxLong = longValues.max()
+      self.cenLong = (self.minLong + self.maxLong)/2.
 
-         print ("")
-         print ("Shape of fieldDiff for percent difference: ", fieldDiff.shape)
-         print ("low end / high end: ", minDiff, maxDiff)
-         print ("")
 
+   def returnLongitudes (self):
 
+      longValues = numpy.asarray(self.long[:], numpy.float64)
+      if self.longStart == None: return longValues
 
-      # User requested absolute difference
-      elif analysisType == "s":
-         
-         print ""
-         print "Creating Absolute Differences"
-         print ""
+      longValues = numpy.concatenate((longValues[self.longShift:], \
+                                         longValues[0:self.longShift]))
+      return (longValues - self.longStart) % 360.0 + self.longStart
 
-         fieldDiff = field1 - field2
 
-         minDiff = fieldDiff.min()
-         maxDiff = fieldDiff.max()
+   #---------------------------------------------------------------------------
+   # Reads variable[index + (longIndex,)] in the current longitude order.
+   # index holds the selectors for every dimension before longitude (the
+   # last one). longIndex is an int, slice or list in the returned order.
+   #---------------------------------------------------------------------------
 
-         if abs(minDiff) > abs(maxDiff):
-            maxDiff = abs(minDiff)
-         else:
-            minDiff = -maxDiff
+   def readVariable (self, variable, index, longIndex=None):
 
-         print ""
-         print "low end / high end for simple diffs: ", minDiff, " / ", maxDiff
-         print ""
+      if self.longShift == 0:
+         if longIndex is None: longIndex = slice(None)
+         return variable[index + (longIndex,)]
 
+      if longIndex is not None:
+         return self.readVariable (variable, index)[..., longIndex]
 
-      # User requested ratio
-      elif analysisType == "r":
+      eastPart = variable[index + (slice(self.longShift, None),)]
+      numEast = eastPart.shape[-1]
+      outShape = eastPart.shape[:-1] + (numEast + self.longShift,)
 
-         fieldDiff = field1/field2
+      if numpy.ma.isMaskedArray(eastPart):
+         fieldArray = numpy.ma.empty(outShape, eastPart.dtype)
+      else:
+         fieldArray = numpy.empty(outShape, eastPart.dtype)
 
-         print ("")
-         print ("Ratios min / max: ", fieldDiff.min(), fieldDiff.max())
-         print ("")
+      fieldArray[..., 0:numEast] = eastPart
+      eastPart = None
+      fieldArray[..., numEast:] = variable[index + (slice(0, self.longShift),)]
+
+      return fieldArray
+
+
+   #---------------------------------------------------------------------------
+   # Same rotation for an array that is already in memory (..., lon). The
+   # array itself is returned when no rotation is needed.
+   #---------------------------------------------------------------------------
+
+   def rotateLongitudes (self, fieldArray):
+
+      if self.longShift == 0: return fieldArray
+
+      pieces = (fieldArray[..., self.longShift:], fieldArray[..., 0:self.longShift])
+      if numpy.ma.isMaskedArray(fieldArray):
+         return numpy.ma.concatenate(pieces, axis=-1)
+
+      return numpy.concatenate(pieces, axis=-1)
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Zonal statistics of a field over time records (default: all records in
+   # this file), read one record at a time. readArgs are passed to
+   # returnField after the time record (i.e. a prefix or GMI array name).
+   # Pass the zonalStats returned for one file to continue over the next
+   # (daily) file.
+   #---------------------------------------------------------------------------
+
+   def returnZonalStatistics (self, fieldName, timeRecords=None, readArgs=[], \
+                                 zonalStats=None, weights=None):
+
+      if zonalStats == None: zonalStats = ZonalStatsTools (weights)
+
+      if timeRecords == None: timeRecords = range(0, self.timeLength)
+
+      for timeRecord in timeRecords:
+         zonalStats.addRecord (self.returnField (fieldName, timeRecord, *readArgs))
+
+      return zonalStats
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Array level comparisons. field1 and field2 may be any shape that numpy
+   # can broadcast (2D slices, 3D fields or 4D time blocks). Cells masked in
+   # either input are masked in the result. Special cases are set explicitly:
+   #
+   # zeroOverZero     - value where both fields are 0
+   # positiveOverZero - value where field1 > 0 and field2 is 0 (None: +inf)
+   # negativeOverZero - value where field1 < 0 and field2 is 0 (None: -inf)
+   # nanValue         - value where the result is NaN (None: leave NaN)
+   #---------------------------------------------------------------------------
+
+   def returnComparisonMask (self, field1, field2):
+
+      return numpy.ma.getmaskarray(field1) | numpy.ma.getmaskarray(field2)
+
+
+   def applyComparisonMask (self, result, field1, field2, nanValue):
 
-         for lev in range(0,levPoints):
-            for lat in range(0,latPoints):
-               if field1[lev,lat] == 0.0 and field2[lev,lat] == 0.0:
-                  fieldDiff[lev,lat] = 1.0
-                  print ("Updating to 1.0")
-               if field1[lev,lat] != 0.0 and field2[lev,lat] == 0.0:
-                  if field1[lev,lat] > 0.0: fieldDiff[lev,lat] = 1.5
-                  if field1[lev,lat] < 0.0: fieldDiff[lev,lat] = .5
-                  print ("Found ratio .5 away from 1!")
+      if nanValue != None:
+         result[numpy.isnan(result)] = nanValue
 
+      mask = self.returnComparisonMask (field1, field2)
+      if mask.any():
+         return numpy.ma.masked_array(result, mask=mask)
 
-         minDiff = fieldDiff.min()
-         maxDiff = fieldDiff.max()
+      return result
 
+
+   def returnRatio (self, field1, field2, zeroOverZero=1.0, \
+                       positiveOverZero=None, negativeOverZero=None, \
+                       nanValue=None):
+
+      data1 = numpy.ma.getdata(field1)
+      data2 = numpy.ma.getdata(field2)
+
+      with numpy.errstate(divide='ignore', invalid='ignore'):
+         ratio = numpy.true_divide(data1, data2)
+
+      ratio = numpy.atleast_1d(ratio)
+
+      denZero = data2 == 0.0
+      ratio[denZero & (data1 == 0.0)] = zeroOverZero
+      if positiveOverZero != None:
+         ratio[denZero & (data1 > 0.0)] = positiveOverZero
+      if negativeOverZero != None:
+         ratio[denZero & (data1 < 0.0)] = negativeOverZero
+
+      return self.applyComparisonMask (ratio, field1, field2, nanValue)
+
+
+   def returnAbsoluteDifference (self, field1, field2, nanValue=None):
+
+      diff = numpy.atleast_1d(numpy.ma.getdata(field1) - numpy.ma.getdata(field2))
+
+      return self.applyComparisonMask (diff, field1, field2, nanValue)
+
+
+   # Percent difference relative to the mean of both fields
+   def returnPercentDifference (self, field1, field2, zeroOverZero=0.0, \
+                                   nanValue=None):
+
+      data1 = numpy.ma.getdata(field1)
+      data2 = numpy.ma.getdata(field2)
+
+      with numpy.errstate(divide='ignore', invalid='ignore'):
+         percDiff = numpy.true_divide(numpy.abs(data1 - data2), \
+                                         (data1 + data2) / 2.0) * 100.
+
+      percDiff = numpy.atleast_1d(percDiff)
+      percDiff[(data1 == 0.0) & (data2 == 0.0)] = zeroOverZero
+
+      return self.applyComparisonMask (percDiff, field1, field2, nanValue)
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Summary statistics of a difference array over its finite, unmasked cells.
+   #---------------------------------------------------------------------------
+
+   def returnDifferenceStatistics (self, fieldDiff):
+
+      validDiff = numpy.ma.masked_invalid(fieldDiff)
+      validCount = validDiff.count()
+
+      stats = {'count' : int(validCount), \
+                  'invalidCount' : int(validDiff.size - validCount)}
+
+      if validCount == 0:
+         for key in ['min', 'max', 'mean', 'std', 'rms', 'absMax']:
+            stats[key] = numpy.nan
+         return stats
+
+      stats['min'] = float(validDiff.min())
+      stats['max'] = float(validDiff.max())
+      stats['mean'] = float(validDiff.mean())
+      stats['std'] = float(validDiff.std())
+      stats['rms'] = float(numpy.sqrt((validDiff.astype(numpy.float64)**2).mean()))
+      stats['absMax'] = max(abs(stats['min']), abs(stats['max']))
+
+      return stats
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Difference analysis for fields of any rank, i.e. (lev, lat) zonal means
+   # or full (time, lev, lat, lon) blocks. analysisType is "d" (percent
+   # difference), "s" (simple difference) or "r" (ratio).
+   #
+   # Returns the difference array, the color bounds and the statistics from
+   # returnDifferenceStatistics. bounds holds the asymmetric data range
+   # ('min', 'max') and the range centered on zero ('symMin', 'symMax').
+   #---------------------------------------------------------------------------
+
+   def returnDifferenceAnalysis (self, field1, field2, analysisType):
+
+      if analysisType == "d":
+         fieldDiff = self.returnPercentDifference (field1, field2, nanValue=0.0)
+      elif analysisType == "s":
+         fieldDiff = self.returnAbsoluteDifference (field1, field2)
+      elif analysisType == "r":
+         fieldDiff = self.returnRatio (field1, field2, positiveOverZero=1.5, \
+                                          negativeOverZero=.5)
       else:
          print ("")
-         print ("Analysis type not supported: ", analysisType)
+         print ("Analysis type not supported: " + str(analysisType))
          print ("")
-           
-      
-      return minDiff, maxDiff, fieldDiff
+         sys.exit(0)
+
+      stats = self.returnDifferenceStatistics (fieldDiff)
+
+      bounds = {'min' : stats['min'], 'max' : stats['max'], \
+                   'symMin' : -stats['absMax'], 'symMax' : stats['absMax']}
+
+      return fieldDiff, bounds, stats
+
+
+   #---------------------------------------------------------------------------
+   # Kept for the zonal mean drivers. fieldDiff is no longer filled in place;
+   # use the returned array. Simple differences get bounds centered on zero.
+   #---------------------------------------------------------------------------
+
+   def doDifferenceAnalysis (self, field1, field2, analysisType, fieldDiff=None):
+
+      if field1.shape != field2.shape:
+         print ("Fields of different sizes are not supported for difference analysis!")
+         sys.exit(0)
+
+      fieldDiff, bounds, stats = self.returnDifferenceAnalysis (field1, field2, \
+                                                                   analysisType)
+
+      if analysisType == "s":
+         return bounds['symMin'], bounds['symMax'], fieldDiff
+
+      return bounds['min'], bounds['max'], fieldDiff
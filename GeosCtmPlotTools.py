@@ -55,14 +55,6 @@ class GeosCtmPlotTools (GenericModelPlotTools):
          if token.isdigit():
             self.DATE = token
 
-      self.KNOWN_TRACERS = []
-      self.KNOWN_TRACERS.append('CH3I')
-      self.KNOWN_TRACERS.append('Pb210')
-      self.KNOWN_TRACERS.append('Rn222')
-      self.KNOWN_TRACERS.append('aoa')
-      self.KNOWN_TRACERS.append('e90')
-      self.KNOWN_TRACERS.append('st80_25')
-
    #---------------------------------------------------------------------------  
    # AUTHORS: Megan Damon NASA GSFC 
    #
@@ -87,17 +79,31 @@ class GeosCtmPlotTools (GenericModelPlotTools):
 
 
 
-   def returnField (self, fieldName, timeRecord, prefix=''):
+   #---------------------------------------------------------------------------  
+   # AUTHORS: Megan Damon NASA GSFC 
+   #
+   # DESCRIPTION: 
+   # Returns one time record of a field. levIndex, latIndex and longIndex
+   # select part of the record (int, slice or increasing list of indices)
+   # and only that part is read from the file. levIndex is ignored for
+   # 2D fields. An int removes the dimension, i.e. levIndex=35 returns a
+   # (lat, lon) map and latIndex=i, longIndex=j a column.
+   #---------------------------------------------------------------------------  
+
+   def returnField (self, fieldName, timeRecord, prefix='', levIndex=None, \
+                       latIndex=None, longIndex=None):
 
       print "Return time record: ", timeRecord, " for : ", fieldName
 
       fieldName = prefix + fieldName
 
 
-      if fieldName not in self.KNOWN_TRACERS:
-         fieldAllTime = self.hdfData.variables[fieldName.upper()]
-      else:
-         fieldAllTime = self.hdfData.variables[fieldName]
+      # the name as spelled in the file, whatever the case asked for
+      variableName = self.returnVariableName (fieldName)
+      if variableName == None:
+         raise KeyError("Field " + fieldName + " is not in " + self.fileName)
+
+      fieldAllTime = self.hdfData.variables[variableName]
 
 
 
@@ -117,17 +123,20 @@ class GeosCtmPlotTools (GenericModelPlotTools):
 
       print ""
       print "Dims of array: ", len(fieldAllTime.shape)
-      print "No Time? ", self.time==None
+      print "No Time? ", self.time is None
       print "Shape: ", fieldAllTime.shape 
       print ""
 
+      if levIndex is None: levIndex = slice(None)
+      if latIndex is None: latIndex = slice(None)
+
       if len(fieldAllTime.shape[:]) == 4:                                         
-         return fieldAllTime[returnTime, :, :, :]
-      elif len(fieldAllTime.shape[:]) == 3 and self.time==None:
-         return fieldAllTime[:, :, :]
+         return self.readVariable (fieldAllTime, (returnTime, levIndex, latIndex), longIndex)
+      elif len(fieldAllTime.shape[:]) == 3 and self.time is None:
+         return self.readVariable (fieldAllTime, (levIndex, latIndex), longIndex)
       elif len(fieldAllTime.shape[:]) == 2:
-         return fieldAllTime[:,:]
+         return self.readVariable (fieldAllTime, (latIndex,), longIndex)
       else:
-         return fieldAllTime[returnTime, :, :]
+         return self.readVariable (fieldAllTime, (returnTime, latIndex), longIndex)
 
 
@@ -21,6 +21,7 @@ from numpy import *
 from netCDF4 import Dataset
 
 from GenericModelPlotTools import GenericModelPlotTools
+from CacheTools import writeCacheObject
 
 
 
@@ -102,6 +103,9 @@ class GmiPlotTools (GenericModelPlotTools):
 
    def addSpeciesToFieldList (self, speciesVar):
 
+      # lower case species name -> index in the const array
+      self.speciesIndex = {}
+
       if speciesVar == None:
          print ""
          print "speciesVar is None"
@@ -111,15 +115,60 @@ class GmiPlotTools (GenericModelPlotTools):
       print "Will extract species names from: ", speciesVar
       self.speciesVar = speciesVar
 
-      speciesArray = self.hdfData.variables[speciesVar]
+      if speciesVar in self.inventory['speciesNames']:
+         self.speciesNames = list(self.inventory['speciesNames'][speciesVar])
+
+      else:
+         speciesArray = self.hdfData.variables[speciesVar]
 
-      self.speciesNames = []
-      for sp in speciesArray[:]:
-         self.speciesNames.append(re.sub(r'\W+', '', str(sp)))
+         self.speciesNames = []
+         for sp in speciesArray[:]:
+            self.speciesNames.append(re.sub(r'\W+', '', str(sp)))
+
+         self.inventory['speciesNames'][speciesVar] = list(self.speciesNames)
+         writeCacheObject (self.inventoryFile, self.inventory)
 
       for species in self.speciesNames[:]:
          self.fieldList.append(species)
 
+      speciesCount = 0
+      for species in self.speciesNames[:]:
+         if species.lower() not in self.speciesIndex:
+            self.speciesIndex[species.lower()] = speciesCount
+         speciesCount = speciesCount + 1
+
+
+   def returnSpeciesIndex (self, fieldName):
+
+      if fieldName.lower() not in self.speciesIndex:
+         raise KeyError("Species " + fieldName + " is not in " + str(self.gmiConstString))
+
+      return self.speciesIndex[fieldName.lower()]
+
+
+   #---------------------------------------------------------------------------  
+   # AUTHORS: Megan Damon NASA GSFC 
+   #
+   # DESCRIPTION: 
+   # Returns the name of the array holding the species for arrayName
+   # (const, scav, wet_depos, etc.)
+   #---------------------------------------------------------------------------  
+
+   def returnConstVarName (self, arrayName):
+
+      if arrayName == 'SCAV_' or arrayName == 'scav':
+         return 'scav'
+      elif self.gmiConstString == "const_labels":
+         return "const"
+      elif self.gmiConstString == 'wetdep_spc_labels':
+         return "wet_depos"
+      elif self.gmiConstString == 'drydep_spc_labels':
+         return "dry_depos"
+      elif self.gmiConstString == 'freq2_labels':
+         return "const_freq2"
+      else:
+         return "const_freq1"
+
 
 
    def returnConstantField (self, fieldName):
@@ -134,26 +183,22 @@ class GmiPlotTools (GenericModelPlotTools):
                
       fieldArray = self.hdfData.variables[fieldName]   
 
-      returnArray = fieldArray[:,:]
+      returnArray = self.readVariable (fieldArray, (slice(None),))
 
       return returnArray
 
 
-   def returnField (self, fieldName, timeRecord, arrayName):
+   #---------------------------------------------------------------------------
+   # Returns one time record of a field. levIndex (int, slice or increasing
+   # list of indices) selects levels of 3D fields, and only those are read.
+   #---------------------------------------------------------------------------
 
+   def returnField (self, fieldName, timeRecord, arrayName, levIndex=None):
 
-      if arrayName == 'SCAV_' or arrayName == 'scav':
-         self.constVarName = 'scav'
-      elif self.gmiConstString == "const_labels":
-         self.constVarName = "const"
-      elif self.gmiConstString == 'wetdep_spc_labels':
-         self.constVarName = "wet_depos"
-      elif self.gmiConstString == 'drydep_spc_labels':
-         self.constVarName = "dry_depos"
-      elif self.gmiConstString == 'freq2_labels':
-         self.constVarName = "const_freq2"
-      else:
-         self.constVarName = "const_freq1"
+
+      self.constVarName = self.returnConstVarName (arrayName)
+
+      if levIndex is None: levIndex = slice(None)
 
 
       print fieldName
@@ -179,9 +224,10 @@ class GmiPlotTools (GenericModelPlotTools):
 
             if fieldName.lower() != "flashrate_nc" and fieldName.lower() != 'lfr' \
                    and fieldName.lower () != "mcor" and fieldName.lower() != "psf":
-               returnArray = fieldArray[timeRecord,:,:,:]
+               returnArray = self.readVariable (fieldArray, \
+                                                  (timeRecord, levIndex, slice(None)))
             else:
-               returnArray = fieldArray[timeRecord,:,:]
+               returnArray = self.readVariable (fieldArray, (timeRecord, slice(None)))
 
 
       else:
@@ -192,14 +238,7 @@ class GmiPlotTools (GenericModelPlotTools):
 
          speciesArray = self.hdfData.variables[self.constVarName]
 
-
-         print self.speciesNames[:]
-
-         indexLocation = 0
-         for speciesName in self.speciesNames[:]:
-            if speciesName.lower() == fieldName.lower():
-               break
-            indexLocation = indexLocation + 1
+         indexLocation = self.returnSpeciesIndex (fieldName)
  
          if speciesArray.shape[0] - 1 < timeRecord: 
             print ""
@@ -215,13 +254,74 @@ class GmiPlotTools (GenericModelPlotTools):
 
       
          if len(speciesArray.shape[:]) == 5:
-            returnArray = speciesArray[returnTime,indexLocation,:,:,:]    
+            returnArray = self.readVariable (speciesArray, \
+                                                (returnTime, indexLocation, \
+                                                    levIndex, slice(None)))
          if len(speciesArray.shape[:]) == 4:
-            returnArray = speciesArray[returnTime, indexLocation,:,:]
+            returnArray = self.readVariable (speciesArray, \
+                                                (returnTime, indexLocation, slice(None)))
 
 
       return returnArray
 
+
+   #---------------------------------------------------------------------------  
+   # AUTHORS: Megan Damon NASA GSFC 
+   #
+   # DESCRIPTION: 
+   # Returns a dictionary of field name -> array for one time record. All
+   # species in fieldNames are read from the const array in one netCDF read;
+   # any other names are read with returnField. levels (int, slice or
+   # increasing list) selects levels of the species read.
+   #---------------------------------------------------------------------------  
+
+   def returnFields (self, fieldNames, timeRecord, arrayName, levels=None):
+
+      fields = {}
+
+      speciesFields = []
+      for fieldName in fieldNames[:]:
+         if fieldName.lower() in self.speciesIndex:
+            speciesFields.append(fieldName)
+         else:
+            fields[fieldName] = self.returnField (fieldName, timeRecord, arrayName)
+
+      if len(speciesFields) == 0: return fields
+
+      self.constVarName = self.returnConstVarName (arrayName)
+      speciesArray = self.hdfData.variables[self.constVarName]
+
+      if speciesArray.shape[0] - 1 < timeRecord: 
+         print ""
+         print "WARNING: time record: ", timeRecord, " is not avail. in GMI. ", \
+             " Using rec dim 0"
+         print ""
+         returnTime = 0
+      else:
+         returnTime = timeRecord
+
+      indices = sorted(set([self.returnSpeciesIndex(fieldName) \
+                               for fieldName in speciesFields]))
+
+      print ""
+      print "Extracting ", len(indices), " species from GMI ", self.constVarName
+      print ""
+
+      if levels is None: levels = slice(None)
+
+      if len(speciesArray.shape[:]) == 5:
+         speciesBlock = self.readVariable (speciesArray, \
+                                              (returnTime, indices, levels, slice(None)))
+      else:
+         speciesBlock = self.readVariable (speciesArray, \
+                                              (returnTime, indices, slice(None)))
+
+      for fieldName in speciesFields[:]:
+         fields[fieldName] = speciesBlock[indices.index(self.returnSpeciesIndex(fieldName))]
+
+      return fields
+
+
    def returnFlashRateData (self, fieldName, yearIndex, monthIndex):
 
       print ""
@@ -230,25 +330,14 @@ class GmiPlotTools (GenericModelPlotTools):
 
 
       fieldArray = self.hdfData.variables[fieldName]   
-      returnArray = fieldArray[yearIndex,monthIndex,:,:]
+      returnArray = self.readVariable (fieldArray, (yearIndex, monthIndex, slice(None)))
 
       return returnArray
 
    def returnFieldAtSurface (self, fieldName, timeRecord, arrayName):
 
 
-      if arrayName == 'SCAV_' or arrayName == 'scav':
-         self.constVarName = 'scav'
-      elif self.gmiConstString == "const_labels":
-         self.constVarName = "const"
-      elif self.gmiConstString == 'wetdep_spc_labels':
-         self.constVarName = "wet_depos"
-      elif self.gmiConstString == 'drydep_spc_labels':
-         self.constVarName = "dry_depos"
-      elif self.gmiConstString == 'freq2_labels':
-         self.constVarName = "const_freq2"
-      else:
-         self.constVarName = "const_freq1"
+      self.constVarName = self.returnConstVarName (arrayName)
 
 
       if fieldName.lower() == "moistq" or fieldName.lower() == "EM_LGTNO":
@@ -267,7 +356,8 @@ class GmiPlotTools (GenericModelPlotTools):
          else:
             returnTime = timeRecord
 
-         returnArray = fieldArray[timeRecord,:,:,:]
+         returnArray = self.readVariable (fieldArray, \
+                                             (timeRecord, slice(None), slice(None)))
 
       else:
 
@@ -277,14 +367,7 @@ class GmiPlotTools (GenericModelPlotTools):
 
          speciesArray = self.hdfData.variables[self.constVarName]
 
-
-         print self.speciesNames[:]
-
-         indexLocation = 0
-         for speciesName in self.speciesNames[:]:
-            if speciesName.lower() == fieldName.lower():
-               break
-            indexLocation = indexLocation + 1
+         indexLocation = self.returnSpeciesIndex (fieldName)
  
          if speciesArray.shape[0] - 1 < timeRecord: 
             print ""
@@ -300,9 +383,10 @@ class GmiPlotTools (GenericModelPlotTools):
 
       
          if len(speciesArray.shape[:]) == 5:
-            returnArray = speciesArray[returnTime,indexLocation,0,:,:]    
+            returnArray = self.readVariable (speciesArray, \
+                                                (returnTime, indexLocation, 0, slice(None)))
          if len(speciesArray.shape[:]) == 4:
-            returnArray = speciesArray[returnTime, indexLocation,0,:]
+            returnArray = self.readVariable (speciesArray, (returnTime, indexLocation, 0))
 
 
       return returnArray
@@ -0,0 +1,183 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# Renders the comparison figures of several levels of one field (i.e. the
+# 992/506/192 mb plots) with a pool of worker processes, one figure per
+# level. The level slices are copied once into a shared memory block that
+# the workers inherit, so no field data is pickled; each task only carries
+# its offsets, titles and limits. Each worker reuses one SliceFigureTools.
+#------------------------------------------------------------------------------
+
+import sys
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+import numpy
+
+from MapTools import returnMapObjects
+from SliceFigureTools import SliceFigureTools
+
+
+
+# Shared panel data and plotting objects of one worker process
+_workerLevels = None
+
+
+
+def _initLevelWorker (sharedData, gridInfo):
+
+   global _workerLevels
+
+   baseMap, gridLons, gridLats, X_grid, Y_grid = \
+       returnMapObjects (gridInfo['minLat'], gridInfo['maxLat'], \
+                            gridInfo['minLong'], gridInfo['maxLong'], \
+                            gridInfo['latSize'], gridInfo['longSize'])
+
+   _workerLevels = {'data' : numpy.frombuffer(sharedData, numpy.float64), \
+                       'sliceFigure' : SliceFigureTools (baseMap, X_grid, Y_grid, \
+                                                            [gridInfo['minLat'], \
+                                                                gridInfo['maxLat']], \
+                                                            [gridInfo['minLong'], \
+                                                                gridInfo['maxLong']], \
+                                                            gridInfo['subplotNums'], \
+                                                            renderMode=gridInfo['renderMode'])}
+
+
+#---------------------------------------------------------------------------
+# One panel of a level plot; same arguments as SliceFigureTools.updatePanel.
+#---------------------------------------------------------------------------
+
+def createPanel (z, minMaxVals, subplotNum, plotTitle, colorMap):
+
+   return {'z' : z, 'minMaxVals' : minMaxVals, 'subplotNum' : subplotNum, \
+              'title' : plotTitle, 'colorMap' : colorMap}
+
+
+#---------------------------------------------------------------------------
+# Pool entry point. Returns the output file name and None on success or the
+# error message on failure.
+#---------------------------------------------------------------------------
+
+def _plotLevelTask (task):
+
+   try:
+      sliceFigure = _workerLevels['sliceFigure']
+
+      for panel in task['panels']:
+         offset, shape = panel['offset'], panel['shape']
+         z = _workerLevels['data'][offset:offset + shape[0] * shape[1]].reshape(shape)
+
+         sliceFigure.updatePanel (numpy.ma.masked_invalid(z), panel['minMaxVals'], \
+                                     panel['subplotNum'], panel['title'], \
+                                     panel['colorMap'])
+
+      sliceFigure.savePlot (task['outFile'])
+
+   except Exception as err:
+      return task['outFile'], str(err)
+
+   sys.stdout.flush()
+
+   return task['outFile'], None
+
+
+#---------------------------------------------------------------------------
+# Copies every panel's (lat, lon) array into one shared float64 block
+# (masked cells become NaN) and returns the block and the tasks, whose
+# panels hold an offset and shape in place of z.
+#---------------------------------------------------------------------------
+
+def returnSharedTasks (levelPlots):
+
+   totalSize = 0
+   for levelPlot in levelPlots:
+      for panel in levelPlot['panels']:
+         totalSize = totalSize + numpy.size(panel['z'])
+
+   sharedData = RawArray('d', totalSize)
+   data = numpy.frombuffer(sharedData, numpy.float64)
+
+   tasks = []
+   offset = 0
+   for levelPlot in levelPlots:
+      panels = []
+      for panel in levelPlot['panels']:
+         z = numpy.ma.filled(numpy.ma.asarray(panel['z'], numpy.float64), numpy.nan)
+         data[offset:offset + z.size] = z.ravel()
+
+         sharedPanel = dict(panel)
+         del sharedPanel['z']
+         sharedPanel['offset'] = offset
+         sharedPanel['shape'] = z.shape
+         panels.append(sharedPanel)
+
+         offset = offset + z.size
+
+      tasks.append({'outFile' : levelPlot['outFile'], 'panels' : panels})
+
+   return sharedData, tasks
+
+
+#---------------------------------------------------------------------------
+# Plots levelPlots on the grid of modelObject. Each level plot is
+#    {'outFile' : file name, 'panels' : [createPanel (...), ...]}
+# With numProcesses > 1 the levels are rendered at the same time, so the
+# time per field is that of the slowest level. Returns the output file
+# names that failed.
+#---------------------------------------------------------------------------
+
+def plotLevels (modelObject, levelPlots, numProcesses=1):
+
+   if len(levelPlots) == 0: return []
+
+   subplotNums = sorted(set([panel['subplotNum'] for levelPlot in levelPlots \
+                                for panel in levelPlot['panels']]))
+
+   numWorkers = min(numProcesses, len(levelPlots))
+
+   # one level at a time in this process, on one figure
+   if numWorkers <= 1:
+      sliceFigure = modelObject.createSliceFigure (subplotNums)
+      for levelPlot in levelPlots:
+         for panel in levelPlot['panels']:
+            sliceFigure.updatePanel (panel['z'], panel['minMaxVals'], \
+                                        panel['subplotNum'], panel['title'], \
+                                        panel['colorMap'])
+         sliceFigure.savePlot (levelPlot['outFile'])
+      sliceFigure.close ()
+      return []
+
+   gridInfo = {'minLat' : float(modelObject.minLat), \
+                  'maxLat' : float(modelObject.maxLat), \
+                  'minLong' : float(modelObject.minLong), \
+                  'maxLong' : float(modelObject.maxLong), \
+                  'latSize' : modelObject.latSize, \
+                  'longSize' : modelObject.longSize, \
+                  'subplotNums' : subplotNums, \
+                  'renderMode' : modelObject.renderMode}
+
+   sharedData, tasks = returnSharedTasks (levelPlots)
+
+   print ("Rendering " + str(len(tasks)) + " levels with " + \
+             str(numWorkers) + " workers")
+
+   pool = multiprocessing.Pool(processes=numWorkers, \
+                                  initializer=_initLevelWorker, \
+                                  initargs=(sharedData, gridInfo))
+   results = pool.map(_plotLevelTask, tasks, chunksize=1)
+   pool.close()
+   pool.join()
+
+   failed = []
+   for outFile, error in results:
+      if error != None:
+         print ("ERROR: failed to plot " + outFile + " : " + error)
+         failed.append(outFile)
+
+   return failed
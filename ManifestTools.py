@@ -0,0 +1,165 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class keeps the run manifest of a plot directory: for every plot, the
+# fingerprints of the model files it was made from, the field, level, time
+# record, analysis type and code version. A unit of work (one field's plots)
+# is keyed by all of these, so drivers can skip fields whose plots are
+# already up to date and re-render only the stale or missing ones.
+#------------------------------------------------------------------------------
+
+import os
+import json
+import hashlib
+import tempfile
+
+from CacheTools import returnFileKey
+
+
+
+#---------------------------------------------------------------------------
+# Code version: hash of the contents of the source files that make a plot
+# (the driver and the modules it uses).
+#---------------------------------------------------------------------------
+
+def returnCodeVersion (sourceFiles):
+
+   md5 = hashlib.md5()
+   for sourceFile in sorted(sourceFiles):
+      md5.update(os.path.basename(sourceFile).encode('utf-8'))
+      md5.update(b'|')
+      if os.path.exists(sourceFile):
+         myFile = open(sourceFile, "rb")
+         try:
+            md5.update(myFile.read())
+         finally:
+            myFile.close()
+      md5.update(b'|')
+
+   return md5.hexdigest()
+
+
+
+#---------------------------------------------------------------------------
+# What one plot was made from, as stored in the manifest.
+#---------------------------------------------------------------------------
+
+def returnOutputRecord (inputFiles, field, level, timeRecord, analysisType, \
+                           codeVersion):
+
+   inputs = []
+   for inputFile in inputFiles:
+      fileStat = os.stat(inputFile)
+      inputs.append({'file':os.path.abspath(inputFile), 'mtime':fileStat.st_mtime, \
+                        'size':fileStat.st_size, 'key':returnFileKey (inputFile)})
+
+   return {'inputs':inputs, 'field':field, 'level':str(level), \
+              'timeRecord':timeRecord, 'analysisType':analysisType, \
+              'codeVersion':codeVersion}
+
+
+
+class ManifestTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. manifestFile is a JSON file, usually in the plot
+   # directory; it is created by the first save.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, manifestFile):
+
+      self.manifestFile = manifestFile
+      self.manifest = {'outputs':{}, 'tasks':{}}
+
+      if os.path.exists(manifestFile):
+         try:
+            myFile = open(manifestFile, "r")
+            try:
+               self.manifest = json.load(myFile)
+            finally:
+               myFile.close()
+         except (IOError, ValueError):
+            print ("WARNING: ignoring unreadable manifest: " + manifestFile)
+
+
+   #---------------------------------------------------------------------------
+   # Key of one unit of work: the current fingerprint (path, modification
+   # time, size) of each input file and every parameter of the plots.
+   #---------------------------------------------------------------------------
+
+   def returnTaskKey (self, inputFiles, parameters):
+
+      md5 = hashlib.md5()
+      for inputFile in inputFiles:
+         md5.update(returnFileKey (inputFile).encode('utf-8'))
+         md5.update(b'|')
+      for name in sorted(parameters.keys()):
+         md5.update((str(name) + "=" + str(parameters[name])).encode('utf-8'))
+         md5.update(b'|')
+
+      return md5.hexdigest()
+
+
+   #---------------------------------------------------------------------------
+   # True when every plot recorded for taskKey still exists and was last
+   # written by that task.
+   #---------------------------------------------------------------------------
+
+   def isUpToDate (self, taskKey):
+
+      if taskKey not in self.manifest['tasks']: return False
+
+      outFiles = self.manifest['tasks'][taskKey]
+      if len(outFiles) == 0: return False
+
+      for outFile in outFiles:
+         if not os.path.exists(outFile): return False
+         if outFile not in self.manifest['outputs']: return False
+         if self.manifest['outputs'][outFile]['taskKey'] != taskKey: return False
+
+      return True
+
+
+   #---------------------------------------------------------------------------
+   # Records the plots of a finished task. records maps each output file to
+   # what it was made from (inputs, field, level, time record, analysis
+   # type, code version).
+   #---------------------------------------------------------------------------
+
+   def recordTask (self, taskKey, records):
+
+      for outFile in records.keys():
+         oldKey = self.manifest['outputs'].get(outFile, {}).get('taskKey')
+         if oldKey != None and oldKey != taskKey:
+            self.manifest['tasks'].pop(oldKey, None)
+
+         record = dict(records[outFile])
+         record['taskKey'] = taskKey
+         self.manifest['outputs'][outFile] = record
+
+      self.manifest['tasks'][taskKey] = sorted(records.keys())
+
+
+   def save (self):
+
+      manifestDir = os.path.dirname(os.path.abspath(self.manifestFile))
+      if not os.path.exists(manifestDir): os.makedirs(manifestDir)
+
+      fileDesc, tmpFile = tempfile.mkstemp(dir=manifestDir)
+      myFile = os.fdopen(fileDesc, "w")
+      try:
+         json.dump(self.manifest, myFile, indent=1, sort_keys=True)
+      finally:
+         myFile.close()
+      os.rename(tmpFile, self.manifestFile)
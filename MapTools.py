@@ -0,0 +1,194 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# Cache of the Basemap projections and plotting grids used by the 2D slice
+# plots. A Basemap (and the coastlines it clips on construction) is built
+# once per map extent and saved on disk, the X/Y grid once per extent and
+# grid size, and the state boundaries are read from the shapefile once and
+# then redrawn from their saved segments. drawMapField draws a field with
+# one of the RENDER_MODES.
+#------------------------------------------------------------------------------
+
+import os
+import hashlib
+import numpy
+
+import matplotlib
+matplotlib.use('pdf')
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from mpl_toolkits.basemap import Basemap
+
+from CacheTools import returnCacheDir, readCacheObject, writeCacheObject
+
+
+
+# pcolor      - one vector polygon per grid cell (slow, large PDF files)
+# pcolormesh  - one mesh, rasterized inside the vector PDF
+# imshow      - one image (regular grids only; others use pcolormesh)
+RENDER_MODES = ["pcolor", "pcolormesh", "imshow"]
+
+# Basemaps already built by this process, keyed by map extent
+_baseMapCache = {}
+
+# (gridLons, gridLats, X_grid, Y_grid) keyed by map extent and grid size
+_gridCache = {}
+
+
+
+def returnMapKey (minLat, maxLat, minLong, maxLong, resolution):
+
+   md5 = hashlib.md5()
+   for key in [minLat, maxLat, minLong, maxLong]:
+      md5.update(repr(float(key)).encode('utf-8'))
+      md5.update(b'|')
+
+   return "cyl_" + resolution + "_" + md5.hexdigest()
+
+
+def returnMapCacheFile (mapKey):
+
+   return os.path.join(returnCacheDir("basemap"), mapKey + ".pkl")
+
+
+#---------------------------------------------------------------------------
+# Returns the cylindrical Basemap for this extent. It comes from memory if
+# this process has built it, else from disk, else it is built and saved.
+#---------------------------------------------------------------------------
+
+def returnBaseMap (minLat, maxLat, minLong, maxLong, resolution='c'):
+
+   mapKey = returnMapKey (minLat, maxLat, minLong, maxLong, resolution)
+
+   if mapKey in _baseMapCache:
+      return _baseMapCache[mapKey]
+
+   baseMap = readCacheObject (returnMapCacheFile(mapKey))
+
+   if baseMap == None:
+      print ("Building Basemap: " + mapKey)
+      baseMap = Basemap(llcrnrlon=minLong, \
+                           llcrnrlat=minLat, \
+                           urcrnrlon=maxLong, \
+                           urcrnrlat=maxLat, \
+                           projection='cyl', \
+                           resolution=resolution, \
+                           lat_0=(minLat + maxLat)/2., \
+                           lon_0=(minLong + maxLong)/2.)
+      baseMap.mapKey = mapKey
+      baseMap.stateSegments = None
+      writeCacheObject (returnMapCacheFile(mapKey), baseMap)
+
+   _baseMapCache[mapKey] = baseMap
+   return baseMap
+
+
+#---------------------------------------------------------------------------
+# Returns baseMap, gridLons, gridLats, X_grid, Y_grid for a latSize x
+# longSize grid covering this extent (what createPlotObjects needs).
+#---------------------------------------------------------------------------
+
+def returnMapObjects (minLat, maxLat, minLong, maxLong, latSize, longSize, \
+                         resolution='c'):
+
+   baseMap = returnBaseMap (minLat, maxLat, minLong, maxLong, resolution)
+
+   gridKey = (baseMap.mapKey, int(latSize), int(longSize))
+   if gridKey not in _gridCache:
+      gridLons, gridLats = baseMap.makegrid(int(longSize), int(latSize))
+      X_grid, Y_grid = baseMap(gridLons, gridLats)
+      _gridCache[gridKey] = (gridLons, gridLats, X_grid, Y_grid)
+
+   gridLons, gridLats, X_grid, Y_grid = _gridCache[gridKey]
+
+   return baseMap, gridLons, gridLats, X_grid, Y_grid
+
+
+#---------------------------------------------------------------------------
+# Draws the coastlines and state boundaries on ax (default: current axes).
+# Basemap.drawstates reads the boundary shapefile on every call, so its
+# segments are kept on the Basemap (and in its disk cache) after the first
+# call and later maps only add a LineCollection.
+#---------------------------------------------------------------------------
+
+def drawMapBoundaries (baseMap, ax=None):
+
+   if ax == None: ax = plt.gca()
+
+   baseMap.drawcoastlines(ax=ax)
+
+   if getattr(baseMap, 'stateSegments', None) is None:
+      states = baseMap.drawstates(ax=ax)
+      baseMap.stateSegments = states.get_segments()
+      if hasattr(baseMap, 'mapKey'):
+         writeCacheObject (returnMapCacheFile(baseMap.mapKey), baseMap)
+   else:
+      states = LineCollection(baseMap.stateSegments, linewidths=0.5, \
+                                 colors='k', antialiaseds=(1,))
+      states.set_label('_nolabel_')
+      ax.add_collection(states)
+      baseMap.set_axes_limits(ax=ax)
+
+   return states
+
+
+#---------------------------------------------------------------------------
+# True when X_grid/Y_grid (as made by returnMapObjects) are evenly spaced
+# and increasing, so cells can be drawn as the pixels of one image.
+#---------------------------------------------------------------------------
+
+def isRegularGrid (X_grid, Y_grid):
+
+   xSpacing = numpy.diff(X_grid, axis=1)
+   ySpacing = numpy.diff(Y_grid, axis=0)
+
+   if xSpacing.size == 0 or ySpacing.size == 0: return False
+   if xSpacing.min() <= 0.0 or ySpacing.min() <= 0.0: return False
+
+   return numpy.allclose(xSpacing, xSpacing.flat[0]) and \
+       numpy.allclose(ySpacing, ySpacing.flat[0]) and \
+       numpy.allclose(X_grid, X_grid[0:1, :]) and \
+       numpy.allclose(Y_grid, Y_grid[:, 0:1])
+
+
+#---------------------------------------------------------------------------
+# Draws z on ax (default: current axes) with the grid points as cell
+# corners, as pcolor does, and returns the mappable for the colorbar.
+# The data layer is rasterized in every mode but pcolor, so labels,
+# coastlines and boundaries stay vector.
+#---------------------------------------------------------------------------
+
+def drawMapField (baseMap, X_grid, Y_grid, z, colorMap, minMaxVals, \
+                     renderMode="pcolormesh", ax=None):
+
+   if renderMode not in RENDER_MODES:
+      raise ValueError("Render mode must be one of " + str(RENDER_MODES) + \
+                          ", not: " + str(renderMode))
+
+   if ax == None: ax = plt.gca()
+
+   z = numpy.ma.masked_invalid(z)
+
+   if renderMode == "imshow" and isRegularGrid (X_grid, Y_grid):
+      image = ax.imshow(z[:-1, :-1], cmap=colorMap, \
+                           vmin=minMaxVals[0], vmax=minMaxVals[1], \
+                           origin='lower', interpolation='nearest', aspect='auto', \
+                           extent=[X_grid.min(), X_grid.max(), \
+                                      Y_grid.min(), Y_grid.max()])
+      plt.sci(image)
+      return image
+
+   if renderMode == "pcolor":
+      return baseMap.pcolor(X_grid, Y_grid, z, cmap=colorMap, \
+                               vmin=minMaxVals[0], vmax=minMaxVals[1], ax=ax)
+
+   return baseMap.pcolormesh(X_grid, Y_grid, z, cmap=colorMap, \
+                                vmin=minMaxVals[0], vmax=minMaxVals[1], \
+                                rasterized=True, ax=ax)
@@ -26,10 +26,6 @@ matplotlib.use('pdf')
 import matplotlib.pyplot as plt
 
 
-import multiprocessing
-from time import sleep
-from multiprocessing import Pool
-
 from netCDF4 import Dataset
 
 import math
@@ -50,12 +46,7 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
-
-
-
-def worker (command):
-    print "I will execute: ", command
-    return os.system(command)
+from BatchCompareTools import BatchCompareTools
 
 
 
@@ -68,8 +59,8 @@ def usage ():
     print "-r time record to plot"
     print "-d date of comparision (YYYYMM)"
     print "-u vertical level (lev/hPa)"
-    print "-n PBS_NODEFILE"
-    print "-p number of processes to use per node"
+    print "-n PBS_NODEFILE (not used, fields are plotted on this node)"
+    print "-p number of local processes to plot with"
     print "-m configuration name (Replay, CCM, etc.)"
     print ""
     sys.exit (0)
@@ -122,10 +113,6 @@ if len(dateYearMonth) != 6:
     print "Received: ", dateYearMonth
     sys.exit(0)
 
-if not os.path.exists (pbsNodeFile): 
-    print "The file you provided does not exist: ", pbsNodeFile
-    sys.exit(0)
-
 if numProcesses <= 0:
     print "Number of processes must be larger than 0! "
     print "Given: ", numProcesses
@@ -198,107 +185,24 @@ print "Fields to compare: ", fieldsToCompare[:]
 print "GEOS-CTM 1 model levels: ", geosCtmObject1.lev[:]
 print ""
 
-nodes = geosCtmObject1.readNodesIntoArray (pbsNodeFile)
-print "nodes: ", nodes
-
-# print ""
-# print "*******************************"
-# print "Testing nodes for access..."
-# for node in nodes: 
-#     sysCommand = "ssh " + node + " \'uname -n \'"
-#     systemReturnCode = os.system(sysCommand)
-#     print sysCommand
-#     print systemReturnCode
-#     if systemReturnCode != 0:
-#         print "There is a problem with node: ", node
-#         sys.exit(0)
-
-# print "All nodes accessible"
-# print "*******************************"
-# print ""
-
-
-cwd = os.getcwd()
-print "current working directory: ", cwd
-
-
-
-commands = []
-fieldCount = 0 
-procCount = 0
-nodeCount = 0
-
-#geosCtmFile1, geosCtmFile2, timeRecord, dateYearMonth
-pythonCommand = "PlotField_GEOS-5.py -c  " + geosCtmFile1 \
-    + " -g " + geosCtmFile2 + " -r " + str(timeRecord) + " -d " + dateYearMonth \
-    + " -u " + levUnit
-#pythonCommand2 = "PlotField_ZonalMeanPressLevels.py -c "+ geosCtmFile1 \
-#    + " -g " + geosCtmFile2 + " -r " + str(timeRecord) + " -d " + dateYearMonth 
-
-print pythonCommand
-
-for field in fieldsToCompare[:]:
-
-    if procCount == numProcesses: 
-        print "node count exceeds num processes per node: ", procCount
-        procCount = 0
-        nodeCount = nodeCount + 1
-
-        if nodeCount >= len(nodes):
-            print ""
-            print "ERROR: nodeCount cannot be > len(nodes): ", nodeCount, \
-                " > ", len(nodes)
-            print "Use more processes or more nodes"
-            print "Number of processes per node: ", numProcesses
-            print ""
-            sys.exit(-1)
-
-    field = fieldsToCompare[fieldCount]
-
-    print ""
-    print "Processing: ", field, " to : ", nodes[nodeCount], " proc : ", procCount
-    print ""
-    
-
-    sysCommand = "ssh -XYqt " + nodes[nodeCount] +  " \'. " + cwd + \
-        "/setup_env ; cd " + cwd + " ; python " + cwd + "/" + \
-        pythonCommand + " -f " + str(field) + " -m " + configName + \
-        " \'"
-    commands.append(sysCommand)
-
-
-    #sysCommand = "ssh -XYqt " + nodes[nodeCount] + \
-    #    " \'. " + cwd + "/setup_env ; " + \
-    #    " cd " + cwd + " ; " + \
-    #    " python " + cwd + "/" + \
-    #    pythonCommand + " -f " + field + " -r " + configName \
-    #    + " \'"
-    #commands.append(sysCommand)
-
-
-
-    procCount = procCount + 1
-    fieldCount = fieldCount + 1
-
-
-print ""
-for command in commands[:]:
-    print command
-print ""
-
-
-
+#---------------------------------------------------------------
+# Both files stay open in this process. The fields are read once
+# and rendered by a local pool of numProcesses workers.
+#---------------------------------------------------------------
+batchObject = BatchCompareTools (geosCtmObject1, geosCtmObject2, \
+                                     configName + " " + geosCtmSimName1, \
+                                     configName + " " + geosCtmSimName2, \
+                                     dateYearMonth, numProcesses, \
+                                     ".inter." + configName + ".")
+batchObject.levelUnit = levUnit
+batchObject.ratioColorMap = "PuOr"
+batchObject.doZonalMeans = False
 
-pool = multiprocessing.Pool(processes=len(commands))
+modelLev = 35
+batchObject.mapLevels = {int(geosCtmObject1.lev[modelLev]) : modelLev}
 
-print ""
-print "Calling pool.map"
-pool.map(worker, commands)
-print ""
+failedFields = batchObject.plotFields (fieldsToCompare, timeRecord, "")
 
 print ""
-print "Calling pool.close"
-pool.close()
+print "Failed: ", failedFields[:]
 print ""
-
-
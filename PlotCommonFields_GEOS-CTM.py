@@ -50,13 +50,11 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
+from ExecutorTools import LocalExecutor, SshExecutor, createTask, returnFieldCost
+from ManifestTools import ManifestTools, returnCodeVersion, returnOutputRecord
 
 
 
-def worker (command):
-    print "I will execute: ", command
-    return os.system(command)
-
 
 
 NUM_ARGS = 6
@@ -67,7 +65,7 @@ def usage ():
     print "-g GEOS CTM file 2"
     print "-r time record to plot"
     print "-d date of comparision (YYYYMM)"
-    print "-n PBS_NODEFILE"
+    print "-n PBS_NODEFILE (or local to run on this node)"
     print "-p number of processes to use per node"
     print ""
     sys.exit (0)
@@ -118,7 +116,7 @@ if len(dateYearMonth) != 6:
     print "Received: ", dateYearMonth
     sys.exit(0)
 
-if not os.path.exists (pbsNodeFile): 
+if pbsNodeFile != "local" and not os.path.exists (pbsNodeFile): 
     print "The file you provided does not exist: ", pbsNodeFile
     sys.exit(0)
 
@@ -193,93 +191,81 @@ print "Fields to compare: ", fieldsToCompare[:]
 print "GEOS-CTM 1 model levels: ", geosCtmObject1.lev[:]
 print ""
 
-nodes = geosCtmObject1.readNodesIntoArray (pbsNodeFile)
-print "nodes: ", nodes
-
-# print ""
-# print "*******************************"
-# print "Testing nodes for access..."
-# for node in nodes: 
-#     sysCommand = "ssh " + node + " \'uname -n \'"
-#     systemReturnCode = os.system(sysCommand)
-#     print sysCommand
-#     print systemReturnCode
-#     if systemReturnCode != 0:
-#         print "There is a problem with node: ", node
-#         sys.exit(0)
-
-# print "All nodes accessible"
-# print "*******************************"
-# print ""
-
-
 cwd = os.getcwd()
 print "current working directory: ", cwd
 
 
 
-commands = []
-fieldCount = 0 
-procCount = 0
-nodeCount = 0
-
 #geosCtmFile1, geosCtmFile2, timeRecord, dateYearMonth
 pythonCommand = "PlotField_GEOS-CTM.py -c  " + geosCtmFile1 \
     + " -g " + geosCtmFile2 + " -r " + str(timeRecord) + " -d " + dateYearMonth + " -f "
 
+# One task per field, largest (3D) fields first; at most numProcesses
+# run at once on each node. Fields whose plots the manifest says are up
+# to date are skipped
+manifest = ManifestTools ("plots/manifest.json")
+codeVersion = returnCodeVersion ([cwd + "/" + module for module in \
+                                      ["PlotField_GEOS-CTM.py", "GeosCtmPlotTools.py", \
+                                       "GenericModelPlotTools.py"]])
+
+# What PlotField_GEOS-CTM.py plots: the ratio of the two runs at these
+# model levels (level 0 only for 2D fields), one pdf per level
+modelLevsToPlot = [71, 49, 41]
+analysisType = "ratio"
+
+def returnPlotFiles (field):
+    variableName = geosCtmObject1.returnVariableName (field)
+    levels = modelLevsToPlot
+    if variableName != None and len(geosCtmObject1.fieldShapes[variableName]) <= 3:
+        levels = [0]
+    return [(level, "plots/" + field + ".inter.GEOS-CTM." + str(level) + ".pdf") \
+                for level in levels]
+
+taskKeys = {}
+tasks = []
 for field in fieldsToCompare[:]:
+    command = "python " + cwd + "/" + pythonCommand + " " + field
+    taskKeys[field] = manifest.returnTaskKey ([geosCtmFile1, geosCtmFile2], \
+                                                  {'command' : command, \
+                                                       'analysisType' : analysisType, \
+                                                       'codeVersion' : codeVersion})
+    if manifest.isUpToDate (taskKeys[field]):
+        print "Up to date: ", field
+        continue
+
+    tasks.append (createTask (field, command, \
+                                  returnFieldCost (geosCtmObject1, field)))
+
+if pbsNodeFile == "local":
+    executor = LocalExecutor (numProcesses, numRetries=1)
+else:
+    nodes = geosCtmObject1.readNodesIntoArray (pbsNodeFile)
+    print "nodes: ", nodes
+    executor = SshExecutor (nodes, numProcesses, workDir=cwd, \
+                                setupFile=cwd + "/setup_env", numRetries=1)
+
+results = executor.runTasks (tasks)
 
-    if procCount == numProcesses: 
-        print "node count exceeds num processes per node: ", procCount
-        procCount = 0
-        nodeCount = nodeCount + 1
-
-        if nodeCount >= len(nodes):
-            print ""
-            print "ERROR: nodeCount cannot be > len(nodes): ", nodeCount, \
-                " > ", len(nodes)
-            print "Use more processes or more nodes"
-            print "Number of processes per node: ", numProcesses
-            print ""
-            sys.exit(-1)
-
-    field = fieldsToCompare[fieldCount]
-
-    print ""
-    print "Processing: ", field, " to : ", nodes[nodeCount], " proc : ", procCount
-    print ""
-    
-
-    sysCommand = "ssh -XYqt " + nodes[nodeCount] + \
-        " \'. " + cwd + "/setup_env ; " + \
-        " cd " + cwd + " ; " + \
-        " python " + cwd + "/" + \
-        pythonCommand + " " + field + \
-        " \' "
-    commands.append(sysCommand)
-
-
-
-    procCount = procCount + 1
-    fieldCount = fieldCount + 1
-
-
-print ""
-for command in commands[:]:
-    print command
 print ""
-
-
-pool = multiprocessing.Pool(processes=len(commands))
-
+for result in results:
+    if result == None:
+        print "ERROR: a task finished without a result"
+        continue
+    if result['returnCode'] != 0:
+        print "ERROR: failed to plot ", result['name'], " : ", result['error']
+        continue
+
+    field = result['name']
+    records = {}
+    for level, outFile in returnPlotFiles (field):
+        records[outFile] = returnOutputRecord ([geosCtmFile1, geosCtmFile2], field, \
+                                                   level, timeRecord, analysisType, \
+                                                   codeVersion)
+    manifest.recordTask (taskKeys[field], records)
+
+manifest.save ()
+
+print "Plotted ", len([result for result in results \
+                           if result != None and result['returnCode'] == 0]), \
+    " of ", len(results), " fields"
 print ""
-print "Calling pool.map"
-pool.map(worker, commands)
-print ""
-
-print ""
-print "Calling pool.close"
-pool.close()
-print ""
-
-
@@ -47,45 +47,10 @@ from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import *
 
 from GmiPlotTools import GmiPlotTools
+from ExecutorTools import LocalExecutor, SshExecutor, createTask, returnFieldCost
+from ManifestTools import ManifestTools, returnCodeVersion, returnOutputRecord
 
 
-def workerLocal (command):
-    print "I will execute: ", command
-    return os.system(command)
-
-def returnFieldsInCommon (gmiList, geosCtmList, fieldPrefixIn):
-    
-    fieldsToCompare = []
-
-    print ""
-    print "Scanning GEOS-CTM fields- "
-    print geosCtmList[:]
-    print ""
-
-    count = 0
-    for item in geosCtmList[:]:
-
-        if fieldPrefixIn in item:
-
-            print ""
-            print "Found Dep field: ", item
-            itemSplit = item.split("_")
-            print "item split: ", itemSplit[1]
-
-            for itemGmi in gmiList[:]:
-
-
-                if itemGmi == itemSplit[1]:
-                    print "Found GMI match: ", itemGmi
-                    fieldsToCompare.append (itemGmi)
-                    print ""
-
-
-        count = count + 1
-
-
-    return fieldsToCompare
-
 
 
 
@@ -97,7 +62,7 @@ def usage ():
     print "-g GMI restart file"
     print "-r time record to plot"
     print "-d date of comparision (YYYYMM)"
-    print "-n PBS_NODEFILE"
+    print "-n PBS_NODEFILE (or local to run on this node)"
     print "-p number of processes to use per node"
     print "-f field prefix"
     print ""
@@ -147,7 +112,7 @@ if len(dateYearMonth) != 6:
     print "ERROR date must be in the format YYYYMM. Received: ", dateYearMonth
     sys.exit(0)
 
-if not os.path.exists (pbsNodeFile): 
+if pbsNodeFile != "local" and not os.path.exists (pbsNodeFile): 
     print "The file you provided does not exist: ", pbsNodeFile
     sys.exit(0)
 
@@ -206,8 +171,11 @@ print ""
 
 
 
-fieldsToCompare = returnFieldsInCommon (gmiObject.fieldList, \
-                                            geosCtmObject.fieldList, fieldPrefix)
+# GEOS-CTM deposition fields are the GMI names with fieldPrefix in front
+fieldPairs = gmiObject.returnFieldPairs (gmiObject.fieldList, \
+                                             geosCtmObject.fieldList, \
+                                             [fieldPrefix], prefixedOnly=True)
+fieldsToCompare = [fieldPair[0] for fieldPair in fieldPairs]
 
 
 
@@ -218,95 +186,74 @@ print ""
 
 
 
-nodes = gmiObject.readNodesIntoArray (pbsNodeFile)
-print "nodes: ", nodes
-
-# print ""
-# print "*******************************"
-# print "Testing nodes for access..."
-# for node in nodes: 
-#     sysCommand = "ssh " + node + " \'uname -n \'"
-#     systemReturnCode = os.system(sysCommand)
-#     print sysCommand
-#     print systemReturnCode
-#     if systemReturnCode != 0:
-#         print "There is a problem with node: ", node
-#         sys.exit(0)
-
-# print "All nodes accessible"
-# print "*******************************"
-# print ""
-
-
 cwd = os.getcwd()
 print "current working directory: ", cwd
 
 
-commands = []
-fieldCount = 0
-procCount = 0
-nodeCount = 0
-
 #geosCtmFile gmiFile, timeRecord, dateYearMonth
 pythonCommand1 = "PlotField_GEOS-GMI_Dep.py -c  " + geosCtmFile \
     + " -g " + gmiFile + " -r " + str(timeRecord) + " -d " + dateYearMonth + " -p " \
     + fieldPrefix + " -f "
 
-for field in fieldsToCompare[:]:
-
-    if procCount == numProcesses: 
-        print "node count exceeds num processes per node: ", procCount
-        procCount = 0
-        nodeCount = nodeCount + 1
-
-        if nodeCount >= len(nodes):
-            print ""
-            print "ERROR: nodeCount cannot be > len(nodes): ", nodeCount, \
-                " > ", len(nodes)
-            print "Use more processes or more nodes"
-            print "Number of processes per node: ", numProcesses
-            print ""
-            sys.exit(-1)
-
-    
-    field = fieldsToCompare[fieldCount]
-
-
-    print ""
-    print "Processing: ", field, " to : ", nodes[nodeCount], " proc : ", procCount, \
-        " and " , procCount+1
-    print ""
-
-    sysCommand = "ssh -XYqt " + nodes[nodeCount] + \
-        " \'. " + cwd + "/setup_env ; " + \
-        " cd " + cwd + " ; " + \
-        " python " + cwd + "/" + \
-        pythonCommand1 + " " + field + \
-        " \' "
-    commands.append(sysCommand)
-
+# One task per field, largest (3D) fields first; at most numProcesses
+# run at once on each node. Fields whose plots the manifest says are up
+# to date are skipped
+manifest = ManifestTools ("plots/manifest.json")
+codeVersion = returnCodeVersion ([cwd + "/" + module for module in \
+                                      ["PlotField_GEOS-GMI_Dep.py", "GeosCtmPlotTools.py", \
+                                       "GmiPlotTools.py", "GenericModelPlotTools.py"]])
 
-    procCount = procCount + 1
-    fieldCount = fieldCount + 1
+# PlotField_GEOS-GMI_Dep.py plots the GEOS-CTM / GMI ratio of each field
+# at the surface to one pdf
+analysisType = "ratio"
 
+def returnPlotFile (field):
+    return "plots/" + fieldPrefix + field + ".GEOS-CTM.GMI." + str(dateYearMonth) + ".pdf"
 
-    
-print ""
-for command in commands[:]:
-    print command
-print "len of commands: ", len(commands)
-print ""
+taskKeys = {}
+tasks = []
+for field in fieldsToCompare[:]:
+    command = "python " + cwd + "/" + pythonCommand1 + " " + field
+    taskKeys[field] = manifest.returnTaskKey ([geosCtmFile, gmiFile], \
+                                                  {'command' : command, \
+                                                       'analysisType' : analysisType, \
+                                                       'codeVersion' : codeVersion})
+    if manifest.isUpToDate (taskKeys[field]):
+        print "Up to date: ", field
+        continue
+
+    tasks.append (createTask (field, command, \
+                                  returnFieldCost (geosCtmObject, field, fieldPrefix)))
+
+if pbsNodeFile == "local":
+    executor = LocalExecutor (numProcesses, numRetries=1)
+else:
+    nodes = gmiObject.readNodesIntoArray (pbsNodeFile)
+    print "nodes: ", nodes
+    executor = SshExecutor (nodes, numProcesses, workDir=cwd, \
+                                setupFile=cwd + "/setup_env", numRetries=1)
 
-pool = multiprocessing.Pool(processes=len(commands))
+results = executor.runTasks (tasks)
 
 print ""
-print "Calling pool.map"
-pool.map(workerLocal, commands)
+for result in results:
+    if result == None:
+        print "ERROR: a task finished without a result"
+        continue
+    if result['returnCode'] != 0:
+        print "ERROR: failed to plot ", result['name'], " : ", result['error']
+        continue
+
+    field = result['name']
+    outFile = returnPlotFile (field)
+    manifest.recordTask (taskKeys[field], \
+                             {outFile : returnOutputRecord ([geosCtmFile, gmiFile], field, \
+                                                                "sfc", timeRecord, \
+                                                                analysisType, codeVersion)})
+
+manifest.save ()
+
+print "Plotted ", len([result for result in results \
+                           if result != None and result['returnCode'] == 0]), \
+    " of ", len(results), " fields"
 print ""
-
-print ""
-print "Calling pool.close"
-pool.close()
-print ""
-
-
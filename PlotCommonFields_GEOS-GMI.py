@@ -24,11 +24,6 @@ import matplotlib
 matplotlib.use('pdf')
 import matplotlib.pyplot as plt
 
-import multiprocessing
-from time import sleep
-from multiprocessing import Pool
-
-
 import math
 import matplotlib.pyplot as plt
 from matplotlib.colors import BoundaryNorm
@@ -48,11 +43,7 @@ from GenericModelPlotTools import *
 
 from GmiPlotTools import GmiPlotTools
 from GmiDef import *
-
-
-def workerLocal (command):
-    print "I will execute: ", command
-    return os.system(command)
+from BatchCompareTools import BatchCompareTools
 
 
 NUM_ARGS = 9
@@ -63,8 +54,8 @@ def usage ():
     print "-g GMI file"
     print "-r time record to plot"
     print "-d date of comparision (YYYYMM)"
-    print "-n PBS_NODEFILE"
-    print "-p number of processes to use per node"
+    print "-n PBS_NODEFILE (not used, fields are plotted on this node)"
+    print "-p number of local processes to plot with"
     print "-s string defining the GMI array with species/fields names (const_labels, etc.)"
     print "-v variable to extract GMI array fields from (const, scav. etc.)"
     print "-t type of plots (Q-quick, S-Standard, C-Complete"
@@ -117,10 +108,6 @@ if len(dateYearMonth) != 6:
     print "ERROR date must be in the format YYYYMM. Received: ", dateYearMonth
     sys.exit(0)
 
-if not os.path.exists (pbsNodeFile): 
-    print "The file you provided does not exist: ", pbsNodeFile
-    sys.exit(0)
-
 if numProcesses <= 0:
     print "Number of processes must be larger than 0! "
     print "Given: ", numProcesses
@@ -197,37 +184,6 @@ print ""
 #print list2[:]
 
 
-nodes = gmiObject.readNodesIntoArray (pbsNodeFile)
-print "nodes: ", nodes
-
-# print ""
-# print "*******************************"
-# print "Testing nodes for access..."
-# for node in nodes: 
-#     sysCommand = "ssh " + node + " \'uname -n \'"
-#     systemReturnCode = os.system(sysCommand)
-#     print sysCommand
-#     print systemReturnCode
-#     if systemReturnCode != 0:
-#         print "There is a problem with node: ", node
-#         sys.exit(0)
-
-# print "All nodes accessible"
-# print "*******************************"
-# print ""
-
-
-cwd = os.getcwd()
-print "current working directory: ", cwd
-
-
-commands = []
-fieldCount = 0
-procCount = 0
-nodeCount = 0
-
-
-
 print("")
 print "Package type is: ", packageType
 if packageType == "Q": 
@@ -258,93 +214,21 @@ fieldsToCompare = None
 fieldsToCompare = editedFields
 
 
-#geosCtmFile gmiFile, timeRecord, dateYearMonth
-pythonCommand1 = "PlotField_GEOS-GMI.py -c  " + geosCtmFile \
-    + " -g " + gmiFile + " -r " + str(timeRecord) + " -d " + dateYearMonth + " -f "
-pythonCommand2= "PlotField_ZonalMean.py -c " + geosCtmFile \
-    + " -g " + gmiFile + " -r " + str(timeRecord) + " -d " + dateYearMonth + " -f"
-
-
-
-for field in fieldsToCompare[:]:
-
-    if procCount == numProcesses: 
-        print "node count exceeds num processes per node: ", procCount
-        procCount = 0
-        nodeCount = nodeCount + 1
-
-        if nodeCount >= len(nodes):
-            print ""
-            print "ERROR: nodeCount cannot be > len(nodes): ", nodeCount, \
-                " > ", len(nodes)
-            print "Use more processes or more nodes"
-            print "Number of processes per node: ", numProcesses
-            print ""
-            sys.exit(-1)
-
-    
-    field = fieldsToCompare[fieldCount]
-
-
-    print ""
-    print "Processing: ", field, " to : ", nodes[nodeCount], " proc : ", procCount, \
-        " and " , procCount+1
-    print ""
-
-    sysCommand = "ssh -XYqt " + nodes[nodeCount] + \
-        " \'. " + cwd + "/setup_env ; " + \
-        " cd " + cwd + " ; " + \
-        " python " + cwd + "/" + \
-        pythonCommand1 + " " + field + " -v " + variableExtractField + \
-        " \' "
-    commands.append(sysCommand)
-
-
-    # zonal means
-    print("")
-    print "Deciding if zonal mean is possible for : ", field
-    print("")
-
-    if field in GmiDef.GMI_TWOD_FIELDS[:]:
-        print("")
-        print "2D field found. NO zonal mean!"
-        print("")
-        
-    else:
-        sysCommand = "ssh -XYqt " + nodes[nodeCount] + \
-            " \'. " + cwd + "/setup_env ; " + \
-            " cd " + cwd + " ; " + \
-            " python " + cwd + "/" + \
-            pythonCommand2 + " " + field + " -v " + variableExtractField + \
-            " -m GEOS5 -a r\' "
-
-        commands.append(sysCommand)
-        procCount = procCount + 1
-
-
-    fieldCount = fieldCount + 1
-
-
-    
-print ""
-for command in commands[:]:
-    print command
-print "len of commands: ", len(commands)
-print ""
-
-
-
-
-pool = multiprocessing.Pool(processes=len(commands))
+#---------------------------------------------------------------
+# Both files stay open in this process. The fields are read once
+# and rendered by a local pool of numProcesses workers.
+#---------------------------------------------------------------
+batchObject = BatchCompareTools (geosCtmObject, gmiObject, \
+                                     "GEOS-CTM " + geosCtmSimName, \
+                                     "GMI " + gmiSimName, dateYearMonth, \
+                                     numProcesses, ".GEOS-CTM.GMI.")
+batchObject.ratioRange = [0, 1.5]
+batchObject.zonalMeanFileTag = ".GEOS5.GMI."
+batchObject.setMapLevelsFromValues ([992, 506, 192])
 
-print ""
-print "Calling pool.map"
-pool.map(workerLocal, commands)
-print ""
+failedFields = batchObject.plotFields (fieldsToCompare, timeRecord, \
+                                           variableExtractField)
 
 print ""
-print "Calling pool.close"
-pool.close()
+print "Failed: ", failedFields[:]
 print ""
-
-
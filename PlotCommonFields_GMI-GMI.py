@@ -24,11 +24,6 @@ import matplotlib
 matplotlib.use('pdf')
 import matplotlib.pyplot as plt
 
-import multiprocessing
-from time import sleep
-from multiprocessing import Pool
-
-
 import math
 import matplotlib.pyplot as plt
 from matplotlib.colors import BoundaryNorm
@@ -48,11 +43,7 @@ from GenericModelPlotTools import *
 
 from GmiPlotTools import GmiPlotTools
 from GmiDef import *
-
-
-def workerLocal (command):
-    print("I will execute: ", command)
-    return os.system(command)
+from BatchCompareTools import BatchCompareTools
 
 
 NUM_ARGS = 9
@@ -63,8 +54,8 @@ def usage ():
     print "-g GMI file 2"
     print "-r time record to plot"
     print "-d date of comparision (YYYYMM)"
-    print "-n PBS_NODEFILE"
-    print "-p number of processes to use per node"
+    print "-n PBS_NODEFILE (not used, fields are plotted on this node)"
+    print "-p number of local processes to plot with"
     print "-s string defining the GMI array with species/fields names (const_labels, etc.)"
     print "-v variable to extract GMI array fields from (const, scav. etc.)"
     print "-t type of plots (Q-quick, S-Standard, C-Complete"
@@ -118,10 +109,6 @@ if len(dateYearMonth) != 6:
     print "ERROR date must be in the format YYYYMM. Received: ", dateYearMonth
     sys.exit(0)
 
-if not os.path.exists (pbsNodeFile): 
-    print "The file you provided does not exist: ", pbsNodeFile
-    sys.exit(0)
-
 if numProcesses <= 0:
     print "Number of processes must be larger than 0! "
     print "Given: ", numProcesses
@@ -189,51 +176,6 @@ print("")
 
 
 
-nodes = gmiObject2.readNodesIntoArray (pbsNodeFile)
-print("")
-print "nodes: ", nodes
-print("")
-
-
-
-# print("")
-# print "*******************************"
-# print "Testing nodes for access..."
-# for node in nodes: 
-#     sysCommand = "ssh " + node + " \'uname -n \'"
-#     systemReturnCode = os.system(sysCommand)
-#     print sysCommand
-#     print systemReturnCode
-#     if systemReturnCode != 0:
-#         print "There is a problem with node: ", node
-#         sys.exit(0)
-
-# print "All nodes accessible"
-# print "*******************************"
-# print("")
-
-
-cwd = os.getcwd()
-print("")
-print "current working directory: ", cwd
-print("")
-
-
-
-commands = []
-fieldCount = 0
-procCount = 0
-nodeCount = 0
-
-#gmiFile1 gmiFile2, timeRecord, dateYearMonth
-pythonCommand1 = "PlotField_GMI-GMI.py -c  " + gmiFile1 \
-    + " -g " + gmiFile2 + " -r " + str(timeRecord) + " -d " + dateYearMonth + " -f "
-pythonCommand2= "PlotField_ZonalMean_GMI.py -c " + gmiFile1 \
-    + " -g " + gmiFile2 + " -r " + str(timeRecord) + " -d " + dateYearMonth + " -f"
-
-
-
-
 print("")
 print "Package type is: ", packageType
 if packageType == "Q": 
@@ -266,89 +208,23 @@ fieldsToCompare = editedFields
 
 
 
-for field in fieldsToCompare[:]:
-
-    if procCount == numProcesses: 
-        procCount = 0
-        nodeCount = nodeCount + 1
-        print "Attempting to assign process to new node: ", nodeCount
-
-        if nodeCount >= len(nodes):
-            print("")
-            print "ERROR: number of commands added to queue ", len(commands)
-            print "Number of nodes available: ", len(nodes)
-            print "Number of processes per node: ", numProcesses
-            print "number of fields to compare: ", len(fieldsToCompare)
-            print "Node count: ", nodeCount
-            print("")
-            sys.exit(-1)
-
-    
-    field = fieldsToCompare[fieldCount]
-
-
-    print("")
-    print "Processing: ", field, " to : ", nodes[nodeCount], " proc : ", procCount, \
-        " and " , procCount+1
-    print("")
-
-    sysCommand = "ssh -XYqt " + nodes[nodeCount] + \
-        " \'. " + cwd + "/setup_env ; " + \
-        " cd " + cwd + " ; " + \
-        " python " + cwd + "/" + \
-        pythonCommand1 + " " + field + " -v " + variableExtractField + \
-        " \' "
-    commands.append(sysCommand)
-    procCount = procCount + 1
-
-
-    print("")
-    print "Deciding if zonal mean is possible for : ", field
-    print("")
-
-    if field in GmiDef.GMI_TWOD_FIELDS[:]:
-        print("")
-        print "2D field found. NO zonal mean!"
-        print("")
-        
-    else:
-
-        sysCommand = "ssh -XYqt " + nodes[nodeCount] + \
-            " \'. " + cwd + "/setup_env ; " + \
-            " cd " + cwd + " ; " + \
-            " python " + cwd + "/" + \
-            pythonCommand2 + " " + field + " -v " + variableExtractField + \
-            " \' "
-        commands.append(sysCommand)
-        procCount = procCount + 1
-    
-
-
-    fieldCount = fieldCount + 1
-
-
-    
-print("")
-for command in commands[:]:
-    print command
-
-print("")
-print "len of commands: ", len(commands)
-print("")
-
-
-pool = multiprocessing.Pool(processes=len(commands))
+#---------------------------------------------------------------
+# Both files stay open in this process. The fields are read once
+# and rendered by a local pool of numProcesses workers.
+#---------------------------------------------------------------
+batchObject = BatchCompareTools (gmiObject1, gmiObject2, \
+                                     "GMI " + gmiSimName1, \
+                                     "GMI " + gmiSimName2, dateYearMonth, \
+                                     numProcesses, ".GMI.GMI.")
+batchObject.zonalMeanFileTag = ".GMI-inter."
+batchObject.setMapLevelsFromValues ([992, 506, 192])
 
-print("")
-print "Calling pool.map"
-pool.map(workerLocal, commands)
-print("")
+failedFields = batchObject.plotFields (fieldsToCompare, timeRecord, \
+                                           variableExtractField)
 
 print("")
-print "Calling pool.close"
-pool.close()
+print "Failed: ", failedFields[:]
 print("")
 
 
-
 sys.stdout.flush()
@@ -48,6 +48,7 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
+from MapTools import returnMapObjects
 
 
 NUM_ARGS = 7
@@ -199,10 +200,6 @@ print ""
 
 
 
-# Arrays (one time record, one species)
-longRecords = numpy.zeros(geosCtmObject1.longSize, numpy.float32)
-
-
 minGeosCtmLat = geosCtmObject1.lat[:].min()
 maxGeosCtmLat = geosCtmObject1.lat[:].max()
 minGeosCtmLong = geosCtmObject1.long[:].min()
@@ -212,10 +209,10 @@ cenGeosCtmLat = (minGeosCtmLat + maxGeosCtmLat)/2.
 cenGeosCtmLong =  (minGeosCtmLong + maxGeosCtmLong)/2.
 
 
-baseMapGeosCtm = Basemap(llcrnrlon=minGeosCtmLong,llcrnrlat=minGeosCtmLat,\
-                             urcrnrlon=maxGeosCtmLong,urcrnrlat=maxGeosCtmLat,\
-                             projection='cyl', \
-                             lat_0=cenGeosCtmLat,lon_0=cenGeosCtmLong)
+# Projection and grid come from the map cache (built once per extent)
+baseMapGeosCtm, gridLonsGeosCtm, gridLatsGeosCtm, X_GeosCtm, Y_GeosCtm = \
+    returnMapObjects (minGeosCtmLat, maxGeosCtmLat, minGeosCtmLong, maxGeosCtmLong, \
+                         geosCtmObject1.latSize, geosCtmObject1.longSize)
 
 print ""
 print "Basemap info: "
@@ -228,9 +225,6 @@ print ""
 
 
 
-gridLonsGeosCtm,gridLatsGeosCtm = baseMapGeosCtm.makegrid(geosCtmObject1.longSize, \
-                                                              geosCtmObject1.latSize)
-X_GeosCtm, Y_GeosCtm = baseMapGeosCtm(gridLonsGeosCtm,gridLatsGeosCtm)
 
 
 fieldCount = 0
@@ -243,10 +237,14 @@ print "Processing: ", fieldToCompare
 print ""
     
 
-geosCtmFieldArray1 = geosCtmObject1.returnField (fieldToCompare, timeRecord)
-geosCtmFieldArray2 = geosCtmObject2.returnField (fieldToCompare, timeRecord)
+# Only the levels to plot are read
+geosCtmFieldArray1 = geosCtmObject1.returnField (fieldToCompare, timeRecord, \
+                                                     levIndex=modelLevsToPlot)
+geosCtmFieldArray2 = geosCtmObject2.returnField (fieldToCompare, timeRecord, \
+                                                     levIndex=modelLevsToPlot)
 
 found2DArray = False
+levCount = 0
 for modelLev in modelLevsToPlot:
         
 
@@ -277,10 +275,12 @@ for modelLev in modelLevsToPlot:
 
     else:
         print "Field is 3D"
-        z_GeosCtm1 = geosCtmFieldArray1[modelLev, :, :]
-        z_GeosCtm2 = geosCtmFieldArray2[modelLev, :, :]
+        z_GeosCtm1 = geosCtmFieldArray1[levCount, :, :]
+        z_GeosCtm2 = geosCtmFieldArray2[levCount, :, :]
+        levCount = levCount + 1
 
-    z_Diff = z_GeosCtm1 / z_GeosCtm2
+    z_Diff = geosCtmObject1.returnRatio (z_GeosCtm1, z_GeosCtm2, \
+                                         positiveOverZero=2.5, negativeOverZero=.5)
 
     minValueOfBoth = z_GeosCtm1.min()
     maxValueOfBoth = z_GeosCtm1.max()
@@ -299,14 +299,6 @@ for modelLev in modelLevsToPlot:
     print shape(z_Diff)
 
 
-    for lat in range(0, size(geosCtmObject1.lat)):
-        for long in range(0, size(geosCtmObject1.long)):
-
-            if z_GeosCtm1[lat, long] == 0.0 and z_GeosCtm2[lat, long] == 0.0:
-                z_Diff[lat, long] = 1.0
-            if z_GeosCtm1[lat, long] != 0.0 and z_GeosCtm2[lat,long] == 0.0:
-                if z_GeosCtm1[lat, long] > 0.0: z_Diff[lat,long] = 2.5
-                if z_GeosCtm1[lat, long] < 0.0: z_Diff[lat,long] = .5
                 
     #-----------------------------------------------------#
     # GEOS-5 1
@@ -48,19 +48,21 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
+from LevelPlotTools import createPanel, plotLevels
 
 
 
 NUM_ARGS = 6
 def usage ():
     print ""
-    print "usage: PlotField_GEOS-CTM-DiffLev.py [-c] [-g] [-r] [-d] [-f] [-o]"
+    print "usage: PlotField_GEOS-CTM-DiffLev.py [-c] [-g] [-r] [-d] [-f] [-o] [-p]"
     print "-c GEOS CTM file 1"
     print "-g GEOS CTM file 2"
     print "-r time record to plot"
     print "-d date of comparision (YYYYMM)"
     print "-f field to compare"
     print "-o other field to compare"
+    print "-p number of levels to render at once (optional, default 1)"
     print ""
     sys.exit (0)
 
@@ -70,17 +72,20 @@ print "Start plotting field differences."
 #---------------------------------------------------------------
 # START:: Get options from command line
 #---------------------------------------------------------------
-optList, argList = getopt.getopt(sys.argv[1:],'c:g:r:d:f:o:')
-if len (optList) != NUM_ARGS:
+optList, argList = getopt.getopt(sys.argv[1:],'c:g:r:d:f:o:p:')
+options = dict(optList)
+if len (options) != len (optList) or \
+        not set(['-c', '-g', '-r', '-d', '-f', '-o']).issubset(options):
    usage ()
    sys.exit (0)
 
-geosCtmFile1 = optList[0][1]
-geosCtmFile2 = optList[1][1]
-timeRecord = int(optList[2][1])
-dateYearMonth = optList[3][1]
-fieldToCompare = optList[4][1]
-otherFieldToCompare = optList[5][1]
+geosCtmFile1 = options['-c']
+geosCtmFile2 = options['-g']
+timeRecord = int(options['-r'])
+dateYearMonth = options['-d']
+fieldToCompare = options['-f']
+otherFieldToCompare = options['-o']
+numProcesses = int(options.get('-p', 1))
 
 #---------------------------------------------------------------
 print ""
@@ -193,11 +198,6 @@ cenGeosCtmLat = (minGeosCtmLat + maxGeosCtmLat)/2.
 cenGeosCtmLong =  (minGeosCtmLong + maxGeosCtmLong)/2.
 
 
-baseMapGeosCtm = Basemap(llcrnrlon=minGeosCtmLong,llcrnrlat=minGeosCtmLat,\
-                             urcrnrlon=maxGeosCtmLong,urcrnrlat=maxGeosCtmLat,\
-                             projection='cyl', \
-                             lat_0=cenGeosCtmLat,lon_0=cenGeosCtmLong)
-
 print ""
 print "Basemap info: "
 print "llcr lon: ", minGeosCtmLong
@@ -209,13 +209,9 @@ print ""
 
 
 
-gridLonsGeosCtm,gridLatsGeosCtm = baseMapGeosCtm.makegrid(geosCtmObject1.longSize, \
-                                                              geosCtmObject1.latSize)
-X_GeosCtm, Y_GeosCtm = baseMapGeosCtm(gridLonsGeosCtm,gridLatsGeosCtm)
 
 
 fieldCount = 0
-plt.figure(figsize=(20,20))
 
 
     
@@ -228,6 +224,23 @@ print ""
 geosCtmFieldArray1 = geosCtmObject1.returnField (fieldToCompare, timeRecord)
 geosCtmFieldArray2 = geosCtmObject2.returnField (otherFieldToCompare, timeRecord)
 
+
+if geosCtmFieldArray1.shape[1:3] != geosCtmFieldArray2.shape[1:3]:
+    print ""
+    print "Array 2D shapes are different. Interpolation needed!"
+    print "This feature is currently not supported for inter GEOS-CTM runs"
+    print ""
+    sys.exit(0)
+
+else:
+    print ""
+    print "Array 2D shapes are the same, will continue with plotting..."
+    print ""
+
+
+# Panels of every level are collected first, then rendered together
+levelPlots = []
+
 for modelLev in ['top','surface','middle']:
         
 
@@ -253,24 +266,11 @@ for modelLev in ['top','surface','middle']:
     print "Comparing levels: ", lev1, " and ", lev2
 
 
-    if geosCtmFieldArray1.shape[1:3] != geosCtmFieldArray2.shape[1:3]:
-        print ""
-        print "Array 2D shapes are different. Interpolation needed!"
-        print "This feature is currently not supported for inter GEOS-CTM runs"
-        print ""
-        sys.exit(0)
-
-    else:
-        print ""
-        print "Array 2D shapes are the same, will continue with plotting..."
-        print ""
-
-
 
     z_GeosCtm1 = geosCtmFieldArray1[lev1, :, :]
     z_GeosCtm2 = geosCtmFieldArray2[lev2, :, :]
 
-    z_Diff = z_GeosCtm1 / z_GeosCtm2
+    z_Diff = geosCtmObject1.returnRatio (z_GeosCtm1, z_GeosCtm2)
 
 
     minValueOfBoth = z_GeosCtm1.min()
@@ -290,12 +290,6 @@ for modelLev in ['top','surface','middle']:
     print "min/max of both: ", minValueOfBoth, maxValueOfBoth
     print ""
 
-    for lat in range(0, size(geosCtmObject1.lat)):
-        for long in range(0, size(geosCtmObject1.long)):
-
-            if z_GeosCtm1[lat, long] == 0 and z_GeosCtm2[lat, long] == 0:
-                #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-                z_Diff[lat, long] = 1.0
 
 
 
@@ -305,50 +299,48 @@ for modelLev in ['top','surface','middle']:
 
     print "GEOS-CTM 1: ", z_GeosCtm1.min(), " / ", z_GeosCtm1.max()
 
-    geosCtmObject1.create2dSlice (baseMapGeosCtm, X_GeosCtm, Y_GeosCtm, z_GeosCtm1, \
+    panels = []
+    panels.append (createPanel (z_GeosCtm1, \
                                       [z_GeosCtm1.min(), z_GeosCtm1.max()], \
                                       #[minValueOfBoth,maxValueOfBoth], \
-                                      [minGeosCtmLat,maxGeosCtmLat], \
-                                      [minGeosCtmLong, maxGeosCtmLong], 311, \
+                                      311, \
                                       "GEOS-CTM " + geosCtmSimName1 + " " + \
                                       fieldToCompare + " @ " + str(lev1) + \
-                                      "lev " + dateYearMonth, "jet")
+                                      "lev " + dateYearMonth, "jet"))
 
     print "GEOS-CTM 2: ", z_GeosCtm2.min(), " / ", z_GeosCtm2.max()
 
-    geosCtmObject2.create2dSlice (baseMapGeosCtm, X_GeosCtm, Y_GeosCtm, z_GeosCtm2, \
+    panels.append (createPanel (z_GeosCtm2, \
                                       [z_GeosCtm2.min(), z_GeosCtm2.max()], \
                                       #[minValueOfBoth,maxValueOfBoth], \
-                                      [minGeosCtmLat,maxGeosCtmLat], \
-                                      [minGeosCtmLong, maxGeosCtmLong], 312, \
+                                      312, \
                                       "GEOS-CTM " + geosCtmSimName2 + " " + \
                                       otherFieldToCompare + " @ " + str(lev2) + \
-                                      "lev " + dateYearMonth, "jet")
+                                      "lev " + dateYearMonth, "jet"))
     
 
 
-    geosCtmObject1.create2dSlice (baseMapGeosCtm, X_GeosCtm, Y_GeosCtm, z_Diff, \
+    panels.append (createPanel (z_Diff, \
                                       [z_Diff.min(), z_Diff.max()], \
                                       #[0, 1.5], \
-                                      [minGeosCtmLat,maxGeosCtmLat], \
-                                      [minGeosCtmLong, maxGeosCtmLong], 313, \
+                                      313, \
                                       "Model ratio " + fieldToCompare + " @ " + str(modelLev) + \
                                       " lev " + dateYearMonth, \
-                                      "nipy_spectral", \
-                                      normalize=True)
+                                      "nipy_spectral"))
     #-----------------------------------------------------#
 
 
 
-    file = "f"
-    if file == "f":
-        plt.savefig("plots/" + fieldToCompare + \
-                        "." + otherFieldToCompare + ".GEOS-CTM."
-                    + str(modelLev) + "." , bbox_inches='tight')
-    elif file == "s":
-        plt.show()
-        
-    plt.clf()
+    levelPlots.append ({'outFile' : "plots/" + fieldToCompare + "." + \
+                           otherFieldToCompare + ".GEOS-CTM." + str(modelLev) + ".", \
+                           'panels' : panels})
+
+
+# One figure per level; with -p the levels are rendered at the same time
+failedPlots = plotLevels (geosCtmObject1, levelPlots, numProcesses)
+if len(failedPlots) != 0:
+    print "ERROR: could not plot: ", failedPlots
+    sys.exit(-1)
 
 
 
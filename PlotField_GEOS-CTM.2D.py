@@ -47,6 +47,7 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
+from MapTools import returnMapObjects
 
 
 NUM_ARGS = 5
@@ -191,10 +192,10 @@ cenGeosCtmLat = (minGeosCtmLat + maxGeosCtmLat)/2.
 cenGeosCtmLong =  (minGeosCtmLong + maxGeosCtmLong)/2.
 
 
-baseMapGeosCtm = Basemap(llcrnrlon=minGeosCtmLong,llcrnrlat=minGeosCtmLat,\
-                             urcrnrlon=maxGeosCtmLong,urcrnrlat=maxGeosCtmLat,\
-                             projection='cyl', \
-                             lat_0=cenGeosCtmLat,lon_0=cenGeosCtmLong)
+# Projection and grid come from the map cache (built once per extent)
+baseMapGeosCtm, gridLonsGeosCtm, gridLatsGeosCtm, X_GeosCtm, Y_GeosCtm = \
+    returnMapObjects (minGeosCtmLat, maxGeosCtmLat, minGeosCtmLong, maxGeosCtmLong, \
+                         geosCtmObject1.latSize, geosCtmObject1.longSize)
 
 print ""
 print "Basemap info: "
@@ -207,9 +208,6 @@ print ""
 
 
 
-gridLonsGeosCtm,gridLatsGeosCtm = baseMapGeosCtm.makegrid(geosCtmObject1.longSize, \
-                                                              geosCtmObject1.latSize)
-X_GeosCtm, Y_GeosCtm = baseMapGeosCtm(gridLonsGeosCtm,gridLatsGeosCtm)
 
 
 fieldCount = 0
@@ -243,7 +241,7 @@ else:
 z_GeosCtm1 = geosCtmFieldArray1[:, :] 
 z_GeosCtm2 = geosCtmFieldArray2[:, :]
     
-z_Diff = z_GeosCtm1 / z_GeosCtm2
+z_Diff = geosCtmObject1.returnRatio (z_GeosCtm1, z_GeosCtm2)
 
 
 minValueOfBoth = z_GeosCtm1.min()
@@ -264,12 +262,6 @@ print shape(z_GeosCtm2)
 print shape(z_Diff)
 
 
-for lat in range(0, size(geosCtmObject1.lat)):
-    for long in range(0, size(geosCtmObject1.long)):
-
-        if z_GeosCtm1[lat, long] == 0 and z_GeosCtm2[lat, long] == 0:
-            #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-            z_Diff[lat, long] = 1.0
 
 
 
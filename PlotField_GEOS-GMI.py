@@ -42,18 +42,23 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
 from GmiPlotTools import GmiPlotTools
+from RegridTools import RegridTools
+from LevelPlotTools import createPanel, plotLevels
 
 
 NUM_ARGS = 6
 def usage ():
     print ""
-    print "usage: PlotField_GEOS-GMI.py [-c] [-g] [-r] [-d] [-f] [-v]"
+    print "usage: PlotField_GEOS-GMI.py [-c] [-g] [-r] [-d] [-f] [-v] [-p] [-l]"
     print "-c GEOS CTM restart file"
     print "-g GMI restart file"
     print "-r time record to plot"
     print "-d date of comparision (YYYYMM)"
     print "-f field to compare"
     print "-v which variable to extract field from"
+    print "-p number of levels to render at once (optional, default 1)"
+    print "-l comma separated pressures (mb) to plot at the nearest GMI levels"
+    print "   (optional, default 992,506,192)"
     print ""
     sys.exit (0)
 
@@ -64,17 +69,21 @@ print "Start plotting field differences."
 #---------------------------------------------------------------
 # START:: Get options from command line
 #---------------------------------------------------------------
-optList, argList = getopt.getopt(sys.argv[1:],'c:g:r:d:f:v:')
-if len (optList) != NUM_ARGS:
+optList, argList = getopt.getopt(sys.argv[1:],'c:g:r:d:f:v:p:l:')
+options = dict(optList)
+if len (options) != len (optList) or \
+        not set(['-c', '-g', '-r', '-d', '-f', '-v']).issubset(options):
    usage ()
    sys.exit (0)
 
-geosCtmFile = optList[0][1]
-gmiFile = optList[1][1]
-timeRecord = int(optList[2][1])
-dateYearMonth = optList[3][1]
-fieldToCompare = optList[4][1]
-variableExtractField = optList[5][1]
+geosCtmFile = options['-c']
+gmiFile = options['-g']
+timeRecord = int(options['-r'])
+dateYearMonth = options['-d']
+fieldToCompare = options['-f']
+variableExtractField = options['-v']
+numProcesses = int(options.get('-p', 1))
+levelsToPlot = [float(lev) for lev in options.get('-l', "992,506,192").split(",")]
 
 #---------------------------------------------------------------
 print ""
@@ -182,28 +191,18 @@ if foundField == False:
 
 print "GMI model levels: ", gmiObject.lev[:]
 modelLevsToPlotGmi = {}
-levCount = 0
-for lev in gmiObject.lev[:]:
-    if int(lev) == 992 or int(lev) == 506 or int(lev) == 192:
-        modelLevsToPlotGmi [int(lev)] = levCount
-    levCount = levCount + 1
-
-
+for levIndex in gmiObject.returnLevelIndices (levelsToPlot):
+    modelLevsToPlotGmi [int(gmiObject.lev[levIndex])] = int(levIndex)
+gmiLevIndices = sorted(modelLevsToPlotGmi.values())
 
-# Arrays (one time record, one species)
-longRecords = numpy.zeros(gmiObject.longSize, numpy.float32)
-
-remappedGmiArray = numpy.zeros((gmiObject.levelSize, \
-                                    gmiObject.latSize, \
-                                    gmiObject.longSize), numpy.float32)
-
-newGmiArray = numpy.zeros((gmiObject.latSize, \
-                               geosCtmObject.longSize), numpy.float32)
+# GEOS-CTM is stored top-down; only these levels are read from it
+geosCtmLevsToPlot = {}
+for modelLev in modelLevsToPlotGmi:
+    geosCtmLevsToPlot [modelLev] = (geosCtmObject.levelSize-1) - modelLevsToPlotGmi[modelLev]
+geosCtmLevIndices = sorted(geosCtmLevsToPlot.values())
 
-                             
 
 
-plt.figure(figsize=(20,20))
 
 print ""
 print "Processing: ", fieldToCompare
@@ -212,12 +211,18 @@ print ""
 field = fieldToCompare
 
 if variableExtractField == 'scav': 
-    geosCtmFieldArray = geosCtmObject.returnField (field, timeRecord, "SCAV_")
+    geosCtmFieldArray = geosCtmObject.returnField (field, timeRecord, "SCAV_", \
+                                                       levIndex=geosCtmLevIndices)
 
 else:
-    geosCtmFieldArray = geosCtmObject.returnField (field, timeRecord)
+    geosCtmFieldArray = geosCtmObject.returnField (field, timeRecord, \
+                                                       levIndex=geosCtmLevIndices)
 
-gmiFieldArray = gmiObject.returnField (field, timeRecord, variableExtractField)
+# GMI is on 0-360 longitude; read it in GEOS (-180 to 180) order
+gmiObject.setLongStart (-180.0)
+gmiFieldArray = gmiObject.returnField (field, timeRecord, variableExtractField, \
+                                          levIndex=gmiLevIndices)
+remappedLong = gmiObject.returnLongitudes ()
 
 
 
@@ -227,21 +232,16 @@ print "Shape of GMI field: ", gmiFieldArray.shape[:]
 print ""
 
 
-# put GMI on -180 to 0 to 180
-lenGmiLong = len(gmiObject.long[:])
-        
-remappedGmiArray [:,:,0:lenGmiLong/2] = gmiFieldArray[:,:,lenGmiLong/2:lenGmiLong]
-remappedGmiArray [:,:,lenGmiLong/2:lenGmiLong] = gmiFieldArray[:,:,0:lenGmiLong/2]
-remappedLong = numpy.zeros(lenGmiLong, float32)
-remappedLong [0:lenGmiLong/2] = gmiObject.long[lenGmiLong/2:lenGmiLong] - 360.0
-remappedLong [lenGmiLong/2:lenGmiLong] = gmiObject.long[0:lenGmiLong/2]
-        
+if gmiFieldArray.shape[1:] != geosCtmFieldArray.shape[1:]:
+    print "Array shapes are different. Interpolation needed!"
 
-remappedLongPlus180 = numpy.zeros(lenGmiLong, float32)
-remappedLongPlus180[:] = remappedLong[:] + 180.0
+    # All levels at once; weights are cached for repeated runs
+    regridObject = RegridTools (gmiObject.lat[:], remappedLong[:], \
+                                    geosCtmObject.lat[:], geosCtmObject.long[:])
+    newGmiArray = regridObject.regrid (gmiFieldArray)
 
-geosCtmLongPlus180 = numpy.zeros(geosCtmObject.longSize, float32)
-geosCtmLongPlus180 [:] = geosCtmObject.long[:] + 180.0
+else:
+    newGmiArray = gmiFieldArray
 
 
 
@@ -253,6 +253,9 @@ print "Creating GMI plot objects..."
 gmiObject.createPlotObjects()
 print ""
 
+# Panels of every level are collected first, then rendered together
+levelPlots = []
+
 
 levCount = 0
 for modelLev in modelLevsToPlotGmi:
@@ -262,36 +265,13 @@ for modelLev in modelLevsToPlotGmi:
         " GEOS-CTM index: ", (geosCtmObject.levelSize - 1) - modelLevsToPlotGmi[modelLev]
     print ""
 
-
-
-    if gmiFieldArray.shape != geosCtmFieldArray.shape:
-        print "Array shapes are different. Interpolation needed!"
-
-        latCount = 0
-        for lat in gmiObject.lat[:]:
-
-            longRecords[:] = remappedGmiArray [modelLevsToPlotGmi[modelLev], latCount,:]
-            
-            yinterp =  numpy.interp(geosCtmLongPlus180, remappedLongPlus180, longRecords)
-                
-            newGmiArray[latCount, :] = yinterp [:]
-
-            latCount = latCount + 1
-
-
-    else:
-        newGmiArray[:,:] = remappedGmiArray[modelLevsToPlotGmi[modelLev],:,:]
-
-
     levCount = levCount + 1
 
-    print "Extracting GeosCtm level: ", (geosCtmObject.levelSize-1) - \
-        modelLevsToPlotGmi[modelLev]
+    print "Extracting GeosCtm level: ", geosCtmLevsToPlot[modelLev]
 
-    z_GeosCtm = geosCtmFieldArray[(geosCtmObject.levelSize-1) \
-                                      - modelLevsToPlotGmi[modelLev], :, :]
-    z_Gmi = newGmiArray[:, :]
-    z_Diff = z_GeosCtm / z_Gmi
+    z_GeosCtm = geosCtmFieldArray[geosCtmLevIndices.index(geosCtmLevsToPlot[modelLev]), :, :]
+    z_Gmi = newGmiArray[gmiLevIndices.index(modelLevsToPlotGmi[modelLev]), :, :]
+    z_Diff = geosCtmObject.returnRatio (z_GeosCtm, z_Gmi)
 
     print ""
     print "Min/max of GMI: ", z_Gmi.min(), "/", z_Gmi.max()
@@ -326,12 +306,6 @@ for modelLev in modelLevsToPlotGmi:
     if z_Gmi.max() > maxValueOfBoth:
         maxValueOfBoth = z_Gmi.max()
 
-    for lat in range(0, size(geosCtmObject.lat)):
-        for long in range(0, size(geosCtmObject.long)):
-
-            if z_Gmi[lat, long] == 0 and z_GeosCtm[lat, long] == 0:
-                #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-                z_Diff[lat, long] = 1.0
 
 
 
@@ -365,11 +339,12 @@ for modelLev in modelLevsToPlotGmi:
     useMax = maxValueOfBoth
 
 
-    geosCtmObject.create2dSlice2 (z_GeosCtm, [useMin, useMax], \
+    panels = []
+    panels.append (createPanel (z_GeosCtm, [useMin, useMax], \
                                       311, "GEOS-CTM " + geosCtmSimName + "        " + \
                                       variableExtractField + "_" + \
                                       field + " @ " + str(modelLev) + \
-                                      "mb " + dateYearMonth, "jet")
+                                      "mb " + dateYearMonth, "jet"))
 
 
     print ""
@@ -394,35 +369,36 @@ for modelLev in modelLevsToPlotGmi:
 
     # GMI lev0 is surface
     # using geosCtmObject because GMI should now be on lat/long system of GEOS-CTM
-    geosCtmObject.create2dSlice2 (z_Gmi, [useMin, useMax], \
+    panels.append (createPanel (z_Gmi, [useMin, useMax], \
                                       312, "GMI " + gmiSimName + "        " + \
                                       variableExtractField + "_" + \
                                       field + " @ " + str(modelLev) + \
-                                      " mb " + dateYearMonth, "jet")
+                                      " mb " + dateYearMonth, "jet"))
 
 
-    geosCtmObject.create2dSlice2 (z_Diff, \
+    panels.append (createPanel (z_Diff, \
                                      #[z_Diff.min(), z_Diff.max()], \
                                      [0, 1.5], \
                                      313, "Model ratio        " + \
                                       variableExtractField + "_" + \
                                       field + " @ " + str(modelLev) + \
                                      " mb " + dateYearMonth, \
-                                     "nipy_spectral", \
-                                     normalize=True)
+                                     "nipy_spectral"))
 
     #-----------------------------------------------------#
 
 
 
-    file = "f"
-    if file == "f":
-        plt.savefig("plots/" + variableExtractField + "_" + field + ".GEOS-CTM.GMI."
-                    + str(modelLev) + "." , bbox_inches='tight')
-    elif file == "s":
-        plt.show()
-        
-    plt.clf()
+    levelPlots.append ({'outFile' : "plots/" + variableExtractField + "_" + field + \
+                           ".GEOS-CTM.GMI." + str(modelLev) + ".", \
+                           'panels' : panels})
+
+
+# One figure per level; with -p the levels are rendered at the same time
+failedPlots = plotLevels (geosCtmObject, levelPlots, numProcesses)
+if len(failedPlots) != 0:
+    print "ERROR: could not plot: ", failedPlots
+    sys.exit(-1)
                                   
 
 print ""
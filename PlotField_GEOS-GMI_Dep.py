@@ -42,7 +42,10 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
+from MapTools import returnMapObjects
 from GmiPlotTools import GmiPlotTools
+from RegridTools import RegridTools
+from StatisticsTools import StatisticsTools, returnModelCellAreas, writeSummary
 
 
 NUM_ARGS = 6
@@ -155,17 +158,6 @@ print ""
 
 
 
-# Arrays (one time record, one species)
-longRecords = numpy.zeros(gmiObject.longSize, numpy.float32)
-
-remappedGmiArray = numpy.zeros(( gmiObject.latSize, \
-                                     gmiObject.longSize), numpy.float32)
-
-
-newGmiArray = numpy.zeros((gmiObject.latSize, \
-                               geosCtmObject.longSize), numpy.float32)
-
-
 minGeosCtmLat = geosCtmObject.lat[:].min()
 maxGeosCtmLat = geosCtmObject.lat[:].max()
 minGeosCtmLong = geosCtmObject.long[:].min()
@@ -175,10 +167,10 @@ cenGeosCtmLat = (minGeosCtmLat + maxGeosCtmLat)/2.
 cenGeosCtmLong =  (minGeosCtmLong + maxGeosCtmLong)/2.
 
 
-baseMapGeosCtm = Basemap(llcrnrlon=minGeosCtmLong,llcrnrlat=minGeosCtmLat,\
-                             urcrnrlon=maxGeosCtmLong,urcrnrlat=maxGeosCtmLat,\
-                             projection='cyl', \
-                             lat_0=cenGeosCtmLat,lon_0=cenGeosCtmLong)
+# Projection and grid come from the map cache (built once per extent)
+baseMapGeosCtm, gridLonsGeosCtm, gridLatsGeosCtm, X_GeosCtm, Y_GeosCtm = \
+    returnMapObjects (minGeosCtmLat, maxGeosCtmLat, minGeosCtmLong, maxGeosCtmLong, \
+                         geosCtmObject.latSize, geosCtmObject.longSize)
 
 cenGmiLong = (gmiObject.long[:].min() + gmiObject.long[:].max()) / 2.0
 
@@ -192,8 +184,6 @@ print "centers lat/long: ", cenGeosCtmLat, cenGeosCtmLong
 print ""
 
 
-gridLonsGeosCtm,gridLatsGeosCtm = baseMapGeosCtm.makegrid(geosCtmObject.longSize, geosCtmObject.latSize)
-X_GeosCtm, Y_GeosCtm = baseMapGeosCtm(gridLonsGeosCtm,gridLatsGeosCtm)
 
 
 plt.figure(figsize=(20,20))
@@ -212,51 +202,26 @@ else:
 print field
 print timeRecord
 print fieldPrefix
+# GMI is on 0-360 longitude; read it in GEOS (-180 to 180) order
+gmiObject.setLongStart (-180.0)
 gmiFieldArray = gmiObject.returnField (field, timeRecord, fieldPrefix)
+remappedLong = gmiObject.returnLongitudes ()
 
 print ""
 print "Shape of GEOS-CTM field: ", geosCtmFieldArray.shape[:]
 print "Shape of GMI field: ", gmiFieldArray.shape[:]
 print ""
 
-# put GMI on -180 to 0 to 180
-lenGmiLong = len(gmiObject.long[:])
-
-print "remapping: ", remappedGmiArray.shape, " to " , gmiFieldArray.shape
-
-        
-remappedGmiArray [:,0:lenGmiLong/2] = gmiFieldArray[:,lenGmiLong/2:lenGmiLong]
-remappedGmiArray [:,lenGmiLong/2:lenGmiLong] = gmiFieldArray[:,0:lenGmiLong/2]
-remappedLong = numpy.zeros(lenGmiLong, float32)
-remappedLong [0:lenGmiLong/2] = gmiObject.long[lenGmiLong/2:lenGmiLong] - 360.0
-remappedLong [lenGmiLong/2:lenGmiLong] = gmiObject.long[0:lenGmiLong/2]
-        
-
-remappedLongPlus180 = numpy.zeros(lenGmiLong, float32)
-remappedLongPlus180[:] = remappedLong[:] + 180.0
-
-geosCtmLongPlus180 = numpy.zeros(geosCtmObject.longSize, float32)
-geosCtmLongPlus180 [:] = geosCtmObject.long[:] + 180.0
-
-
-
 if gmiFieldArray.shape != geosCtmFieldArray.shape:
     print "Array shapes are different. Interpolation needed!"
 
-    latCount = 0
-    for lat in gmiObject.lat[:]:
-
-        longRecords[:] = remappedGmiArray [latCount,:]
-            
-        yinterp =  numpy.interp(geosCtmLongPlus180, remappedLongPlus180, longRecords)
-                
-        newGmiArray[latCount, :] = yinterp [:]
-
-        latCount = latCount + 1
-
+    # Weights are cached, so repeated runs on these grids skip this step
+    regridObject = RegridTools (gmiObject.lat[:], remappedLong[:], \
+                                    geosCtmObject.lat[:], geosCtmObject.long[:])
+    newGmiArray = regridObject.regrid (gmiFieldArray)
 
 else:
-    newGmiArray[:,:] = remappedGmiArray[:,:]
+    newGmiArray = gmiFieldArray
 
 
 # What is this? Is this for Deposition?
@@ -265,7 +230,18 @@ else:
 
 z_GeosCtm = geosCtmFieldArray[:, :] 
 z_Gmi = newGmiArray[:, :] 
-z_Diff = z_GeosCtm / z_Gmi
+z_Diff = geosCtmObject.returnRatio (z_GeosCtm, z_Gmi)
+
+# Area-weighted totals and comparison statistics on the GEOS-CTM grid
+statsObject = StatisticsTools (geosCtmObject.lat[:], returnModelCellAreas (geosCtmObject))
+depStats = statsObject.returnPairStatistics (z_GeosCtm, z_Gmi)
+
+print ""
+print "GEOS-CTM / GMI global totals: ", depStats['global']['total1'], " / ", \
+    depStats['global']['total2']
+print "Bias / RMSE / correlation: ", depStats['global']['bias'], " / ", \
+    depStats['global']['rmse'], " / ", depStats['global']['correlation']
+print ""
 
 
 minValueOfBoth = z_GeosCtm.min()
@@ -277,12 +253,6 @@ if z_Gmi.max() > maxValueOfBoth:
     maxValueOfBoth = z_Gmi.max()
 
 
-for lat in range(0, size(geosCtmObject.lat)):
-    for long in range(0, size(geosCtmObject.long)):
-
-        if z_Gmi[lat, long] == 0 and z_GeosCtm[lat, long] == 0:
-            #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-            z_Diff[lat, long] = 1.0
 
 
 #-----------------------------------------------------#
@@ -338,6 +308,10 @@ file = "f"
 if file == "f":
     fileName = "plots/" + fieldPrefix + field + ".GEOS-CTM.GMI." + str(dateYearMonth) + '.'
     plt.savefig(fileName, bbox_inches='tight')
+    writeSummary (fileName, {'fields' : [fieldPrefix + field, fieldPrefix + field], \
+                                'files' : [geosCtmFile, gmiFile], \
+                                'date' : dateYearMonth, 'timeRecord' : timeRecord, \
+                                'statistics' : depStats})
 elif file == "s":
     plt.show()
     
@@ -42,18 +42,20 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
 from GmiPlotTools import GmiPlotTools
+from LevelPlotTools import createPanel, plotLevels
 
 
 NUM_ARGS = 6
 def usage ():
     print ""
-    print "usage: PlotField_GMI-GMI.py [-c] [-g] [-r] [-d] [-f] [-v]"
+    print "usage: PlotField_GMI-GMI.py [-c] [-g] [-r] [-d] [-f] [-v] [-p]"
     print "-c GMI file1"
     print "-g GMI file2"
     print "-r time record to plot"
     print "-d date of comparision (YYYYMM)"
     print "-f field to compare"
     print "-v which variable to extract field from"
+    print "-p number of levels to render at once (optional, default 1)"
     print ""
     sys.exit (0)
 
@@ -64,17 +66,20 @@ print "Start plotting field differences."
 #---------------------------------------------------------------
 # START:: Get options from command line
 #---------------------------------------------------------------
-optList, argList = getopt.getopt(sys.argv[1:],'c:g:r:d:f:v:')
-if len (optList) != NUM_ARGS:
+optList, argList = getopt.getopt(sys.argv[1:],'c:g:r:d:f:v:p:')
+options = dict(optList)
+if len (options) != len (optList) or \
+        not set(['-c', '-g', '-r', '-d', '-f', '-v']).issubset(options):
    usage ()
    sys.exit (0)
 
-gmiFile1 = optList[0][1]
-gmiFile2 = optList[1][1]
-timeRecord = int(optList[2][1])
-dateYearMonth = optList[3][1]
-fieldToCompare = optList[4][1]
-variableExtractField = optList[5][1]
+gmiFile1 = options['-c']
+gmiFile2 = options['-g']
+timeRecord = int(options['-r'])
+dateYearMonth = options['-d']
+fieldToCompare = options['-f']
+variableExtractField = options['-v']
+numProcesses = int(options.get('-p', 1))
 
 #---------------------------------------------------------------
 print ""
@@ -194,7 +199,6 @@ newGmiArray2 = numpy.zeros((gmiObject2.latSize, \
                              
 
 
-plt.figure(figsize=(20,20))
 
 print ""
 print "Processing: ", fieldToCompare
@@ -230,6 +234,9 @@ gmiObject1.createPlotObjects()
 gmiObject2.createPlotObjects()
 print ""
 
+# Panels of every level are collected first, then rendered together
+levelPlots = []
+
 
 
 
@@ -258,7 +265,8 @@ for modelLev in modelLevsToPlotGmi:
         z_Gmi2 = gmiFieldArray2[:,:]
 
 
-    z_Diff = z_Gmi1 / z_Gmi2
+    z_Diff = gmiObject1.returnRatio (z_Gmi1, z_Gmi2, \
+                                     positiveOverZero=1.5, negativeOverZero=.5)
 
     print ""
     print "Min/max of GMI1 : ", z_Gmi2.min(), "/", z_Gmi2.max()
@@ -292,15 +300,6 @@ for modelLev in modelLevsToPlotGmi:
         maxValueOfBoth = z_Gmi2.max()
 
 
-    # play with ratios a little
-    for lat in range(0, size(gmiObject1.lat)):
-        for long in range(0, size(gmiObject1.long)):
-
-            if z_Gmi1[lat, long] == 0.0 and z_Gmi2[lat, long] == 0.0:
-                z_Diff[lat, long] = 1.0
-            elif z_Gmi1[lat, long] != 0.0 and z_Gmi2[lat,long] == 0.0:
-                if z_Gmi1[lat, long] > 0.0: z_Diff[lat,long] = 1.5 #saturate
-                if z_Gmi1[lat, long] < 0.0: z_Diff[lat,long] = .5 #saturate
 
 
     #-----------------------------------------------------#
@@ -335,11 +334,12 @@ for modelLev in modelLevsToPlotGmi:
 
 
 
-    gmiObject1.create2dSlice2 (z_Gmi1, [useMin, useMax], \
+    panels = []
+    panels.append (createPanel (z_Gmi1, [useMin, useMax], \
                                       311, "GMI " + gmiSimName1 + "        " + \
                                       variableExtractField + "_" + \
                                       field + " @ " + str(modelLev) + \
-                                      "mb " + dateYearMonth, "jet")
+                                      "mb " + dateYearMonth, "jet"))
 
 
     print ""
@@ -362,44 +362,45 @@ for modelLev in modelLevsToPlotGmi:
     useMax = maxValueOfBoth
 
 
-    gmiObject1.create2dSlice2 (z_Gmi2, [useMin, useMax], \
+    panels.append (createPanel (z_Gmi2, [useMin, useMax], \
                                       312, "GMI " + gmiSimName2 + "        " + \
                                       variableExtractField + "_" + \
                                       field + " @ " + str(modelLev) + \
-                                      " mb " + dateYearMonth, "jet")
+                                      " mb " + dateYearMonth, "jet"))
 
 
-    gmiObject1.create2dSlice2 (z_Diff, \
+    panels.append (createPanel (z_Diff, \
                                      #[z_Diff.min(), z_Diff.max()], \
                                      [.5, 1.5], \
                                      313, "Model ratio        " + \
                                       variableExtractField + "_" + \
                                       field + " @ " + str(modelLev) + \
                                      " mb " + dateYearMonth, \
-                                     "nipy_spectral", \
-                                     normalize=True)
+                                     "nipy_spectral"))
 
     #-----------------------------------------------------#
 
 
 
-    file = "f"
-    if file == "f":
-        plt.savefig("plots/" + variableExtractField + "_" + field + ".GMI.GMI."
-                    + str(modelLev) + "." , bbox_inches='tight')
-    elif file == "s":
-        plt.show()
-        
-    print ""
-    print "Plotted : ", fieldToCompare, " @ ", str(modelLev), " to plots/directory"
-    print ""
+    levelPlots.append ({'outFile' : "plots/" + variableExtractField + "_" + field + \
+                           ".GMI.GMI." + str(modelLev) + ".", \
+                           'panels' : panels})
 
 
-    plt.clf()
 
     if rankArray1 == 2:
         break
 
+
+# One figure per level; with -p the levels are rendered at the same time
+failedPlots = plotLevels (gmiObject1, levelPlots, numProcesses)
+if len(failedPlots) != 0:
+    print "ERROR: could not plot: ", failedPlots
+    sys.exit(-1)
+
+print ""
+print "Plotted : ", fieldToCompare, " to plots/directory"
+print ""
                           
 sys.stdout.flush()
 
@@ -47,6 +47,8 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
+from MapTools import returnMapObjects
+from RegridTools import RegridTools
 
 
 NUM_ARGS = 9
@@ -226,10 +228,10 @@ cenModel1Lat = (minModel1Lat + maxModel1Lat)/2.
 cenModel1Long =  (minModel1Long + maxModel1Long)/2.
 
 
-baseMapModel1 = Basemap(llcrnrlon=minModel1Long,llcrnrlat=minModel1Lat,\
-                             urcrnrlon=maxModel1Long,urcrnrlat=maxModel1Lat,\
-                             projection='cyl', \
-                             lat_0=cenModel1Lat,lon_0=cenModel1Long)
+# Projection and grid come from the map cache (built once per extent)
+baseMapModel1, gridLonsModel1, gridLatsModel1, X_Model1, Y_Model1 = \
+    returnMapObjects (minModel1Lat, maxModel1Lat, minModel1Long, maxModel1Long, \
+                         modelObject1.latSize, modelObject1.longSize)
 
 print ""
 print "Basemap info: "
@@ -242,9 +244,6 @@ print ""
 
 
 
-gridLonsModel1,gridLatsModel1 = baseMapModel1.makegrid(modelObject1.longSize, \
-                                                              modelObject1.latSize)
-X_Model1, Y_Model1 = baseMapModel1(gridLonsModel1,gridLatsModel1)
 
 
 plt.figure(figsize=(20,20))
@@ -304,40 +303,10 @@ if z_Model1.shape != z_Model2.shape:
     print "Array shapes are different. Interpolation needed! ", z_Model1.shape, " verus ", z_Model2.shape
     print ""
 
-    # Arrays (one time record, one species)
-    longRecords = numpy.zeros(modelObject2.longSize, numpy.float32)
-    latRecords = numpy.zeros(modelObject2.latSize, numpy.float32)
-    newModel2Array = numpy.zeros((modelObject2.latSize, modelObject1.longSize), numpy.float32)
-    newModel2ArrayBoth = numpy.zeros((modelObject1.latSize, modelObject1.longSize), numpy.float32)
-
-
-    latCount = 0
-    for lat in modelObject2.lat[:]:
-        
-        # pull long records out of model 2
-        longRecords[:] = z_Model2[latCount, :]
-
-        yinterp = numpy.interp(modelObject1.long[:], modelObject2.long[:], longRecords)
-
-        newModel2Array [latCount, :] = yinterp[:]
-      
-        latCount = latCount + 1
-
-    print ""
-    print "Model-2 min / max / shape", newModel2Array.min(), " / ", newModel2Array.max(), " / ", newModel2Array.shape
-    print ""        
-
-    longCount = 0
-    for long in modelObject1.long[:]:
-
-        # pull lat records our of model 2
-        latRecords[:] = newModel2Array[:,longCount]
-
-        yinterp = numpy.interp(modelObject1.lat[:], modelObject2.lat[:], latRecords)
-
-        newModel2ArrayBoth [:, longCount] = yinterp[:]
-
-        longCount = longCount + 1
+    # Weights are cached, so repeated runs on these grids skip this step
+    regridObject = RegridTools (modelObject2.lat[:], modelObject2.long[:], \
+                                    modelObject1.lat[:], modelObject1.long[:])
+    newModel2ArrayBoth = regridObject.regrid (z_Model2)
 
     print ""
     print "Interpolated model 2 array min / max / shape: ", newModel2ArrayBoth.min(), " / " , newModel2ArrayBoth.max(), newModel2ArrayBoth.shape
@@ -426,10 +395,6 @@ print "Size of z_Diff: ", z_Diff.shape
 print ""
 
 
-latPoints = z_Diff.shape[0]
-lonPoints = z_Diff.shape[1]
-
-
 if analType == "d":
 
     
@@ -437,11 +402,7 @@ if analType == "d":
     print "Creating Percent Differences"
     print ""
 
-    for lat in range(0,latPoints):
-        for lon in range(0,lonPoints):
-            absVal = abs(z_Model1[lat,lon]-z_Model2[lat,lon])
-            denVal = (z_Model1[lat,lon]+z_Model2[lat,lon]) / 2.0
-            z_Diff [lat,lon] = (absVal/denVal) * 100.
+    z_Diff = modelObject1.returnPercentDifference (z_Model1, z_Model2)
 
     lowEnd = z_Diff.min()
     highEnd = z_Diff.max()
@@ -511,23 +472,14 @@ elif analType == "r":
 
 
 
-    z_Diff = z_Model1 / z_Model2
+    z_Diff = modelObject1.returnRatio (z_Model1, z_Model2, \
+                                       positiveOverZero=1.5, negativeOverZero=.5)
 
     print ""
     print "low end / high end for ratios: ", z_Diff.min(), " / ", z_Diff.max()
     print ""
 
 
-    # play with ratios a little
-    for lat in range(0, size(modelObject1.lat)):
-        for long in range(0, size(modelObject1.long)):
-
-            if z_Model1[lat, long] == 0.0 and z_Model2[lat, long] == 0.0:
-                z_Diff[lat, long] = 1.0
-            elif z_Model1[lat, long] != 0.0 and z_Model2[lat,long] == 0.0:
-                if z_Model1[lat, long] > 0.0: z_Diff[lat,long] = 1.5 #saturate
-                if z_Model1[lat, long] < 0.0: z_Diff[lat,long] = .5 #saturate
-
 
     modelObject1.create2dSlice (baseMapModel1, X_Model1, Y_Model1, z_Diff, \
                                     [.5, 1.5], \
@@ -45,6 +45,7 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
 from GmiPlotTools import GmiPlotTools
+from VerticalRegridTools import VerticalRegridTools, returnVerticalGrid
 
 
 FILE = "f"
@@ -336,14 +337,37 @@ plotZM (zmFile2, file2Object.lat[:], file2Object.lev[:], \
             plotOpt)
 
 
+# Different level sets: file 2 is interpolated (log-pressure) to the
+# levels of file 1 in every column, with the PS of each file
+zmRatioFile2 = None
 if shape(file2Object.lev) == shape(geosCtmObject.lev):
     print ""
     print "Levels are the same across files, will plot ratio!"
     print ""
+    zmRatioFile2 = zmFile2
+
+elif geosCtmObject.returnVariableName ("PS") != None:
+    print ""
+    print "Levels differ across files, interpolating file 2 to the levels of file 1"
+    print ""
+    psFile1 = geosCtmObject.returnField ("PS", timeRecord)
+    psFile2 = None
+    if file2Object.returnVariableName ("PS") != None:
+        psFile2 = file2Object.returnField ("PS", timeRecord)
+
+    try:
+        verticalObject = VerticalRegridTools (returnVerticalGrid (file2Object), \
+                                                  returnVerticalGrid (geosCtmObject))
+        zmRatioFile2 = numpy.mean (verticalObject.regrid (newFile2Array, psFile2, \
+                                                              psFile1), axis=2)
+    except ValueError as err:
+        print "Cannot interpolate file 2 to the levels of file 1: ", err
+
+if zmRatioFile2 is not None:
     ax3 = fig.add_subplot(313)    
     plotOpt['title'] = "Model ratio " + " " + " ZM " + dateYearMonth
-    plotZM (zmGeosCtm/zmFile2, file2Object.lat[:], \
-                file2Object.lev[:], fig, ax3, 'nipy_spectral', \
+    plotZM (zmGeosCtm/zmRatioFile2, geosCtmObject.lat[:], \
+                geosCtmObject.lev[:], fig, ax3, 'nipy_spectral', \
                 0.0, 1.5, plotOpt)
 
 
@@ -47,6 +47,8 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
 from GmiPlotTools import GmiPlotTools
+from RegridTools import RegridTools
+from TropopauseTools import returnModelTropopause, returnModelLevelPressures
 
 
 FILE = "f"
@@ -280,13 +282,6 @@ for level in useLevels[:]:
     count = count + 1
 
 
-tropLevels = useLevels [37::]
-
-print ""
-print "trop levels: "
-print tropLevels[:]
-print ""
-
 
 
 list1 = file2Object.fieldList
@@ -346,18 +341,6 @@ if foundField == False:
 
 # Arrays (one time record, one species or field)
 
-# file2 has the potential to have a different lognitude system and length 
-# This is because GMI is on a 0-360 system
-longRecords = numpy.zeros(file2Object.longSize, numpy.float32)
-
-remappedFile2Array = numpy.zeros((file2Object.levelSize, \
-                                    file2Object.latSize, \
-                                    file2Object.longSize), numpy.float32)
-
-newFile2Array = numpy.zeros((file2Object.levelSize, \
-                               file2Object.latSize, \
-                               geos5Object.longSize), numpy.float32)
-
 file2ZonalArray = numpy.zeros ((file2Object.levelSize, \
                                   file2Object.latSize), numpy.float32)
 
@@ -381,59 +364,27 @@ if variableExtractField == 'scav':
 else:
     geos5FieldArray = geos5Object.returnField (field, timeRecord)
 
-file2FieldArray = file2Object.returnField (field, timeRecord, variableExtractField)
-
-print "shapes of arrays: ", geos5FieldArray.shape, file2FieldArray.shape
-
-
-
-lenFile2Long = len(file2Object.long[:])
-remappedLong = numpy.zeros(lenFile2Long, float32)
-
-
-print ""
-print sim2Name
-print ""
-
-print ""
-print "lenFile2Long: ", lenFile2Long, int(lenFile2Long/2)
-print ""
-
-midLong = int(lenFile2Long/2)
-
-
-
-# put GMI on -180 to 0 to 180
+# file2 has the potential to have a different lognitude system and length 
+# This is because GMI is on a 0-360 system
 if file2Flag == "GMI" or sim2Name == "MERRA2_300":
 
     print ""
-    print "File2 appears to be in GMI format. Remapping longitude coordinate"
+    print "File2 appears to be in GMI format. Reading it in -180 to 180 order"
     print ""
 
-        
-    remappedFile2Array [:,:,0:midLong] = \
-        file2FieldArray[:,:,midLong:lenFile2Long]
-
-    remappedFile2Array [:,:,midLong:lenFile2Long] = \
-        file2FieldArray[:,:,0:midLong]
-
-
-
-    remappedLong [0:midLong] = file2Object.long[midLong:lenFile2Long] - 360.0
-
-    remappedLong [midLong:lenFile2Long] = file2Object.long[0:midLong]
-        
-    remappedLongPlus180 = numpy.zeros(lenFile2Long, float32)
-    remappedLongPlus180[:] = remappedLong[:] + 180.0
+    file2Object.setLongStart (-180.0)
 
 else: 
 
     print ""
     print "File2 appears to be in GEOS format. Will not remap longitude coordinate"
     print ""
-    
-    remappedFile2Array [:,:,:] = file2FieldArray[:,:,:]
-    remappedLong [:] = file2Object.long[:]
+
+
+file2FieldArray = file2Object.returnField (field, timeRecord, variableExtractField)
+remappedLong = file2Object.returnLongitudes ()
+
+print "shapes of arrays: ", geos5FieldArray.shape, file2FieldArray.shape
 
 
 
@@ -452,72 +403,17 @@ if file2FieldArray.shape != geos5FieldArray.shape:
     print ""
 
     
-    # Arrays (one time record at a time)
-    longRecords = numpy.zeros(file2Object.longSize, numpy.float32)
-    latRecords = numpy.zeros(file2Object.latSize, numpy.float32)
-
-    newModel2Array = numpy.zeros((geos5Object.levelSize, file2Object.latSize, geos5Object.longSize), numpy.float32)
-    newModel2ArrayBoth = numpy.zeros((geos5Object.levelSize, geos5Object.latSize, geos5Object.longSize), numpy.float32)
-
-
-    print ""
-    print geos5Object.lev[:]
-    print ""
-
-    for modelLev in geos5Object.lev[:]:
-
-        modelLevIndex = modelLev - 1
-
-        print ""
-        print "Interpolating data from model level: ", int(modelLev)
-        print ""
-
-        latCount = 0
-        for lat in file2Object.lat[:]:
-        
-            # pull long records out of model 2
-            longRecords[:] = remappedFile2Array[modelLevIndex, latCount, :]
-
-            yinterp = numpy.interp(geos5Object.long[:], file2Object.long[:], longRecords)
-            
-            newModel2Array [modelLevIndex, latCount, :] = yinterp[:]
-      
-            latCount = latCount + 1
-
-            #print ""
-            #print "Model-2 min / max / shape", newModel2Array.min(), " / ", newModel2Array.max(), " / ", newModel2Array.shape
-            #print ""        
-
-
-        #print ""
-        #print "Interpolated model 2 array min / max / shape: ", newModel2ArrayBoth.min(), " / " , newModel2ArrayBoth.max(), newModel2ArrayBoth.shape
-        #print ""
-
-
-        longCount = 0
-        for long in geos5Object.long[:]:
-
-            # pull lat records our of model 2
-            latRecords[:] = newModel2Array[modelLevIndex,:,longCount]
-
-            yinterp = numpy.interp(geos5Object.lat[:], file2Object.lat[:], latRecords)
-
-            newModel2ArrayBoth [modelLevIndex, :, longCount] = yinterp[:]
-
-            longCount = longCount + 1
-
-        #print ""
-        #print "Interpolated model 2 array min / max / shape: ", newModel2ArrayBoth.min(), " / " , newModel2ArrayBoth.max(), newModel2ArrayBoth.shape
-        #print ""
-
+    # Weights are cached, so repeated runs on these grids skip this step
+    regridObject = RegridTools (file2Object.lat[:], remappedLong[:], \
+                                    geos5Object.lat[:], geos5Object.long[:])
 
     newFile2Array = None
-    newFile2Array = newModel2ArrayBoth
+    newFile2Array = regridObject.regrid (file2FieldArray)
 
 
 else:
     print "Array shapes are the same. Will not interpolate"
-    newFile2Array[:,:, :] = remappedFile2Array[:,:,:]
+    newFile2Array = file2FieldArray
 
 
 
@@ -561,22 +457,44 @@ plotOpt = {}
 
 
 
-numTropLevels = len(tropLevels)
+# Per cell trop/strat partition at the GEOS tropopause (lapse rate);
+# 100 hPa where the file has no temperature or no tropopause is found.
+# Without level pressures there is no troposphere to plot.
+try:
+    levPressures = returnModelLevelPressures (geos5Object, timeRecord)
+except ValueError as error:
+    print ""
+    print "WARNING: ", error
+    print ""
+    levPressures = None
 
-print ""
-print "Plotting on these levels: ", tropLevels[:]
-print "" 
+if levPressures is None:
+    tropMask = numpy.zeros (geos5FieldArray.shape, bool)
+else:
+    if geos5Object.returnVariableName ("T") != None:
+        tropPressure = returnModelTropopause (geos5Object, timeRecord)[1]
+    else:
+        print ""
+        print "WARNING: no temperature in ", geos5File, ". Using a 100 hPa tropopause"
+        print ""
+        tropPressure = numpy.ones ((geos5Object.latSize, geos5Object.longSize)) * 100.
 
+    if levPressures.ndim == 1:
+        levPressures = levPressures[:, numpy.newaxis, numpy.newaxis]
+    tropMask = numpy.broadcast_to (levPressures >= tropPressure, geos5FieldArray.shape)
 
-zmGeosCtmTrop = zmGeosCtmRev[0:len(tropLevels),:]
-zmFile2Trop = zmFile2[0:len(tropLevels),:]
+    print ""
+    print "Zonal mean tropopause (hPa): ", tropPressure.mean(axis=1)
+    print ""
+
+zmGeosCtmTrop = numpy.ma.masked_where (~tropMask, geos5FieldArray).mean(axis=2)
 
-# minValueOfBoth = zmGeosCtmTrop.min()
-# maxValueOfBoth = zmGeosCtmTrop.max()
-# if zmFile2Trop.min() < minValueOfBoth:
-#     minValueOfBoth = zmFile2Trop.min()
-# if zmFile2Trop.max() > maxValueOfBoth:
-#     maxValueOfBoth = zmFile2Trop.max()
+# same orientation as FILE2
+if file2Flag == "GMI":
+    tropMask = tropMask[::-1, :, :]
+    zmGeosCtmTrop = zmGeosCtmTrop[::-1, :]
+
+zmFile2Trop = numpy.ma.masked_where (~tropMask, newFile2Array).mean(axis=2)
 
 
 
@@ -609,23 +527,12 @@ plotZM (zmFile2, geos5Object.lat[:], \
 
 ax3 = fig.add_subplot(313)    
 
-levPoints = zmGeosCtmRev.shape[0]
-latPoints = zmGeosCtmRev.shape[1]
-
-
 zmDiff = numpy.zeros((geos5Object.levelSize, \
                           geos5Object.latSize), numpy.float32)
 if analType == "d":
 
-    for lev in range(0,levPoints):
-        for lat in range(0,latPoints):
-            absVal = abs(zmGeosCtmRev[lev,lat]-zmFile2[lev,lat])
-            denVal = (zmGeosCtmRev[lev,lat]+zmFile2[lev,lat]) / 2.0
-            zmDiff [lev,lat] = (absVal/denVal) * 100.
-
-
-
-    zmDiffTrop = zmDiff[0:len(tropLevels),:]
+    zmDiff = geos5Object.returnPercentDifference (zmGeosCtmRev, zmFile2)
+    diffLabel = "Perc difference %"
 
     lowEnd = -zmDiff.mean()
     highEnd = zmDiff.mean()
@@ -668,8 +575,7 @@ elif analType == "s":
     print ""
 
     zmDiff = zmGeosCtmRev - zmFile2
-
-    zmDiffTrop = zmDiff[0:len(tropLevels),:]
+    diffLabel = "Absolute Difference "
 
     lowEnd = zmDiff.min()
     highEnd = zmDiff.max()
@@ -696,22 +602,16 @@ elif analType == "s":
 
 elif analType == "r":
 
-    zmDiff = zmGeosCtmRev/zmFile2
+    zmDiff = geos5Object.returnRatio (zmGeosCtmRev, zmFile2, \
+                                          positiveOverZero=1.5, negativeOverZero=.5)
+    diffLabel = "Model ratios"
+    lowEnd = -5
+    highEnd = 1.5
 
     print ("")
     print ("ratios min / max: ", zmDiff.min(), zmDiff.max())
     print ("")
 
-    for lev in range(0,levPoints):
-        for lat in range(0,latPoints):
-            if zmGeosCtmRev[lev,lat] == 0.0 and zmFile2[lev,lat] == 0.0:
-                zmDiff[lev,lat] = 1.0
-                print ("Updating to 1.0")
-            if zmGeosCtmRev[lev,lat] != 0.0 and zmFile2[lev,lat] == 0.0:
-                if zmGeosCtmRev[lev,lat] > 0.0: zmDiff[lev,lat] = 1.5
-                if zmGeosCtmRev[lev,lat] < 0.0: zmDiff[lev,lat] = .5
-                print ("Found ratio .5 away from 1!")
-
 
     plotOpt['title'] = "Ratios " + geos5SimName + " vs " + sim2Name + "   " + \
         field + " " + " ZM " + dateYearMonth
@@ -719,9 +619,9 @@ elif analType == "r":
     plotZM (zmDiff, geos5Object.lat[:], \
                 useLevels[:], fig, ax3, \
                 "PuOr", \
-                -5, 1.5, \
+                lowEnd, highEnd, \
 #                zmDiff.min(), zmDiff.max(), \
-                "Model ratios", plotOpt)
+                diffLabel, plotOpt)
 
 
 
@@ -742,6 +642,58 @@ plt.clf
 
 
 
+# Troposphere only: the same panels with the cells above the GEOS
+# tropopause masked, on the levels that have troposphere anywhere
+tropRows = ~numpy.ma.getmaskarray(zmGeosCtmTrop).all(axis=1)
+
+if not tropRows.any():
+    print ""
+    print "WARNING: no tropospheric levels found. Not plotting the troposphere"
+    print ""
+
+else:
+    zmDiffTrop = numpy.ma.masked_where (numpy.ma.getmaskarray(zmGeosCtmTrop), zmDiff)
+
+    minValueOfBoth = min(zmGeosCtmTrop.min(), zmFile2Trop.min())
+    maxValueOfBoth = max(zmGeosCtmTrop.max(), zmFile2Trop.max())
+
+    fig = plt.figure(figsize=(20,20))
+
+    ax1 = fig.add_subplot(311)
+    plotOpt['title'] = "Trop " + modelConfig + " " + geos5SimName + "        " + \
+        variableExtractField + " " + field + " ZM " + dateYearMonth
+    plotZM (zmGeosCtmTrop[tropRows], geos5Object.lat[:], \
+                useLevels[tropRows], \
+                fig, ax1, 'jet', \
+                minValueOfBoth, maxValueOfBoth, \
+                "Model values", plotOpt)
+
+    ax2 = fig.add_subplot(312)
+    plotOpt['title'] = "Trop " + plotTitleFile2 + " " + field + " ZM " + dateYearMonth
+    plotZM (zmFile2Trop[tropRows], geos5Object.lat[:], \
+                useLevels[tropRows], \
+                fig, ax2, 'jet', \
+                minValueOfBoth, maxValueOfBoth, \
+                "Model values", plotOpt)
+
+    ax3 = fig.add_subplot(313)
+    plotOpt['title'] = "Trop " + diffLabel + " " + geos5SimName + " vs " + sim2Name + \
+        "   " + field + " " + " ZM " + dateYearMonth
+    plotZM (zmDiffTrop[tropRows], geos5Object.lat[:], \
+                useLevels[tropRows], \
+                fig, ax3, 'PuOr', \
+                lowEnd, highEnd, \
+                diffLabel, plotOpt)
+
+    if FILE == "f":
+        plt.savefig ("plots/" + field + fileTitle \
+                         + "trop.", bbox_inches='tight')
+    else:
+        plt.show()
+    plt.clf()
+
+
+
 print ""
 print "Finished plotting: ", fieldToCompare, " to plots/ directory"
 print "Zonal mean diff min/max/mean: ", zmDiff.min(), "/", zmDiff.max(), zmDiff.mean()
@@ -39,6 +39,8 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
 from GmiPlotTools import GmiPlotTools
+from ColumnTools import ColumnTools, returnNearestLevel, returnLevelMassWeights
+from TropopauseTools import returnTropopauseSplit
 
 
 FILE = "f"
@@ -56,21 +58,6 @@ def usage ():
     print ""
     sys.exit (0)
 
-def find_nearest(array, value):
-    idx = (numpy.abs(array-value)).argmin()
-    return array[idx]
-
-def findLevelFromArray(array, value):
-
-    theValue = find_nearest(array[:], value)
-
-    levCount = 0
-    for item in array[:]:
-        if item == theValue:
-            returnLev = levCount
-        levCount = levCount + 1
-        
-    return returnLev
 
 
 def plotZM(data, x, y, fig, ax1, colorMap, dataMin, dataMax, plotOpt=None):
@@ -315,7 +302,7 @@ print ""
 
 
 # find tropMaxLev and tropMinLev
-tropMinLev = findLevelFromArray (file2Object.lev, 100.00)
+tropMinLev = returnNearestLevel (file2Object.lev, 100.00)
 
 print ""
 print "Trop min level: ", tropMinLev
@@ -337,15 +324,17 @@ print ""
 
 
 
-tropGeosCtm = geos5FieldArray[0:geos5TropPause, :,:]
-zmGeosCtmTrop = numpy.mean (tropGeosCtm[:,:,:], axis=2)
+# One zonal mean per field; the trop plots use its levels
+zmGeosCtm = numpy.mean (geos5FieldArray[:, :, :], axis=2)
+zmFile2 = numpy.mean (file2FieldArray[:, :, :], axis=2)
+
+zmGeosCtmTrop = zmGeosCtm[0:geos5TropPause, :]
 
 print ""
-print "size of tropGeosCtm1: ", tropGeosCtm.shape
+print "size of Trop ZM GEOS1: ", zmGeosCtmTrop.shape
 
 
-tropFile2 = file2FieldArray[0:geos5TropPause, :, :]
-zmFile2Trop = numpy.mean (tropFile2[:, :, :], axis=2)
+zmFile2Trop = zmFile2[0:geos5TropPause, :]
 
 
 print "" 
@@ -577,15 +566,19 @@ if fieldToCompare.lower() == "moistq" or \
     print ""
     print ""
     print ""
-    print "Shape of GEOS troposphere: ", shape(tropGeosCtm)
-    tropColGeosCtm = numpy.sum(tropGeosCtm[:,:,:], axis=0)
+    # Mass weighted columns (pressure levels, level 0 at the surface) split
+    # per cell at each file's tropopause (100 hPa without temperature);
+    # trop, strat and total columns come from one reduction per field
+    columnObject = ColumnTools (returnLevelMassWeights (geos5Object.lev[:]))
+    tropColGeosCtm, stratColGeosCtm, totalColGeosCtm = \
+        columnObject.returnColumns (geos5FieldArray, \
+                                       returnTropopauseSplit (geos5Object, timeRecord, \
+                                                                 columnObject))
+    tropColFile2, stratColFile2, totalColFile2 = \
+        columnObject.returnColumns (file2FieldArray, \
+                                       returnTropopauseSplit (file2Object, timeRecord, \
+                                                                 columnObject))
     print "Shape of tropCol GEOS troposphere: ", shape (tropColGeosCtm)
-    print "" 
-
-
-    print ""
-    print "Shape of File2 troposphere: ", shape(tropFile2)
-    tropColFile2 = numpy.sum(tropFile2[:,:,:], axis=0)
     print "Shape of tropCol file2 : ", shape(tropColFile2)
     print ""
 
@@ -625,13 +618,7 @@ if fieldToCompare.lower() == "moistq" or \
                                       312, plotTitle, "jet")
                             
 
-    tropColDiff = tropColGeosCtm / tropColFile2
-    for lat in range(0, size(geos5Object.lat)):
-        for long in range(0, size(geos5Object.long)):
-
-            if tropColGeosCtm[lat, long] == 0 and tropColFile2[lat, long] == 0:
-                #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-                tropColDiff[lat, long] = 1.0
+    tropColDiff = geos5Object.returnRatio (tropColGeosCtm, tropColFile2)
 
 
     ax3 = fig.add_subplot(313)  
@@ -662,15 +649,7 @@ if fieldToCompare.lower() == "moistq" or \
 
 
     print ""
-    print "Shape of GEOS stratosphere: ", shape(stratGeosCtm)
-    stratColGeosCtm = numpy.sum(stratGeosCtm[:,:,:], axis=0)
     print "Shape of stratCol GEOS: ", shape(stratColGeosCtm)
-    print ""
-
-
-    print ""
-    print "Shape of File2 stratesphere: ", shape(stratFile2)
-    stratColFile2 = numpy.sum(stratFile2[:,:,:], axis=0)
     print "Shape of stratCol file2: ", shape(stratColFile2)
     print ""
 
@@ -711,13 +690,7 @@ if fieldToCompare.lower() == "moistq" or \
                                       [minValueOfBoth, maxValueOfBoth], \
                                       312, plotTitle, "jet")
                             
-    stratColDiff = stratColGeosCtm / stratColFile2
-    for lat in range(0, size(geos5Object.lat)):
-        for long in range(0, size(geos5Object.long)):
-
-            if stratColGeosCtm[lat, long] == 0 and stratColFile2[lat, long] == 0:
-                #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-                stratColDiff[lat, long] = 1.0
+    stratColDiff = geos5Object.returnRatio (stratColGeosCtm, stratColFile2)
 
     ax3 = fig.add_subplot(313)    
     plotTitle = "Strat Column model ratio for         " + variableExtractField + "_" + \
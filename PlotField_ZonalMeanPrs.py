@@ -253,38 +253,24 @@ print ("Number of vertical levels in file: ", len(levelsFile1))
 print ("")
  
 
-foundPressureTop = False
-pressureTopIndex = None
-levCount = 0
-
 print ("")
 print ("Looking for: ", pressureLevelTop)
 print ("")
 
-for lev in levelsFile1[:]:
-
-    print (lev, "=?", pressureLevelTop)
-
-    if float(lev) == float(pressureLevelTop) or foundPressureTop == True:
-
-        if foundPressureTop == False:
-            print ("")
-            print ("Start index of levels to plot: ", levCount)
-            print ("")
-            pressureTopIndex = levCount
-            foundPressureTop = True
-            break
-                       
-    levCount = levCount + 1
-
-
-
-if foundPressureTop == False:
+# the level whose pressure is the top (to within rounding of the file values)
+try:
+    pressureTopIndex = int(file1Object.returnLevelIndices ([float(pressureLevelTop)], \
+                                                             tolerance=1.0e-3)[0])
+except ValueError:
     print ("")
     print ("Error: pressure top specified was not found in level array!")
     print ("")
     sys.exit(0)
 
+print ("")
+print ("Start index of levels to plot: ", pressureTopIndex)
+print ("")
+
 numLevelsToPlot = size(levelsFile1) - pressureTopIndex
 
 print ("")
@@ -293,11 +279,7 @@ print ("Num levels to plot: ", numLevelsToPlot)
 print ("")
 
 
-pressuresToPlot = numpy.zeros(numLevelsToPlot)
-levCount = 0
-for lev in levelsFile1[pressureTopIndex:]:
-    pressuresToPlot[levCount] = lev
-    levCount+=1
+pressuresToPlot = numpy.asarray(levelsFile1[pressureTopIndex:], numpy.float64)
 
 
 print ("")
@@ -44,6 +44,8 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
 from GmiPlotTools import GmiPlotTools
+from ColumnTools import ColumnTools, returnNearestLevel, returnLevelMassWeights
+from TropopauseTools import returnTropopauseSplit
 
 
 FILE = "f"
@@ -61,21 +63,6 @@ def usage ():
     print ""
     sys.exit (0)
 
-def find_nearest(array, value):
-    idx = (numpy.abs(array-value)).argmin()
-    return array[idx]
-
-def findLevelFromArray(array, value):
-
-    theValue = find_nearest(array[:], value)
-
-    levCount = 0
-    for item in array[:]:
-        if item == theValue:
-            returnLev = levCount
-        levCount = levCount + 1
-        
-    return returnLev
 
 
 def plotZM(data, x, y, fig, ax1, colorMap, dataMin, dataMax, plotOpt=None):
@@ -302,7 +289,7 @@ if file2FieldArray.shape != file1FieldArray.shape:
 
 
 # find tropMaxLev and tropMinLev
-tropMinLev = findLevelFromArray (file2Object.lev, 100.00)
+tropMinLev = returnNearestLevel (file2Object.lev, 100.00)
 
 print ""
 print "Trop min level: ", tropMinLev
@@ -323,10 +310,12 @@ print "GMI surface and tropopause levels: ", gmiSurface, gmiTropPause
 print ""
 
 
-tropFile1 = file1FieldArray[0:tropMinLev+1, :, :]
-zmFile1Trop = numpy.mean (file1FieldArray[0:tropMinLev+1, :, :], axis=2)
-tropFile2 = file2FieldArray[0:tropMinLev+1, :, :]
-zmFile2Trop = numpy.mean (file2FieldArray[0:tropMinLev+1, :, :], axis=2)
+# One zonal mean per field; the trop and strat plots use its levels
+zmFile1 = numpy.mean (file1FieldArray[:, :, :], axis=2)
+zmFile2 = numpy.mean (file2FieldArray[:, :, :], axis=2)
+
+zmFile1Trop = zmFile1[0:tropMinLev+1, :]
+zmFile2Trop = zmFile2[0:tropMinLev+1, :]
 
 
 
@@ -422,10 +411,8 @@ else:
 plt.clf
 
 
-zmFile1Strat = numpy.mean (file1FieldArray[tropMinLev::,:,:], axis=2)
-stratFile1 = file1FieldArray[tropMinLev::,:,:]
-zmFile2Strat = numpy.mean (file2FieldArray[tropMinLev::,:,:], axis=2)
-stratFile2 = file2FieldArray[tropMinLev::,:,:]
+zmFile1Strat = zmFile1[tropMinLev::, :]
+zmFile2Strat = zmFile2[tropMinLev::, :]
 
 minValueOfBoth = zmFile1Strat.min()
 maxValueOfBoth = zmFile1Strat.max()
@@ -516,15 +503,19 @@ if fieldToCompare.lower() == "moistq" or \
     print ""
     print ""
     print ""
-    print "Shape of GMI troposphere 1: ", shape(tropFile1)
-    tropColFile1 = numpy.sum(tropFile1[:,:,:], axis=0)
+    # Mass weighted columns split per cell at each file's tropopause
+    # (100 hPa without temperature); trop, strat and total columns come
+    # from one reduction per field
+    columnObject = ColumnTools (returnLevelMassWeights (file1Object.lev[:]))
+    tropColFile1, stratColFile1, totalColFile1 = \
+        columnObject.returnColumns (file1FieldArray, \
+                                       returnTropopauseSplit (file1Object, timeRecord, \
+                                                                 columnObject))
+    tropColFile2, stratColFile2, totalColFile2 = \
+        columnObject.returnColumns (file2FieldArray, \
+                                       returnTropopauseSplit (file2Object, timeRecord, \
+                                                                 columnObject))
     print "Shape of tropCol GMI troposphere 1: ", shape (tropColFile1)
-    print "" 
-
-
-    print ""
-    print "Shape of GMI troposphere 2: ", shape(tropFile2)
-    tropColFile2 = numpy.sum(tropFile2[:,:,:], axis=0)
     print "Shape of tropCol file2 : ", shape(tropColFile2)
     print ""
 
@@ -566,13 +557,7 @@ if fieldToCompare.lower() == "moistq" or \
                                       312, plotTitle, "jet")
                             
 
-    tropColDiff = tropColFile1 / tropColFile2
-    for lat in range(0, size(file1Object.lat)):
-        for long in range(0, size(file1Object.long)):
-
-            if tropColFile1[lat, long] == 0 and tropColFile2[lat, long] == 0:
-                #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-                tropColDiff[lat, long] = 1.0
+    tropColDiff = file1Object.returnRatio (tropColFile1, tropColFile2)
 
 
     ax3 = fig.add_subplot(313)  
@@ -598,15 +583,7 @@ if fieldToCompare.lower() == "moistq" or \
 
 
     print ""
-    print "Shape of GMI stratosphere 1: ", shape(stratFile1)
-    stratColFile1 = numpy.sum(stratFile1[:,:,:], axis=0)
     print "Shape of stratCol GMI 1: ", shape(stratColFile1)
-    print ""
-
-
-    print ""
-    print "Shape of GMI stratesphere 2: ", shape(stratFile2)
-    stratColFile2 = numpy.sum(stratFile2[:,:,:], axis=0)
     print "Shape of stratCol GMI 2: ", shape(stratColFile2)
     print ""
 
@@ -646,13 +623,7 @@ if fieldToCompare.lower() == "moistq" or \
                                       [minValueOfBoth, maxValueOfBoth], \
                                       312, plotTitle, "jet")
                             
-    stratColDiff = stratColFile1 / stratColFile2
-    for lat in range(0, size(file1Object.lat)):
-        for long in range(0, size(file1Object.long)):
-
-            if stratColFile1[lat, long] == 0 and stratColFile2[lat, long] == 0:
-                #print "Setting 0/0 to 1 in difference array at: [", long, ",", lat,"]"
-                stratColDiff[lat, long] = 1.0
+    stratColDiff = file1Object.returnRatio (stratColFile1, stratColFile2)
 
     ax3 = fig.add_subplot(313)    
     plotTitle = "Strat Column model ratio for         " + variableExtractField + "_" + \
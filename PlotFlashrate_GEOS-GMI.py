@@ -36,6 +36,7 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
 from GmiPlotTools import GmiPlotTools
+from StatisticsTools import StatisticsTools, returnModelCellAreas, writeSummary
 
 
 NUM_ARGS = 6
@@ -124,20 +125,13 @@ gmiObject = GmiPlotTools (gmiFile, 'latitude_dim', 'longitude_dim', \
 gmiObject.fieldName = fieldToCompareGmi
 
 
-# Arrays (one time record, one species)
-longRecords = numpy.zeros(gmiObject.longSize, numpy.float32)
-
-remappedGmiArray = numpy.zeros((gmiObject.latSize, \
-                                    gmiObject.longSize), numpy.float32)
-remappedMcorArray = numpy.zeros((gmiObject.latSize, \
-                                    gmiObject.longSize), numpy.float32)
-
-
-                             
 plt.figure(figsize=(20,20))
 
 field = fieldToCompareGeos
 geosCtmFieldArray = geosCtmObject.returnField (field, timeRecord)
+
+# GMI is on 0-360 longitude; read it in GEOS (-180 to 180) order
+gmiObject.setLongStart (-180.0)
 gmiFieldArray = gmiObject.returnField (fieldToCompareGmi, timeRecord, '')
 gmiMcorArray = gmiObject.returnConstantField ('mcor')
 
@@ -149,22 +143,6 @@ print ""
 
 
 
-# put GMI on -180 to 0 to 180
-lenGmiLong = len(gmiObject.long[:])
-remappedGmiArray [:,0:lenGmiLong/2] = gmiFieldArray[:,lenGmiLong/2:lenGmiLong]
-remappedGmiArray [:,lenGmiLong/2:lenGmiLong] = gmiFieldArray[:,0:lenGmiLong/2]
-remappedMcorArray [:,0:lenGmiLong/2] = gmiMcorArray[:,lenGmiLong/2:lenGmiLong]
-remappedMcorArray [:,lenGmiLong/2:lenGmiLong] = gmiMcorArray[:,0:lenGmiLong/2]
-remappedLong = numpy.zeros(lenGmiLong, float32)
-remappedLong [0:lenGmiLong/2] = gmiObject.long[lenGmiLong/2:lenGmiLong] - 360.0
-remappedLong [lenGmiLong/2:lenGmiLong] = gmiObject.long[0:lenGmiLong/2]
-remappedLongPlus180 = numpy.zeros(lenGmiLong, float32)
-remappedLongPlus180[:] = remappedLong[:] + 180.0
-geosCtmLongPlus180 = numpy.zeros(geosCtmObject.longSize, float32)
-geosCtmLongPlus180 [:] = geosCtmObject.long[:] + 180.0
-
-
-
 # Prepares basemap objects for plotting
 print ""
 print "Creating GEOS-CTM plot objects..."
@@ -175,8 +153,8 @@ print ""
 
 
 print ""
-print "shape of remappedGmiArray: ", shape(remappedGmiArray)
-print "shape of remappedMcorArray: ", shape(remappedMcorArray)
+print "shape of gmiFieldArray: ", shape(gmiFieldArray)
+print "shape of gmiMcorArray: ", shape(gmiMcorArray)
 print ""
 
 
@@ -184,11 +162,11 @@ print ""
 z_GeosCtm = geosCtmFieldArray[:, :]
 z_GeosCtm = z_GeosCtm  
 
-print "mcorArray min/max; ", remappedMcorArray.min(), remappedMcorArray.max()
+print "mcorArray min/max; ", gmiMcorArray.min(), gmiMcorArray.max()
 
-#z_Gmi = remappedGmiArray[:, :]  
-z_Gmi = remappedGmiArray[:, :]  / (remappedMcorArray[:,:] / 1e6)
-z_Diff = z_GeosCtm / z_Gmi
+#z_Gmi = gmiFieldArray[:, :]  
+z_Gmi = gmiFieldArray[:, :]  / (gmiMcorArray[:,:] / 1e6)
+z_Diff = geosCtmObject.returnRatio (z_GeosCtm, z_Gmi)
 
 print ""
 print "Min/max of GMI: ", z_Gmi.min(), "/", z_Gmi.max()
@@ -203,10 +181,6 @@ if z_Gmi.min() < minValueOfBoth:
 if z_Gmi.max() > maxValueOfBoth:
     maxValueOfBoth = z_Gmi.max()
 
-for lat in range(0, size(geosCtmObject.lat)):
-    for long in range(0, size(geosCtmObject.long)):        
-        if z_Gmi[lat, long] == 0 and z_GeosCtm[lat, long] == 0:
-            z_Diff[lat, long] = 1.0
 
 
 #-----------------------------------------------------#
@@ -240,11 +214,17 @@ print "GMI ", fieldToCompareGmi, " min/max/mean : ", z_Gmi.min(), " / ", z_Gmi.m
 print "" 
 
 print "" 
-geosCtmGlobalSum = sum(z_GeosCtm)
-gmiCtmGlobalSum = sum(z_Gmi)
-print "GEOS-CTM flashrate global sum: ", geosCtmGlobalSum 
-print "GMI flashrate global sum: ", gmiCtmGlobalSum
-print "Diff: ", (geosCtmGlobalSum/gmiCtmGlobalSum)
+# Both rates are per km2 (GMI was divided by mcor), so totals use areas in km2
+statsObject = StatisticsTools (geosCtmObject.lat[:], \
+                                   returnModelCellAreas (geosCtmObject) / 1e6)
+flashrateStats = statsObject.returnPairStatistics (z_GeosCtm, z_Gmi)
+geosCtmGlobalSum = flashrateStats['global']['total1']
+gmiCtmGlobalSum = flashrateStats['global']['total2']
+print "GEOS-CTM flashrate global total: ", geosCtmGlobalSum 
+print "GMI flashrate global total: ", gmiCtmGlobalSum
+print "Diff: ", flashrateStats['global']['ratio']
+print "Bias / RMSE / correlation: ", flashrateStats['global']['bias'], " / ", \
+    flashrateStats['global']['rmse'], " / ", flashrateStats['global']['correlation']
 print 
 print ""
 
@@ -264,7 +244,12 @@ geosCtmObject.create2dSlice2 (z_Diff, \
 
 file = "f"
 if file == "f":
-    plt.savefig("plots/Flashrate.GEOS-CTM.GMI." + dateYearMonth + ".", bbox_inches='tight')
+    plotFile = "plots/Flashrate.GEOS-CTM.GMI." + dateYearMonth + "."
+    plt.savefig(plotFile, bbox_inches='tight')
+    writeSummary (plotFile, {'fields' : [fieldToCompareGeos, fieldToCompareGmi], \
+                                'files' : [geosCtmFile, gmiFile], \
+                                'date' : dateYearMonth, 'timeRecord' : timeRecord, \
+                                'statistics' : flashrateStats})
 elif file == "s":
     plt.show()
     
@@ -43,6 +43,7 @@ sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
+from MapTools import returnMapObjects
 
 
 NUM_ARGS = 6
@@ -148,10 +149,10 @@ cenModelLat = (minModelLat + maxModelLat)/2.
 cenModelLong =  (minModelLong + maxModelLong)/2.
 
 
-baseMapModel = Basemap(llcrnrlon=minModelLong,llcrnrlat=minModelLat,\
-                             urcrnrlon=maxModelLong,urcrnrlat=maxModelLat,\
-                             projection='cyl', \
-                             lat_0=cenModelLat,lon_0=cenModelLong)
+# Projection and grid come from the map cache (built once per extent)
+baseMapModel, gridLonsModel, gridLatsModel, X_Model, Y_Model = \
+    returnMapObjects (minModelLat, maxModelLat, minModelLong, maxModelLong, \
+                         modelObject.latSize, modelObject.longSize)
 
 print ""
 print "Basemap info: "
@@ -164,9 +165,6 @@ print ""
 
 
 
-gridLonsModel,gridLatsModel = baseMapModel.makegrid(modelObject.longSize, \
-                                                              modelObject.latSize)
-X_Model, Y_Model = baseMapModel(gridLonsModel,gridLatsModel)
 
 
 plt.figure(figsize=(20,20))
@@ -42,85 +42,19 @@ import matplotlib.colors as colors
 from matplotlib.ticker import MaxNLocator
 from mpl_toolkits.basemap import Basemap
 
-a60 = [ 4.000000,      8.410209,     15.007380,     23.882399, \
-            35.228500,     49.614000,     67.954499,     91.591501, \
-            122.426903,    163.065100,    216.956210,    288.637590, \
-            384.077191,    511.065197,    679.737186,    903.167152, \
-            1197.636032,   1582.196045,   2077.680969,   2705.458069, \
-            3485.707092,   4436.783981,   5576.924133,   6926.213837, \
-            8506.793976,  10315.518812,  12289.374161,  14334.020781, \
-            16321.404725,  18110.111092,  19576.032411,  20638.077710, \
-            21266.755819,  21473.879844,  21296.160346,  20781.830521, \
-            19984.194862,  18959.598129,  17762.956794,  16445.772200, \
-            15056.029843,  13637.103590,  12228.047148,  10861.943576, \
-            9562.669233,   8346.207025,   7221.649057,   6192.382004, \
-            5257.727627,   4415.565315,   3664.005389,   3000.188436, \
-            2419.896338,   1918.332467,   1489.726127,   1127.297079, \
-            824.574520,    573.157962,    359.606242,    170.947814, \
-            0.000000 ]
-
-
-b60 = [ 0.00000000,  0.00000000,  0.00000000,  0.00000000, \
-            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
-            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
-            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
-            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
-            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
-            0.00000000,  0.00022552,  0.00143056,  0.00463150, \
-            0.01113877,  0.02235216,  0.03944360,  0.06309207, \
-            0.09342443,  0.13012139,  0.17256010,  0.21993621, \
-            0.27124611,  0.32530609,  0.38094920,  0.43706170, \
-            0.49258491,  0.54656649,  0.59815258,  0.64665151, \
-            0.69163948,  0.73290408,  0.77040631,  0.80424500, \
-            0.83460701,  0.86168867,  0.88564998,  0.90666068, \
-            0.92491567,  0.94061267,  0.95396912,  0.96522278, \
-            0.97459513,  0.98236012,  0.98894250,  0.99474782, \
-            1.00000000 ]
-
-a72 = [ 1.0000000,       2.0000002,       3.2700005,       4.7585009,       6.6000011, \
-            8.9345014,       11.970302,       15.949503,       21.134903,       27.852606, \
-            36.504108,       47.580610,       61.677911,       79.513413,       101.94402, \
-            130.05102,       165.07903,       208.49704,       262.02105,       327.64307, \
-            407.65710,       504.68010,       621.68012,       761.98417,       929.29420, \
-            1127.6902,       1364.3402,       1645.7103,       1979.1604,       2373.0405, \
-            2836.7806,       3381.0007,       4017.5409,       4764.3911,       5638.7912, \
-            6660.3412,       7851.2316,       9236.5722,       10866.302,       12783.703, \
-            15039.303,       17693.003,       20119.201,       21686.501,       22436.301, \
-            22389.800,       21877.598,       21214.998,       20325.898,       19309.696, \
-            18161.897,       16960.896,       15625.996,       14290.995,       12869.594, \
-            11895.862,       10918.171,       9936.5219,       8909.9925,       7883.4220, \
-            7062.1982,       6436.2637,       5805.3211,       5169.6110,       4533.9010, \
-            3898.2009,       3257.0809,       2609.2006,       1961.3106,       1313.4804, \
-            659.37527,       4.8048257,       0.0000000 ]
-
-b72 = [ 0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
-            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
-            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
-            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
-            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
-            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
-            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
-            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
-            0.0000000,   8.1754130e-09,    0.0069600246,     0.028010041,     0.063720063, \
-            0.11360208,      0.15622409,      0.20035011,      0.24674112,      0.29440312, \
-            0.34338113,      0.39289115,      0.44374018,      0.49459020,      0.54630418, \
-            0.58104151,      0.61581843,      0.65063492,      0.68589990,      0.72116594, \
-            0.74937819,      0.77063753,      0.79194696,      0.81330397,      0.83466097, \
-            0.85601798,      0.87742898,      0.89890800,      0.92038701,      0.94186501, \
-            0.96340602,      0.98495195,       1.0000000 ]
-
-
-
 sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
 from GeosCtmPlotTools import GeosCtmPlotTools
 from GenericModelPlotTools import GenericModelPlotTools
+from RegridTools import RegridTools
+from PressureTools import createPressureObject
+from VerticalRegridTools import VerticalRegridTools
 
 
 NUM_ARGS = 9
 def usage ():
     print ""
-    print "usage: PlotVerticalProfiles.py [-c] [-g] [-l] [-k] [-r] [-d] [-u] [-f] [-a]"
+    print "usage: PlotVerticalProfiles.py [-c] [-g] [-l] [-k] [-r] [-d] [-u] [-f] [-a] [-n]"
     print "-c Model file 1"
     print "-g Model file 2"
     print "-l vertical level for file 1"
@@ -130,18 +64,70 @@ def usage ():
     print "-u unit of vertical level (lev/hPa)"
     print "-f field to compare"
     print "-a analysis type (d=perc diff, s=simple diff, r=ratio"
+    print "-n (optional) plot the n largest differences over all levels"
     print ""
     sys.exit (0)
 
 
 
+#---------------------------------------------------------------
+# Plots model 1 and model 2 profiles (surface first) against their
+# mid-level pressures (hPa) and saves the figure to fileName.
+#---------------------------------------------------------------
+def plotVerticalProfile (vertProfile1, midPress1, vertProfile2, midPress2, \
+                             plotTitle, fileName):
+
+    plt.figure(figsize=(20,20))
+
+    print ""
+    print "Vert profile 1 at surface: ", vertProfile1[0], "(", midPress1[0], " hPa) at top: ", vertProfile1[-1], " (", midPress1[-1], " hPa)"
+    print "Vert profile 2 at surface: ", vertProfile2[0], "(", midPress2[0], " hPa) at top: ", vertProfile2[-1], " (", midPress2[-1], " hPa)"
+    print ""
+
+    plt.plot(vertProfile1, midPress1[:], color="blue", label='NRL ' + str(len(vertProfile1)) + ' level')
+    plt.plot(vertProfile2, midPress2[:], color="red", label='NRL ' + str(len(vertProfile2)) + ' level')
+    plt.title (plotTitle)
+    plt.ylabel ("pressure coordinates (hPa) ")
+    plt.xlabel (fieldToCompare)
+    plt.grid(True)
+    plt.legend(loc='upper right', shadow=False, fontsize='large')
+
+    axes = plt.gca()
+    axes.invert_yaxis()
+    axes.set_yscale('log')
+
+    minPress = min(min(midPress1), min(midPress2))
+    maxPress = max(max(midPress1), max(midPress2))
+    print "min of mid press 1 & 2: ", minPress
+    print "max of mid press 1 & 2: ", maxPress
+
+    pressureRange1 = pl.frange (minPress,10.,1.)
+    pressureRange2 = pl.frange(15,100.,10.)
+    pressureRange3 = pl.frange(150.,maxPress,150.)
+    pressureRange = concatenate([pressureRange1,pressureRange2, pressureRange3])
+    print "pressure range to plot: ", pressureRange[:]
+
+    #axes.set_yticks(midPress2[::4])
+    axes.set_yticks(pressureRange)
+    axes.get_yaxis().set_major_formatter(matplotlib.ticker.ScalarFormatter())
+
+    file = "f"
+    if file == "f":
+        plt.savefig(fileName, bbox_inches='tight')
+    elif file == "s":
+        plt.show()
+
+    plt.close()
+
+
+
 print "Start plotting field differences."
 
 #---------------------------------------------------------------
 # START:: Get options from command line
 #---------------------------------------------------------------
-optList, argList = getopt.getopt(sys.argv[1:],'c:g:l:k:r:d:u:f:a:')
-if len (optList) != NUM_ARGS:
+optList, argList = getopt.getopt(sys.argv[1:],'c:g:l:k:r:d:u:f:a:n:')
+if len (optList) != NUM_ARGS and len (optList) != NUM_ARGS + 1:
    usage ()
    sys.exit (0)
 
@@ -155,6 +141,10 @@ levUnit = str(optList[6][1])
 fieldToCompare = str(optList[7][1])
 analType = str(optList[8][1])
 
+numProfiles = 0
+if len (optList) == NUM_ARGS + 1:
+    numProfiles = int(optList[9][1])
+
 
 #---------------------------------------------------------------
 print ""
@@ -188,6 +178,10 @@ if len(dateYearMonth) != 6:
     print "ERROR date must be in the format YYYYMM. Received: ", dateYearMonth
     sys.exit(0)
 
+if numProfiles < 0:
+    print "ERROR: the number of profiles needs to be positive!"
+    sys.exit(0)
+
 if analType != "r" and analType != "d" and analType != "s":
     print "ERROR: analysis type must be r (ratios) or d (percent differences) or s (simple difference)"
     sys.exit(0)
@@ -285,106 +279,158 @@ print ""
 print ""
 print "Processing: ", fieldToCompare
 print ""
-    
 
 
 
+#---------------------------------------------------------------
+# Top-K mode: the largest differences over all levels, one profile
+# per column, from a single read of each field and PS
+#---------------------------------------------------------------
+if numProfiles > 0:
 
+    if analType != "s":
+        print ""
+        print "Analysis type: ", analType, " not supported!"
+        print ""
+        sys.exit(0)
 
+    fieldArray1 = modelObject1.returnField (fieldToCompare, timeRecord)
+    fieldArray2 = modelObject2.returnField (fieldToCompare, timeRecord)
+    psArray1 = modelObject1.returnField ("PS", timeRecord)
+    psArray2 = modelObject2.returnField ("PS", timeRecord)
 
-modelFieldArray1 = modelObject1.returnField (fieldToCompare, timeRecord)
-modelFieldArray2 = modelObject2.returnField (fieldToCompare, timeRecord)
-psArray1 = modelObject1.returnField ("PS", timeRecord)
-psArray2 = modelObject2.returnField ("PS", timeRecord)
+    if len(fieldArray1.shape) != 3 or len(fieldArray2.shape) != 3:
+        print ""
+        print "Field is 2D. There is no vertical profile to plot!"
+        print ""
+        sys.exit(0)
 
+    if fieldArray1.shape[1:] != fieldArray2.shape[1:]:
+        print ""
+        print "Array shapes are different. Interpolation needed!"
+        print ""
+        regridObject = RegridTools (modelObject2.lat[:], modelObject2.long[:], \
+                                        modelObject1.lat[:], modelObject1.long[:])
+        fieldArray2 = regridObject.regrid (fieldArray2)
+        psArray2 = regridObject.regrid (psArray2)
+
+    pressureObject1 = createPressureObject (modelObject1, fieldArray1.shape[0])
+    pressureObject2 = createPressureObject (modelObject2, fieldArray2.shape[0])
+
+    # Levels match one to one on the same vertical grid; otherwise model 2
+    # is interpolated (log-pressure) to the levels of model 1 in every column
+    searchArray2 = fieldArray2
+    if modelObject1.levelSize != modelObject2.levelSize or \
+            not numpy.allclose(modelObject1.lev[:], modelObject2.lev[:]):
+        print ""
+        print "Vertical grids differ; interpolating model 2 to the levels of model 1"
+        print ""
+        verticalObject = VerticalRegridTools (pressureObject2, pressureObject1)
+        searchArray2 = verticalObject.regrid (fieldArray2, psArray2, psArray1, \
+                                                  bottomUpOut=True)
 
+    searchLevels1 = range(0, fieldArray1.shape[0])
+    z_Diff = numpy.ma.filled(fieldArray1 - searchArray2, 0.0)
+    absDiff = numpy.abs(z_Diff)
+    absDiff[numpy.isnan(absDiff)] = 0.0
 
-if len(modelFieldArray1.shape) == 2:
-    print ""
-    print "WARNING!!! Field is 2D"
-    print ""
-    z_Model1 = modelFieldArray1[:, :]
-    z_Model2 = modelFieldArray2[:, :]
-    file1Level = 0
-    file2Level = 0 
+    # one value per column: its largest difference and the level it is on
+    columnLevels = absDiff.argmax(axis=0).ravel()
+    columnDiffs = absDiff.max(axis=0).ravel()
+
+    numProfiles = min(numProfiles, columnDiffs.size)
+    topColumns = numpy.argpartition(-columnDiffs, numProfiles - 1)[:numProfiles]
+    topColumns = topColumns[numpy.argsort(-columnDiffs[topColumns])]
+
+    latIndices, longIndices = numpy.unravel_index(topColumns, z_Diff.shape[1:])
+    levIndices = columnLevels[topColumns]
+
+    # one profile per column, labeled with its largest difference
+    profilePoints = []
+    for point in range(0, numProfiles):
+        profilePoints.append((levIndices[point], latIndices[point], longIndices[point], \
+                                  z_Diff[levIndices[point], latIndices[point], \
+                                             longIndices[point]]))
 
-elif len(modelFieldArray1.shape) == 3:
-    print "Field is 3D (expected)"
-    z_Model1 = modelFieldArray1[file1Level, :, :]
-    z_Model2 = modelFieldArray2[file2Level, :, :]
-else:
     print ""
-    print "Unexpected rank of data!"
+    print "Plotting profiles of the ", numProfiles, \
+        " columns with the largest differences"
     print ""
-    sys.exit(0)
 
-print ""
+    pointLats = [item[1] for item in profilePoints]
+    pointLongs = [item[2] for item in profilePoints]
 
+    # all columns are gathered with one fancy index per model
+    profiles1, midPressures1 = pressureObject1.returnProfiles \
+        (fieldArray1, psArray1, pointLats, pointLongs, bottomUp=True)
+    profiles2, midPressures2 = pressureObject2.returnProfiles \
+        (fieldArray2, psArray2, pointLats, pointLongs)
 
-print ""
-print "Shape of PS 1: ", psArray1.shape
-print "Shape of PS 2: ", psArray2.shape
-print ""
+    # model 2 is reversed to surface at level 0 (as below)
+    profiles2 = profiles2[:, ::-1]
+    midPressures2 = midPressures2[:, ::-1]
 
+    degree_sign= u'\N{DEGREE SIGN}'
+    for point in range(0, len(profilePoints)):
 
+        searchLev = searchLevels1[profilePoints[point][0]]
+        latCoord = modelObject1.lat[profilePoints[point][1]]
+        lonCoord = modelObject1.long[profilePoints[point][2]]
+        largestDiff = profilePoints[point][3]
 
+        plotTitle = dateModel1 + " " + str(latCoord) + degree_sign + " " + \
+            str(lonCoord) + degree_sign + " where lev(" + \
+            str(int(modelObject1.lev[searchLev])) + ") difference = " + str(largestDiff)
 
-if z_Model1.shape != z_Model2.shape:
+        plotVerticalProfile (profiles1[point], midPressures1[point] / 100., \
+                                 profiles2[point], midPressures2[point] / 100., \
+                                 plotTitle, \
+                                 "plots/vertProfile." + fieldToCompare + "-" + \
+                                 modelSimName1 + "." + modelSimName2 + ".top" + \
+                                 str(point + 1) + "." + str(largestDiff) + ".")
 
     print ""
-    print "Array shapes are different. Interpolation needed!"
+    print "Plotted : ", len(profilePoints), " profiles of ", fieldToCompare, \
+        " to plots/ directory"
     print ""
+    sys.exit(0)
+    
 
-    # Arrays (one time record, one species)
-    longRecords = numpy.zeros(modelObject2.longSize, numpy.float32)
-    latRecords = numpy.zeros(modelObject2.latSize, numpy.float32)
-    newModel2Array = numpy.zeros((modelObject2.latSize, modelObject1.longSize), numpy.float32)
-    newModel2ArrayBoth = numpy.zeros((modelObject1.latSize, modelObject1.longSize), numpy.float32)
 
 
-    latCount = 0
-    for lat in modelObject2.lat[:]:
-        
-        # pull long records out of model 2
-        longRecords[:] = z_Model2[latCount, :]
 
-        yinterp = numpy.interp(modelObject1.long[:], modelObject2.long[:], longRecords)
 
-        newModel2Array [latCount, :] = yinterp[:]
-      
-        latCount = latCount + 1
 
-    print ""
-    print "Model-Temp min / max / shape", newModel2Array.min(), " / ", newModel2Array.max(), " / ", newModel2Array.shape
-    print ""        
+# Only the levels searched are read here; the profiles are read
+# one column at a time below
+z_Model1 = modelObject1.returnField (fieldToCompare, timeRecord, levIndex=file1Level)
+z_Model2 = modelObject2.returnField (fieldToCompare, timeRecord, levIndex=file2Level)
 
-    longCount = 0
-    for long in modelObject1.long[:]:
+if len(z_Model1.shape) != 2 or len(z_Model2.shape) != 2:
+    print ""
+    print "Unexpected rank of data!"
+    print ""
+    sys.exit(0)
 
-        # pull lat records our of model 2
-        latRecords[:] = newModel2Array[:,longCount]
+print ""
 
-        yinterp = numpy.interp(modelObject1.lat[:], modelObject2.lat[:], latRecords)
 
-        newModel2ArrayBoth [:, longCount] = yinterp[:]
 
-        longCount = longCount + 1
+regridObject = None
+if z_Model1.shape != z_Model2.shape:
 
     print ""
-    print "Interpolated model 2 array min / max: ", newModel2ArrayBoth.min(), " / " , newModel2ArrayBoth.max()
+    print "Array shapes are different. Interpolation needed!"
     print ""
 
-    z_Model2 = None
-    z_Model2 = newModel2ArrayBoth
-
+    regridObject = RegridTools (modelObject2.lat[:], modelObject2.long[:], \
+                                    modelObject1.lat[:], modelObject1.long[:])
+    z_Model2 = regridObject.regrid (z_Model2)
 
     print ""
-    print "WARNING: interpolation of PS is not complete! "
-    print "Please finish the implementation before proceeding."
+    print "Interpolated model 2 array min / max: ", z_Model2.min(), " / " , z_Model2.max()
     print ""
 
-    sys.exit(0)
-
 else:
     print ""
     print "Array shapes are the same, will continue with plotting..."
@@ -527,13 +573,34 @@ else:
 
 
 
-print ""
-print "modelFieldArray1 shape: ", modelFieldArray1.shape
-print "modelFieldArray2 shape: ", modelFieldArray2.shape
-print ""
+latIndex = index2d[0]
+longIndex = index2d[1]
+
+vertProfile1 = modelObject1.returnField (fieldToCompare, timeRecord, \
+                                             latIndex=latIndex, longIndex=longIndex)
+psValue1 = modelObject1.returnField ("PS", timeRecord, \
+                                         latIndex=latIndex, longIndex=longIndex)
+
+if regridObject == None:
+    vertProfile2 = modelObject2.returnField (fieldToCompare, timeRecord, \
+                                                 latIndex=latIndex, longIndex=longIndex)
+    psValue2 = modelObject2.returnField ("PS", timeRecord, \
+                                             latIndex=latIndex, longIndex=longIndex)
+else:
+    # model 2 columns come from the field on the model 1 grid
+    vertProfile2 = regridObject.regrid (modelObject2.returnField \
+                                            (fieldToCompare, timeRecord))[:, latIndex, longIndex]
+    psValue2 = regridObject.regrid (modelObject2.returnField \
+                                        ("PS", timeRecord))[..., latIndex, longIndex]
+
+if len(vertProfile1.shape) != 1:
+    print ""
+    print "Field is 2D. There is no vertical profile to plot!"
+    print ""
+    sys.exit(0)
 
-levPoints1 = modelFieldArray1.shape[0]
-levPoints2 = modelFieldArray2.shape[0]
+levPoints1 = vertProfile1.shape[0]
+levPoints2 = vertProfile2.shape[0]
 
 print ""
 print "model levs field1: ", levPoints1
@@ -546,35 +613,17 @@ print ""
 
 #  Model 1 / NRL 
 
-vertProfile1 = []
-
-
 print ""
-print "Creating vertical profile bottom to top of model 1"
+print "Vertical profile of model 1 is bottom to top"
 print ""
 
-for lev1 in range(0,levPoints1): # bottom to top of NRL
-    field12dFlat = modelFieldArray1[lev1,:,:].flatten()
-    vertProfile1.append(field12dFlat[maxDiffIndex])
-
 print ""
 print "Creating pressure coordinates for model 1"
 print ""
-edgePress1 = []
-psArray1Flatten = psArray1.flatten()
-a60Rev = a60[::-1]
-b60Rev = b60[::-1]
-for lev1 in range(0,size(a60)): 
-    edgePress1.append(a60Rev[lev1] + (b60Rev[lev1] * psArray1Flatten[maxDiffIndex]))
 
-print ""
-print "Edge pressures calculated for ", size(edgePress1[:]), " levels for model 1."
-print ""
-
-midPress1 = []
-for lev1 in range(0,levPoints1):
-    midPress = exp ( .5 *(log(edgePress1[lev1]) + log(edgePress1[lev1+1])) )
-    midPress1.append(midPress/100.)
+# ak/bk from the file if present, else the standard table for its levels
+pressureObject1 = createPressureObject (modelObject1, levPoints1)
+midPress1 = pressureObject1.returnMidPressures (float(psValue1))[::-1] / 100.
 
 print ""
 print "Mid-level pressures calculated for ", size(midPress1[:]), " levels for model 1."
@@ -583,12 +632,6 @@ print ""
 
 # Model 2 / GEOS
 
-vertProfile2 = []
-for lev2 in range(0,levPoints2):
-
-    field22dFlat = modelFieldArray2[lev2,:,:].flatten()
-    vertProfile2.append(field22dFlat[maxDiffIndex])
-
 vertProfile2Rev = vertProfile2[::-1] # reverse to surface at level 0
 vertProfile2 = vertProfile2Rev
 
@@ -597,82 +640,23 @@ print ""
 print "Creating pressure coordinates for model 2"
 print ""
 
-edgePress2 = []
-psArray2Flatten = psArray2.flatten()
-a72Rev = a72[::-1]
-b72Rev = b72[::-1]
-for lev2 in range(0,size(a72)): 
-    edgePress2.append(a72Rev[lev2] + (b72Rev[lev2] * psArray2Flatten[maxDiffIndex]))
-
-print ""
-print "Edge pressures calculated for ", size(edgePress2[:]), " levels for model 2."
-print ""
-
-midPress2 = []
-for lev2 in range(0,levPoints2):
-    midPress = exp ( .5 *(log(edgePress2[lev2]) + log(edgePress2[lev2+1])) )
-    midPress2.append(midPress/100.)
+pressureObject2 = createPressureObject (modelObject2, levPoints2)
+midPress2 = pressureObject2.returnMidPressures (float(psValue2))[::-1] / 100.
 
 
 print ""
 print "Mid-level pressures calculated for ", size(midPress2[:]), " levels for model 2."
 print ""
 
-plt.figure(figsize=(20,20))
-
-print ""
-print "Vert profile 1 at surface: ", vertProfile1[0], "(", midPress1[0], " hPa) at top: ", vertProfile1[59], " (", midPress1[59], " hPa)"
-print "Vert profile 2 at surface: ", vertProfile2[0], "(", midPress2[0], " hPa) at top: ", vertProfile2[71], " (", midPress2[71], " hPa)"
-print ""
-
-plt.plot(vertProfile1, midPress1[:], color="blue", label='NRL 60 level')
-plt.plot(vertProfile2, midPress2[:], color="red", label='NRL 72 level')
 degree_sign= u'\N{DEGREE SIGN}'
 plotTitle = dateModel1 + " " + str(latCoord) + degree_sign + " " + str(lonCoord) + degree_sign + " where lev(" + stringLevel1 + \
     ") difference = " + str(flatzDiff[maxDiffIndex])
-plt.title (plotTitle)
 #plt.title ("Vertical profile at " + str(latCoord) + chr(176) + str(lonCoord) + chr(176) + " where lev(" + stringLevel1 + \
 #               ") difference = " + str(flatzDiff[maxDiffIndex]))
-plt.ylabel ("pressure coordinates (hPa) ")
-plt.xlabel (fieldToCompare)
-plt.grid(True)
-plt.legend(loc='upper right', shadow=False, fontsize='large')
-
-axes = plt.gca()
-axes.invert_yaxis()
-axes.set_yscale('log')
-
-minPress = min(min(midPress1), min(midPress2))
-maxPress = max(max(midPress1), max(midPress2))
-print "min of mid press 1 & 2: ", minPress
-print "max of mid press 1 & 2: ", maxPress
-
-pressureRange1 = pl.frange (minPress,10.,1.)
-pressureRange2 = pl.frange(15,100.,10.)
-pressureRange3 = pl.frange(150.,maxPress,150.)
-pressureRange = concatenate([pressureRange1,pressureRange2, pressureRange3])
-print "pressure range to plot: ", pressureRange[:]
-
-#axes.set_yticks(midPress2[::4])
-axes.set_yticks(pressureRange)
-axes.get_yaxis().set_major_formatter(matplotlib.ticker.ScalarFormatter())
-
-
-
-
-
-#-----------------------------------------------------#
-
 
-file = "f"
-if file == "f":
-    plt.savefig("plots/vertProfile." + fieldToCompare + "-" + modelSimName1 \
-                    + "." + modelSimName2 + "." + str(flatzDiff[maxDiffIndex]) + ".", \
-                    bbox_inches='tight')
-elif file == "s":
-    plt.show()
-        
-plt.clf()
+plotVerticalProfile (vertProfile1, midPress1, vertProfile2, midPress2, plotTitle, \
+                         "plots/vertProfile." + fieldToCompare + "-" + modelSimName1 \
+                         + "." + modelSimName2 + "." + str(flatzDiff[maxDiffIndex]) + ".")
 
 
 
@@ -0,0 +1,207 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class computes pressures on a hybrid sigma-pressure grid:
+#    edge pressure (Pa) = ak + bk * PS
+# for a whole PS field (or any set of points) in one numpy broadcast.
+# ak/bk come from the model file when it has them, otherwise from the
+# standard 60 and 72 level tables below (top-down, ak in Pa).
+#------------------------------------------------------------------------------
+
+import numpy
+
+
+
+a60 = [ 4.000000,      8.410209,     15.007380,     23.882399, \
+            35.228500,     49.614000,     67.954499,     91.591501, \
+            122.426903,    163.065100,    216.956210,    288.637590, \
+            384.077191,    511.065197,    679.737186,    903.167152, \
+            1197.636032,   1582.196045,   2077.680969,   2705.458069, \
+            3485.707092,   4436.783981,   5576.924133,   6926.213837, \
+            8506.793976,  10315.518812,  12289.374161,  14334.020781, \
+            16321.404725,  18110.111092,  19576.032411,  20638.077710, \
+            21266.755819,  21473.879844,  21296.160346,  20781.830521, \
+            19984.194862,  18959.598129,  17762.956794,  16445.772200, \
+            15056.029843,  13637.103590,  12228.047148,  10861.943576, \
+            9562.669233,   8346.207025,   7221.649057,   6192.382004, \
+            5257.727627,   4415.565315,   3664.005389,   3000.188436, \
+            2419.896338,   1918.332467,   1489.726127,   1127.297079, \
+            824.574520,    573.157962,    359.606242,    170.947814, \
+            0.000000 ]
+
+
+b60 = [ 0.00000000,  0.00000000,  0.00000000,  0.00000000, \
+            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
+            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
+            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
+            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
+            0.00000000,  0.00000000,  0.00000000,  0.00000000, \
+            0.00000000,  0.00022552,  0.00143056,  0.00463150, \
+            0.01113877,  0.02235216,  0.03944360,  0.06309207, \
+            0.09342443,  0.13012139,  0.17256010,  0.21993621, \
+            0.27124611,  0.32530609,  0.38094920,  0.43706170, \
+            0.49258491,  0.54656649,  0.59815258,  0.64665151, \
+            0.69163948,  0.73290408,  0.77040631,  0.80424500, \
+            0.83460701,  0.86168867,  0.88564998,  0.90666068, \
+            0.92491567,  0.94061267,  0.95396912,  0.96522278, \
+            0.97459513,  0.98236012,  0.98894250,  0.99474782, \
+            1.00000000 ]
+
+a72 = [ 1.0000000,       2.0000002,       3.2700005,       4.7585009,       6.6000011, \
+            8.9345014,       11.970302,       15.949503,       21.134903,       27.852606, \
+            36.504108,       47.580610,       61.677911,       79.513413,       101.94402, \
+            130.05102,       165.07903,       208.49704,       262.02105,       327.64307, \
+            407.65710,       504.68010,       621.68012,       761.98417,       929.29420, \
+            1127.6902,       1364.3402,       1645.7103,       1979.1604,       2373.0405, \
+            2836.7806,       3381.0007,       4017.5409,       4764.3911,       5638.7912, \
+            6660.3412,       7851.2316,       9236.5722,       10866.302,       12783.703, \
+            15039.303,       17693.003,       20119.201,       21686.501,       22436.301, \
+            22389.800,       21877.598,       21214.998,       20325.898,       19309.696, \
+            18161.897,       16960.896,       15625.996,       14290.995,       12869.594, \
+            11895.862,       10918.171,       9936.5219,       8909.9925,       7883.4220, \
+            7062.1982,       6436.2637,       5805.3211,       5169.6110,       4533.9010, \
+            3898.2009,       3257.0809,       2609.2006,       1961.3106,       1313.4804, \
+            659.37527,       4.8048257,       0.0000000 ]
+
+b72 = [ 0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
+            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
+            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
+            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
+            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
+            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
+            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
+            0.0000000,       0.0000000,       0.0000000,       0.0000000,       0.0000000, \
+            0.0000000,   8.1754130e-09,    0.0069600246,     0.028010041,     0.063720063, \
+            0.11360208,      0.15622409,      0.20035011,      0.24674112,      0.29440312, \
+            0.34338113,      0.39289115,      0.44374018,      0.49459020,      0.54630418, \
+            0.58104151,      0.61581843,      0.65063492,      0.68589990,      0.72116594, \
+            0.74937819,      0.77063753,      0.79194696,      0.81330397,      0.83466097, \
+            0.85601798,      0.87742898,      0.89890800,      0.92038701,      0.94186501, \
+            0.96340602,      0.98495195,       1.0000000 ]
+
+
+
+# Standard tables keyed by number of layers
+HYBRID_TABLES = {60 : (a60, b60), \
+                    72 : (a72, b72)}
+
+
+
+class PressureTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. ak (Pa) and bk hold one value per layer edge, in
+   # either vertical order; they are stored top-down.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, ak, bk):
+
+      self.ak = numpy.asarray(ak[:], numpy.float64)
+      self.bk = numpy.asarray(bk[:], numpy.float64)
+
+      if self.ak.shape != self.bk.shape or len(self.ak) < 2:
+         raise ValueError("ak and bk must have the same number of edges")
+
+      # surface edge last, whatever order the source used
+      refPressure = 100000.
+      if self.ak[0] + self.bk[0] * refPressure > \
+             self.ak[-1] + self.bk[-1] * refPressure:
+         self.ak = self.ak[::-1]
+         self.bk = self.bk[::-1]
+
+      self.numLayers = len(self.ak) - 1
+
+
+   #---------------------------------------------------------------------------
+   # Edge pressures (Pa) with shape (numLayers+1,) + shape(ps), top-down.
+   # ps is in Pa and may be a scalar, a list of points or a (lat, lon) field.
+   #---------------------------------------------------------------------------
+
+   def returnEdgePressures (self, ps):
+
+      ps = numpy.asarray(ps, numpy.float64)
+      newAxes = (slice(None),) + (numpy.newaxis,) * ps.ndim
+
+      return self.ak[newAxes] + self.bk[newAxes] * ps
+
+
+   #---------------------------------------------------------------------------
+   # Mid-layer pressures (Pa), the log-pressure mean of the layer edges, with
+   # shape (numLayers,) + shape(ps), top-down.
+   #---------------------------------------------------------------------------
+
+   def returnMidPressures (self, ps):
+
+      logEdges = numpy.log(self.returnEdgePressures(ps))
+
+      return numpy.exp(.5 * (logEdges[:-1] + logEdges[1:]))
+
+
+   def returnLayerThickness (self, ps):
+
+      return numpy.diff(self.returnEdgePressures(ps), axis=0)
+
+
+   #---------------------------------------------------------------------------
+   # Vertical profiles at many points from a (lev, lat, lon) field and a
+   # (lat, lon) PS field. Returns (profiles, midPressures), each with shape
+   # (numPoints, numLayers) and in the level order of the field.
+   #---------------------------------------------------------------------------
+
+   def returnProfiles (self, field, ps, latIndices, longIndices, bottomUp=False):
+
+      if field.shape[0] != self.numLayers:
+         raise ValueError("Field has " + str(field.shape[0]) + " levels, ak/bk have " + \
+                             str(self.numLayers))
+
+      latIndices = numpy.asarray(latIndices)
+      longIndices = numpy.asarray(longIndices)
+
+      profiles = numpy.asarray(field)[:, latIndices, longIndices].T
+      midPressures = self.returnMidPressures \
+          (numpy.asarray(ps)[latIndices, longIndices]).T
+
+      # the pressures are top-down; match a field stored bottom-up
+      if bottomUp: midPressures = midPressures[..., ::-1]
+
+      return profiles, midPressures
+
+
+
+#---------------------------------------------------------------------------
+# AUTHORS: Megan Damon NASA GSFC
+#
+# DESCRIPTION:
+# Returns a PressureTools object for a model file: its ak/bk variables
+# when it has them, otherwise the standard table with numLayers layers
+# (default: the file's level count).
+#---------------------------------------------------------------------------
+
+def createPressureObject (modelObject, numLayers=None):
+
+   akName = modelObject.returnVariableName ("ak")
+   bkName = modelObject.returnVariableName ("bk")
+
+   if akName != None and bkName != None:
+      print ("Using ak/bk from: " + modelObject.fileName)
+      return PressureTools (modelObject.hdfData.variables[akName][:], \
+                               modelObject.hdfData.variables[bkName][:])
+
+   if numLayers == None: numLayers = modelObject.levelSize
+
+   if numLayers not in HYBRID_TABLES:
+      raise ValueError("No ak/bk in " + modelObject.fileName + \
+                          " and no standard table for " + str(numLayers) + " levels")
+
+   return PressureTools (HYBRID_TABLES[numLayers][0], HYBRID_TABLES[numLayers][1])
@@ -0,0 +1,259 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class regrids fields between two regular lat/lon grids (i.e. GMI to
+# GEOS-CTM). The interpolation weights are built once as a sparse matrix,
+# kept for the life of the process and saved on disk keyed by the grid
+# signature, so repeated comparisons never recompute them.
+#------------------------------------------------------------------------------
+
+import os
+import hashlib
+import tempfile
+import numpy
+import scipy.sparse
+
+from CacheTools import returnCacheDir
+
+
+
+# Weights already built by this process, keyed by grid signature
+_weightCache = {}
+
+REGRID_METHODS = ['bilinear', 'conservative']
+
+
+
+class RegridTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. latIn/lonIn describe the source grid and
+   # latOut/lonOut the target grid. Longitudes may use either the 0-360 or
+   # -180-180 convention; global grids are treated as periodic.
+   # Set cacheDir to "" to keep the weights in memory only.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, latIn, lonIn, latOut, lonOut, method="bilinear", \
+                   cacheDir=None):
+
+      if method not in REGRID_METHODS:
+         raise ValueError("Regrid method not supported: " + str(method))
+
+      self.latIn = numpy.asarray(latIn[:], numpy.float64)
+      self.lonIn = numpy.asarray(lonIn[:], numpy.float64)
+      self.latOut = numpy.asarray(latOut[:], numpy.float64)
+      self.lonOut = numpy.asarray(lonOut[:], numpy.float64)
+      self.method = method
+
+      if cacheDir == None:
+         cacheDir = returnCacheDir ("regrid")
+      self.cacheDir = cacheDir
+
+      self.signature = self.returnGridSignature ()
+      self.weights = self.returnWeights ()
+
+
+   def returnGridSignature (self):
+
+      md5 = hashlib.md5()
+      md5.update(self.method.encode('ascii'))
+      for coord in [self.latIn, self.lonIn, self.latOut, self.lonOut]:
+         md5.update(numpy.ascontiguousarray(coord).tobytes())
+
+      return self.method + "_" + str(len(self.latIn)) + "x" + str(len(self.lonIn)) + \
+          "_to_" + str(len(self.latOut)) + "x" + str(len(self.lonOut)) + \
+          "_" + md5.hexdigest()
+
+
+   def returnWeights (self):
+
+      if self.signature in _weightCache:
+         return _weightCache[self.signature]
+
+      weights = self.readWeights ()
+
+      if weights is None:
+         print ("Building " + self.method + " regrid weights: " + self.signature)
+         if self.method == "bilinear":
+            latWeights = self.returnLinearWeights (self.latIn, self.latOut, False)
+            lonWeights = self.returnLinearWeights (self.lonIn, self.lonOut, \
+                                                      self.isPeriodic(self.lonIn))
+         else:
+            latEdgesIn = self.returnLatEdges (self.latIn)
+            latEdgesOut = self.returnLatEdges (self.latOut)
+            latWeights = self.returnOverlapWeights (numpy.sin(numpy.radians(latEdgesIn)), \
+                                                       numpy.sin(numpy.radians(latEdgesOut)), \
+                                                       None)
+            lonWeights = self.returnOverlapWeights (self.returnLonEdges(self.lonIn), \
+                                                       self.returnLonEdges(self.lonOut), \
+                                                       360.0)
+
+         # row major (lat, lon) cells: one sparse product does both dimensions
+         weights = scipy.sparse.kron(latWeights, lonWeights, format='csr')
+         self.writeWeights (weights)
+
+      _weightCache[self.signature] = weights
+      return weights
+
+
+   def isPeriodic (self, lon):
+
+      if len(lon) < 2: return False
+      dLon = abs(lon[1] - lon[0])
+      return abs(len(lon) * dLon - 360.0) < dLon / 2.
+
+
+   #---------------------------------------------------------------------------
+   # 1D linear interpolation matrix (nOut x nIn). Outside the source range
+   # values are held at the edge value (as numpy.interp does) unless the
+   # coordinate is periodic.
+   #---------------------------------------------------------------------------
+
+   def returnLinearWeights (self, coordIn, coordOut, periodic):
+
+      nIn = len(coordIn)
+      nOut = len(coordOut)
+
+      order = numpy.argsort(coordIn)
+      sortedIn = coordIn[order]
+
+      if periodic:
+         sortedIn = numpy.concatenate((sortedIn, [sortedIn[0] + 360.0]))
+         order = numpy.concatenate((order, [order[0]]))
+         coordOut = (coordOut - sortedIn[0]) % 360.0 + sortedIn[0]
+
+      upper = numpy.searchsorted(sortedIn, coordOut, side='right')
+      upper = numpy.clip(upper, 1, len(sortedIn) - 1)
+      lower = upper - 1
+
+      span = sortedIn[upper] - sortedIn[lower]
+      span[span == 0.0] = 1.0
+      frac = numpy.clip((coordOut - sortedIn[lower]) / span, 0.0, 1.0)
+
+      rows = numpy.concatenate((numpy.arange(nOut), numpy.arange(nOut)))
+      cols = numpy.concatenate((order[lower], order[upper]))
+      vals = numpy.concatenate((1.0 - frac, frac))
+
+      # duplicates (i.e. the periodic seam) are summed by the conversion
+      return scipy.sparse.coo_matrix((vals, (rows, cols)), shape=(nOut, nIn)).tocsr()
+
+
+   def returnLatEdges (self, lat):
+
+      edges = numpy.zeros(len(lat) + 1, numpy.float64)
+      edges[1:-1] = (lat[1:] + lat[:-1]) / 2.
+      edges[0] = lat[0] - (lat[1] - lat[0]) / 2.
+      edges[-1] = lat[-1] + (lat[-1] - lat[-2]) / 2.
+      return numpy.clip(edges, -90.0, 90.0)
+
+
+   def returnLonEdges (self, lon):
+
+      edges = numpy.zeros(len(lon) + 1, numpy.float64)
+      edges[1:-1] = (lon[1:] + lon[:-1]) / 2.
+      edges[0] = lon[0] - (lon[1] - lon[0]) / 2.
+      edges[-1] = lon[-1] + (lon[-1] - lon[-2]) / 2.
+      return edges
+
+
+   #---------------------------------------------------------------------------
+   # 1D conservative weights: fraction of each target cell covered by each
+   # source cell, normalized so every target row sums to 1. edges may be
+   # decreasing (i.e. north to south). With a period, source cells are also
+   # tried shifted by +/- one period.
+   #---------------------------------------------------------------------------
+
+   def returnOverlapWeights (self, edgesIn, edgesOut, period):
+
+      lowIn = numpy.minimum(edgesIn[:-1], edgesIn[1:])
+      highIn = numpy.maximum(edgesIn[:-1], edgesIn[1:])
+      lowOut = numpy.minimum(edgesOut[:-1], edgesOut[1:])[:, numpy.newaxis]
+      highOut = numpy.maximum(edgesOut[:-1], edgesOut[1:])[:, numpy.newaxis]
+
+      shifts = [0.0]
+      if period != None: shifts = [-period, 0.0, period]
+
+      overlap = numpy.zeros((len(lowOut), len(lowIn)), numpy.float64)
+      for shift in shifts:
+         overlap = overlap + numpy.clip(numpy.minimum(highOut, highIn + shift) - \
+                                           numpy.maximum(lowOut, lowIn + shift), \
+                                           0.0, None)
+
+      rowSums = overlap.sum(axis=1)
+      rowSums[rowSums == 0.0] = 1.0
+
+      return scipy.sparse.csr_matrix(overlap / rowSums[:, numpy.newaxis])
+
+
+   def returnCacheFile (self):
+
+      return os.path.join(self.cacheDir, self.signature + ".npz")
+
+
+   def readWeights (self):
+
+      if self.cacheDir == "": return None
+
+      cacheFile = self.returnCacheFile ()
+      if not os.path.exists(cacheFile): return None
+
+      try:
+         cached = numpy.load(cacheFile)
+         return scipy.sparse.csr_matrix((cached['data'], cached['indices'], \
+                                            cached['indptr']), \
+                                           shape=tuple(cached['shape']))
+      except (IOError, ValueError, KeyError):
+         print ("WARNING: ignoring unreadable regrid weights: " + cacheFile)
+         return None
+
+
+   def writeWeights (self, weights):
+
+      if self.cacheDir == "": return
+
+      try:
+         if not os.path.exists(self.cacheDir): os.makedirs(self.cacheDir)
+
+         # write then rename so concurrent runs never read a partial file
+         fileDesc, tmpFile = tempfile.mkstemp(suffix=".npz", dir=self.cacheDir)
+         os.close(fileDesc)
+         numpy.savez(tmpFile, data=weights.data, indices=weights.indices, \
+                        indptr=weights.indptr, shape=numpy.array(weights.shape))
+         os.rename(tmpFile, self.returnCacheFile())
+      except (IOError, OSError):
+         print ("WARNING: could not save regrid weights in: " + self.cacheDir)
+
+
+   #---------------------------------------------------------------------------
+   # Regrid an array whose last two dimensions are (lat, lon), i.e. (lat, lon),
+   # (lev, lat, lon) or (time, lev, lat, lon), in one sparse matrix product.
+   #---------------------------------------------------------------------------
+
+   def regrid (self, field):
+
+      field = numpy.ma.filled(field, numpy.nan)
+      if not numpy.issubdtype(field.dtype, numpy.floating):
+         field = field.astype(numpy.float64)
+
+      if field.shape[-2:] != (len(self.latIn), len(self.lonIn)):
+         raise ValueError("Field shape " + str(field.shape) + \
+                             " does not match the source grid")
+
+      leadShape = field.shape[:-2]
+      flatField = field.reshape((-1, len(self.latIn) * len(self.lonIn)))
+
+      newField = self.weights.dot(flatField.T).T
+
+      return numpy.asarray(newField, dtype=field.dtype).reshape \
+          (leadShape + (len(self.latOut), len(self.lonOut)))
@@ -0,0 +1,387 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class writes fields of a model file to a new NETCDF4 file with the
+# longitudes in another order (i.e. GMI 0:360 to GEOS -180:180). Fields are
+# copied one time record at a time straight into chunked, compressed
+# variables, so memory holds one record however long the file is. Values,
+# data types and attributes are copied unchanged. remapFiles converts a
+# collection of files with a pool of worker processes, skipping files whose
+# output is already up to date.
+#------------------------------------------------------------------------------
+
+import os
+import sys
+import multiprocessing
+import numpy
+from netCDF4 import Dataset
+
+from CacheTools import returnFileKey
+from GeosCtmPlotTools import GeosCtmPlotTools
+from GmiPlotTools import GmiPlotTools
+
+
+
+# Global attribute of a finished output file: the key of the input file
+# (path, modification time, size) and remap options it was written from
+REMAP_KEY_ATTR = "remap_source_key"
+
+
+
+class RemapFileTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. modelObject is the input (GeosCtmPlotTools or
+   # GmiPlotTools); its fields are written in the order set by longStart.
+   # complevel is the zlib level (0 turns compression off).
+   #
+   # The file is written under a temporary name and renamed by close, so an
+   # interrupted run never leaves a file that looks finished. sourceKey
+   # (optional) is stored in the REMAP_KEY_ATTR global attribute.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, modelObject, outFileName, longStart=-180.0, \
+                   complevel=4, shuffle=True, sourceKey=None):
+
+      self.modelObject = modelObject
+      self.modelObject.setLongStart (longStart)
+
+      self.outFileName = outFileName
+      self.tmpFileName = outFileName + ".tmp"
+      self.complevel = complevel
+      self.shuffle = shuffle
+
+      self.inData = modelObject.hdfData
+      self.outData = Dataset (self.tmpFileName, "w", format="NETCDF4")
+
+      for attrName in self.inData.ncattrs():
+         self.outData.setncattr (attrName, self.inData.getncattr(attrName))
+
+      if sourceKey != None:
+         self.outData.setncattr (REMAP_KEY_ATTR, sourceKey)
+
+      self.fieldNames = []
+
+
+   #---------------------------------------------------------------------------
+   # Creates a dimension of the input file in the output, with its coordinate
+   # variable if it has one. The longitude coordinate is written remapped.
+   #---------------------------------------------------------------------------
+
+   def addDimension (self, dimName):
+
+      if dimName in self.outData.dimensions: return
+
+      inDim = self.inData.dimensions[dimName]
+      dimSize = len(inDim)
+      if inDim.isunlimited(): dimSize = None
+      self.outData.createDimension (dimName, dimSize)
+
+      if dimName not in self.inData.variables: return
+
+      inVar = self.inData.variables[dimName]
+      outVar = self.createVariable (inVar, dimName)
+
+      values = inVar[:]
+      if dimName == self.modelObject.longVarName:
+         values = self.modelObject.returnLongitudes ().astype(inVar.dtype)
+      outVar[:] = values
+
+
+   #---------------------------------------------------------------------------
+   # Output variable with the input's name, type, dimensions and attributes.
+   # A chunk is one horizontal slice (one time record of one level), the
+   # unit every field is written and read back in.
+   #---------------------------------------------------------------------------
+
+   def createVariable (self, inVar, varName):
+
+      inAttrs = {}
+      for attrName in inVar.ncattrs():
+         inAttrs[attrName] = inVar.getncattr(attrName)
+
+      fillValue = inAttrs.pop('_FillValue', None)
+
+      chunkSizes = None
+      if len(inVar.dimensions) >= 2:
+         chunkSizes = [1] * (len(inVar.dimensions) - 2) + list(inVar.shape[-2:])
+
+      outVar = self.outData.createVariable (varName, inVar.dtype, inVar.dimensions, \
+                                               zlib=self.complevel > 0, \
+                                               complevel=max(self.complevel, 1), \
+                                               shuffle=self.shuffle, \
+                                               chunksizes=chunkSizes, \
+                                               fill_value=fillValue)
+      outVar.setncatts (inAttrs)
+
+      # raw values in and out, so packed and masked data are copied as is
+      outVar.set_auto_maskandscale (False)
+
+      return outVar
+
+
+   #---------------------------------------------------------------------------
+   # Every variable of the input file that is not a coordinate variable.
+   #---------------------------------------------------------------------------
+
+   def returnFieldNames (self):
+
+      return [str(var) for var in self.inData.variables \
+                 if var not in self.inData.dimensions]
+
+
+   #---------------------------------------------------------------------------
+   # Rotates array along axis into the output longitude order. The bounds
+   # variable of the longitude coordinate (i.e. lon_bnds) also has each
+   # cell's bounds moved by the same amount as its centre.
+   #---------------------------------------------------------------------------
+
+   def rotateAxis (self, array, axis, isBounds=False):
+
+      array = numpy.moveaxis(array, axis, -1)
+      array = self.modelObject.rotateLongitudes (array)
+
+      if isBounds:
+         inLongs = self.modelObject.rotateLongitudes (numpy.asarray(self.modelObject.long[:], \
+                                                                       numpy.float64))
+         offsets = self.modelObject.returnLongitudes () - inLongs
+         array = (array + offsets).astype(array.dtype)
+
+      return numpy.moveaxis(array, -1, axis)
+
+
+   #---------------------------------------------------------------------------
+   # Copies one field (same names as returnField) record by record. Fields
+   # with a longitude dimension are rotated along it, whatever its position;
+   # other fields are copied unchanged. Returns the (min, max) of the values
+   # written.
+   #---------------------------------------------------------------------------
+
+   def addField (self, fieldName, prefix=''):
+
+      variableName = self.modelObject.returnVariableName (prefix + fieldName)
+      if variableName == None:
+         raise KeyError("Field " + prefix + fieldName + " is not in " + \
+                           self.modelObject.fileName)
+
+      if variableName in self.outData.variables:
+         raise ValueError("Field " + variableName + " was already written")
+
+      inVar = self.inData.variables[variableName]
+
+      for dimName in inVar.dimensions:
+         self.addDimension (dimName)
+
+      outVar = self.createVariable (inVar, variableName)
+
+      if len(inVar.dimensions) == 0:
+         outVar.assignValue (inVar.getValue())
+         self.fieldNames.append (variableName)
+         return None, None
+
+      longAxis = None
+      if self.modelObject.longVarName in inVar.dimensions:
+         longAxis = list(inVar.dimensions).index(self.modelObject.longVarName)
+
+      isBounds = False
+      if self.modelObject.longVarName in self.inData.variables:
+         longVar = self.inData.variables[self.modelObject.longVarName]
+         isBounds = getattr(longVar, 'bounds', None) == variableName
+
+      # one record of the leading (time) dimension at a time; 2D fields at once
+      records = [()]
+      if len(inVar.dimensions) >= 3 and longAxis != 0:
+         records = [(record,) for record in range(0, inVar.shape[0])]
+
+      # index covers every dimension; readVariable takes all but longitude
+      if longAxis == None:
+         readVariable = lambda variable, index: variable[index]
+      elif longAxis == len(inVar.dimensions) - 1 and not isBounds:
+         readVariable = lambda variable, index: \
+             self.modelObject.readVariable (variable, index[:-1])
+      else:
+         recordAxis = longAxis - len(records[0])
+         readVariable = lambda variable, index: \
+             self.rotateAxis (variable[index], recordAxis, isBounds)
+
+      print ("Remapping: " + variableName + " " + str(inVar.shape) + \
+                " in " + str(len(records)) + " records")
+
+      fillValue = getattr(inVar, '_FillValue', getattr(inVar, 'missing_value', None))
+      minValue = None
+      maxValue = None
+
+      inVar.set_auto_maskandscale (False)
+      try:
+         for record in records:
+            index = record + (slice(None),) * (len(inVar.dimensions) - len(record))
+            recordArray = readVariable (inVar, index)
+            outVar[index] = recordArray
+
+            if not numpy.issubdtype(recordArray.dtype, numpy.number): continue
+
+            validArray = recordArray
+            if fillValue is not None:
+               validArray = numpy.ma.masked_equal(recordArray, fillValue)
+            if numpy.ma.count(validArray) == 0: continue
+
+            if minValue == None:
+               minValue = validArray.min()
+               maxValue = validArray.max()
+            else:
+               minValue = min(minValue, validArray.min())
+               maxValue = max(maxValue, validArray.max())
+      finally:
+         inVar.set_auto_maskandscale (True)
+
+      self.fieldNames.append (variableName)
+
+      return minValue, maxValue
+
+
+   def close (self):
+
+      self.outData.close()
+      os.rename (self.tmpFileName, self.outFileName)
+
+
+
+#---------------------------------------------------------------------------
+# Opens a model file with the reader for its format (GMI files are named
+# gmi*.nc or gmp*.nc, as in the comparison scripts).
+#---------------------------------------------------------------------------
+
+def returnModelObject (fileName):
+
+   baseName = os.path.basename(fileName)
+
+   if (baseName[0:3] == "gmi" or baseName[0:3] == "gmp") and baseName[-3:] == ".nc":
+      return GmiPlotTools (fileName, 'latitude_dim', 'longitude_dim', \
+                              'eta_dim', 'rec_dim', 'latitude_dim', \
+                              'longitude_dim', 'eta_dim', 'hdr', 'const_labels')
+
+   return GeosCtmPlotTools (fileName, 'lat','lon', 'lev','time', \
+                               'lat', 'lon', 'lev', 'time')
+
+
+def returnSourceKey (fileName, fieldNames, longStart):
+
+   if fieldNames == None: fieldNames = ["all"]
+
+   return returnFileKey (fileName, ["remap", longStart] + sorted(fieldNames))
+
+
+#---------------------------------------------------------------------------
+# True when outFile was written, to the end, from this version of fileName
+# with these fields and longitude order.
+#---------------------------------------------------------------------------
+
+def isRemapUpToDate (fileName, outFile, fieldNames, longStart):
+
+   if not os.path.exists(outFile): return False
+
+   try:
+      outData = Dataset (outFile, "r")
+      try:
+         if REMAP_KEY_ATTR not in outData.ncattrs(): return False
+         outKey = outData.getncattr(REMAP_KEY_ATTR)
+      finally:
+         outData.close()
+   except (IOError, OSError, RuntimeError):
+      return False
+
+   return outKey == returnSourceKey (fileName, fieldNames, longStart)
+
+
+#---------------------------------------------------------------------------
+# Pool entry point: converts one file. Returns the output file name and None
+# on success or the error message on failure, so one bad file does not stop
+# the collection.
+#---------------------------------------------------------------------------
+
+def _remapFileTask (task):
+
+   remapObject = None
+
+   try:
+      modelObject = returnModelObject (task['inFile'])
+      remapObject = RemapFileTools (modelObject, task['outFile'], task['longStart'], \
+                                       task['complevel'], \
+                                       sourceKey=returnSourceKey (task['inFile'], \
+                                                                     task['fieldNames'], \
+                                                                     task['longStart']))
+
+      fieldNames = task['fieldNames']
+      if fieldNames == None: fieldNames = remapObject.returnFieldNames ()
+
+      for fieldName in fieldNames:
+         remapObject.addField (fieldName)
+
+      remapObject.close ()
+      remapObject = None
+
+   except Exception as err:
+      if remapObject != None:
+         remapObject.outData.close()
+         if os.path.exists(remapObject.tmpFileName): os.remove(remapObject.tmpFileName)
+      return task['outFile'], str(err)
+
+   sys.stdout.flush()
+
+   return task['outFile'], None
+
+
+#---------------------------------------------------------------------------
+# Converts every file in fileNames to outDir (same file names), with
+# fieldNames (None: every variable) in the longStart longitude order.
+# Files are spread over numProcesses workers; each worker holds one record
+# at a time. Returns a list of (outFile, error) for the files converted;
+# files already up to date are skipped.
+#---------------------------------------------------------------------------
+
+def remapFiles (fileNames, outDir, fieldNames=None, longStart=-180.0, \
+                   numProcesses=1, complevel=4):
+
+   if not os.path.exists(outDir): os.makedirs(outDir)
+
+   tasks = []
+   for fileName in fileNames:
+      outFile = os.path.join(outDir, os.path.basename(fileName))
+
+      if os.path.abspath(outFile) == os.path.abspath(fileName):
+         raise ValueError("The output file cannot be the input file: " + outFile)
+
+      if isRemapUpToDate (fileName, outFile, fieldNames, longStart):
+         print ("Up to date: " + outFile)
+         continue
+
+      tasks.append ({'inFile':fileName, 'outFile':outFile, 'fieldNames':fieldNames, \
+                        'longStart':longStart, 'complevel':complevel})
+
+   if len(tasks) == 0: return []
+
+   numWorkers = min(numProcesses, len(tasks))
+
+   print ("Remapping " + str(len(tasks)) + " files with " + \
+             str(numWorkers) + " workers")
+
+   if numWorkers == 1:
+      return [_remapFileTask(task) for task in tasks]
+
+   pool = multiprocessing.Pool(processes=numWorkers, maxtasksperchild=1)
+   results = pool.map(_remapFileTask, tasks, chunksize=1)
+   pool.close()
+   pool.join()
+
+   return results
@@ -6,67 +6,57 @@
 # DATE:         May 6 2019
 #
 # DESCRIPTION:
-# Driver to convert a field on longitude 0:360 to -180:180
+# Driver to convert fields on longitude 0:360 to -180:180, for one file or
+# a whole collection (one converted file per input file)
 #------------------------------------------------------------------------------
 
-import re
 import os
 import sys
-import random
-import datetime
-import calendar
 import getopt
-import numpy
-from numpy import *
-from netCDF4 import Dataset
-
-import matplotlib
-matplotlib.use('pdf')
-import matplotlib.pyplot as plt
-
-
-import math
-import matplotlib.pyplot as plt
-from matplotlib.colors import BoundaryNorm
-import matplotlib.colors as colors
-from matplotlib.ticker import MaxNLocator
-from mpl_toolkits.basemap import Basemap
-
-
-
-
+import glob
 
 
 sys.path.append('/discover/nobackup/mrdamon/MERRA2')
 
-from GeosCtmPlotTools import GeosCtmPlotTools
-from GenericModelPlotTools import GenericModelPlotTools
-from GmiPlotTools import GmiPlotTools
+from RemapFileTools import remapFiles
 
 
 NUM_ARGS = 2
 def usage ():
     print ""
-    print "usage: RemapLongToGEOS.py [-c] [-f]"
-    print "-c model file"
-    print "-f field to remap"
+    print "usage: RemapLongToGEOS.py [-c] [-f] [-o] [-p]"
+    print "-c model file(s) (comma separated, wildcards allowed)"
+    print "-f field(s) to remap (comma separated) or all"
+    print "-o output directory (optional, default: remapped/)"
+    print "-p number of processes (optional, default: 1)"
     print ""
     sys.exit (0)
 
 
-print "Start plotting field differences."
+print "Start remapping longitudes."
 
 
 #---------------------------------------------------------------
 # START:: Get options from command line
 #---------------------------------------------------------------
-optList, argList = getopt.getopt(sys.argv[1:],'c:f:')
-if len (optList) != NUM_ARGS:
+optList, argList = getopt.getopt(sys.argv[1:],'c:f:o:p:')
+options = dict(optList)
+if '-c' not in options or '-f' not in options or \
+        len (optList) < NUM_ARGS or len (optList) > NUM_ARGS + 2:
    usage ()
    sys.exit (0)
 
-modelFile = optList[0][1]
-fieldToRemap = optList[1][1]
+modelFiles = []
+for fileArg in options['-c'].split(","):
+    matches = sorted(glob.glob(fileArg))
+    if len(matches) == 0: matches = [fileArg]
+    modelFiles.extend(matches)
+
+fieldsToRemap = options['-f'].split(",")
+if options['-f'] == "all": fieldsToRemap = None
+
+outDir = options.get('-o', "remapped/")
+numProcesses = int(options.get('-p', 1))
 
 
 #---------------------------------------------------------------
@@ -74,17 +64,17 @@ print ""
 print "Checking command line options... "
 print""
 #---------------------------------------------------------------
-if not os.path.exists (modelFile):
-    print "The file you provided does not exist: ", modelFile
-    sys.exit(0)
-
-
-print modelFile
-
+for modelFile in modelFiles:
+    if not os.path.exists (modelFile):
+        print "The file you provided does not exist: ", modelFile
+        sys.exit(0)
 
+if numProcesses < 1:
+    print "ERROR: number of processes must be at least 1"
+    sys.exit(0)
 
-modelSimName = modelFile.split(".")[0]
-
+print "Files to remap: ", len(modelFiles)
+print "Fields to remap: ", fieldsToRemap
 
 
 #---------------------------------------------------------------
@@ -92,120 +82,23 @@ print ""
 print "Command line options look good."
 print""
 #--------------------------------------------------------------
-modelObject = GeosCtmPlotTools (modelFile, 'lat','lon',\
-                                      'lev','time', 'lat', \
-                                      'lon', 'lev', 'time' )
-
-
-
-
-# put model on -180 to 0 to 180
-lenLong = len(modelObject.long[:])
-
-
-longRecords = numpy.zeros(modelObject.longSize, numpy.float32)
-
-field = fieldToRemap
-
-modelFieldArray = modelObject.returnField (field, 0)
-
-print ""
-print "Shape of field: ", modelFieldArray.shape[:]
-levelSize = modelFieldArray.shape[0]
-print ""
-
-
-modelFieldArray = modelObject.returnField (field, 0)
-
-if len(modelFieldArray.shape) == 2:
-    remappedModelArray = numpy.zeros((modelObject.latSize, \
-                                          modelObject.longSize), numpy.float32)
-else:
-    remappedModelArray = numpy.zeros((size(modelObject.time), \
-                                          levelSize, \
-                                          modelObject.latSize, \
-                                          modelObject.longSize), numpy.float32)
-
-remappedLong = numpy.zeros(lenLong, float32)
-remappedLong [0:lenLong/2] = modelObject.long[lenLong/2:lenLong] - 360.0
-remappedLong [lenLong/2:lenLong] = modelObject.long[0:lenLong/2]
-
-
-
-
-newModelArray = numpy.zeros((modelObject.latSize, \
-                               modelObject.longSize), numpy.float32)
 
+# put each file on -180 to 0 to 180; fields are rotated as they are read
+# and written one record at a time to a compressed NETCDF4 file
+try:
+    results = remapFiles (modelFiles, outDir, fieldsToRemap, longStart=-180.0, \
+                              numProcesses=numProcesses)
+except ValueError as error:
+    print "ERROR: ", error
+    sys.exit(0)
 
-
-                             
-print ""
-print "Processing: ", fieldToRemap, " with longitude of length: ", lenLong
-print ""
-
-
-
-
-for timeRecord in range(0, size(modelObject.time)):
-
-    modelFieldArray = modelObject.returnField (field, timeRecord)
-
-    print ""
-    print "Shape of field: ", modelFieldArray.shape[:], " time: ", timeRecord
-    print ""
-
-    if len(modelFieldArray.shape) == 2:
-        remappedModelArray [:, 0:lenLong/2] = modelFieldArray[:,lenLong/2:lenLong]
-        remappedModelArray [:, lenLong/2:lenLong] = modelFieldArray[:,0:lenLong/2]
-
-    else:
-        remappedModelArray [timeRecord,:,:, 0:lenLong/2] = modelFieldArray[:,:,lenLong/2:lenLong]
-        remappedModelArray [timeRecord,:,:, lenLong/2:lenLong] = modelFieldArray[:,:,0:lenLong/2]
-
-
-    
-
-print ""
-print "Min/max ", field, " values ", remappedModelArray.min(), "/", remappedModelArray.max()
-print ""
-
-                                  
-print ""
-print "Remapped longitude coordinate for : ", fieldToRemap
-print ""
+numFailed = 0
+for outFile, error in results:
+    if error != None:
+        print "ERROR: failed to remap ", outFile, " : ", error
+        numFailed = numFailed + 1
 
 print ""
-print remappedLong[:]
+print "Remapped ", len(results) - numFailed, " of ", len(results), \
+    " files to ", outDir, " (", len(modelFiles) - len(results), " up to date)"
 print ""
-
-
-rootgrp = Dataset("test.nc", "w", format="NETCDF4")
-
-
-
-#                                      'lon', 'lev', 'time' )
-
-timeDim = rootgrp.createDimension("time", None)
-levelDim = rootgrp.createDimension("lev", levelSize)
-latDim = rootgrp.createDimension("lat", modelObject.latSize)
-lonDim = rootgrp.createDimension("lon", modelObject.longSize)
-
-
-levVar = rootgrp.createVariable("lev","f8",("lev",))
-latVar = rootgrp.createVariable("lat","f8",("lat",))
-lonVar = rootgrp.createVariable("lon","f8",("lon",))
-
-
-lonVar[:] = remappedLong[:]
-latVar[:] = modelObject.lat[:]
-levVar[:] = range(1,levelSize+1)
-#timeVar[:] = modelObject.time[:]
-
-if len(modelFieldArray.shape) == 2:
-    fieldVar = rootgrp.createVariable(field,"f8",("lat","lon"))
-    fieldVar[:,:] = remappedModelArray[:,:]
-else:
-    fieldVar = rootgrp.createVariable(field,"f8",("time","lev","lat","lon"))
-    fieldVar[:,:,:,:] = remappedModelArray[:,:,:,:]
-
-rootgrp.close()
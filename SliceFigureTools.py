@@ -0,0 +1,123 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class is a reusable comparison figure of 2D slices (by default the
+# usual 311/312/313 model 1, model 2, ratio layout). The axes, map
+# decorations, meshes and colorbars are created for the first field only;
+# later fields on the same grid just replace the mesh data, color limits,
+# color map and titles before the figure is saved again. Data layers are
+# drawn with MapTools.drawMapField in the figure's render mode.
+#------------------------------------------------------------------------------
+
+import numpy
+
+import matplotlib
+matplotlib.use('pdf')
+import matplotlib.pyplot as plt
+
+from matplotlib.image import AxesImage
+
+from MapTools import drawMapBoundaries, drawMapField
+
+
+
+class SliceFigureTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. baseMap, X_grid and Y_grid are the plot objects of
+   # the grid every field will be on (see createPlotObjects). renderMode is
+   # one of MapTools.RENDER_MODES.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, baseMap, X_grid, Y_grid, minMaxLat, minMaxLong, \
+                   subplotNums=[311, 312, 313], figSize=(20,20), \
+                   renderMode="pcolormesh"):
+
+      self.baseMap = baseMap
+      self.X_grid = X_grid
+      self.Y_grid = Y_grid
+      self.renderMode = renderMode
+
+      self.figure = plt.figure(figsize=figSize)
+
+      self.axes = {}
+      self.meshes = {}
+      self.colorBars = {}
+
+      for subplotNum in subplotNums:
+         ax = self.figure.add_subplot(subplotNum)
+
+         ax.axis([X_grid.min(), X_grid.max(), Y_grid.min(), Y_grid.max()])
+         baseMap.drawparallels(numpy.arange(minMaxLat[0], minMaxLat[1], 40), \
+                                  labels=[1,0,0,0], ax=ax)
+         baseMap.drawmeridians(numpy.arange(minMaxLong[0], minMaxLong[1], 80), \
+                                  labels=[0,1,0,1], ax=ax)
+         drawMapBoundaries (baseMap, ax)
+
+         self.axes[subplotNum] = ax
+
+
+   #---------------------------------------------------------------------------
+   # The mesh (or image) uses the grid points as cell corners (as pcolor
+   # does here), so it holds one value less than the grid in each dimension.
+   #---------------------------------------------------------------------------
+
+   def returnMeshData (self, z):
+
+      if numpy.shape(z) != self.X_grid.shape:
+         raise ValueError("Field shape " + str(numpy.shape(z)) + \
+                             " does not match the figure grid " + \
+                             str(self.X_grid.shape))
+
+      return numpy.ma.masked_invalid(z)[:-1, :-1]
+
+
+   def updatePanel (self, z, minMaxVals, subplotNum, plotTitle, colorMap):
+
+      ax = self.axes[subplotNum]
+
+      if subplotNum in self.meshes and self.renderMode == "pcolor":
+         # pcolor drops masked cells, so its polygons cannot take new data
+         self.meshes.pop(subplotNum).remove()
+
+      if subplotNum not in self.meshes:
+         mesh = drawMapField (self.baseMap, self.X_grid, self.Y_grid, z, \
+                                 colorMap, minMaxVals, self.renderMode, ax)
+         self.meshes[subplotNum] = mesh
+         if subplotNum in self.colorBars:
+            self.colorBars[subplotNum].update_normal(mesh)
+         else:
+            self.colorBars[subplotNum] = self.figure.colorbar(mesh, ax=ax)
+         ax.axis([self.X_grid.min(), self.X_grid.max(), \
+                     self.Y_grid.min(), self.Y_grid.max()])
+      else:
+         mesh = self.meshes[subplotNum]
+         if isinstance(mesh, AxesImage):
+            mesh.set_data(self.returnMeshData(z))
+         else:
+            mesh.set_array(self.returnMeshData(z).ravel())
+         mesh.set_cmap(colorMap)
+         mesh.set_clim(minMaxVals[0], minMaxVals[1])
+
+      ax.set_title(plotTitle)
+
+
+   def savePlot (self, fileName):
+
+      self.figure.savefig(fileName, bbox_inches='tight')
+
+
+   def close (self):
+
+      plt.close(self.figure)
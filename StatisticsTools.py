@@ -0,0 +1,284 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class computes area-weighted statistics of 2D (lat, lon) or 3D
+# (lev, lat, lon) fields: totals, means, min and max for one field and, for
+# a pair, bias, RMSE, correlation and ratio of totals, globally and over
+# latitude bands. Cell areas come from the model file (GMI mcor) or are
+# computed once per grid from the lat/lon cell edges and cached. Summaries
+# are written as JSON next to each plot, so many fields can be screened
+# without opening the plots.
+#------------------------------------------------------------------------------
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy
+
+from CacheTools import returnCacheDir, readCacheObject, writeCacheObject
+
+
+
+EARTH_RADIUS = 6371220.   # m
+
+# Latitude bands (south, north) of the regional statistics
+REGIONS = {'global' : (-90., 90.), \
+              'tropics' : (-30., 30.), \
+              'nh_extratropics' : (30., 90.), \
+              'sh_extratropics' : (-90., -30.)}
+
+# Areas already computed by this process, keyed by grid signature
+_areaCache = {}
+
+
+
+#---------------------------------------------------------------------------
+# Cell areas (m2), (lat, lon), of a regular grid. Cell edges are half way
+# between the coordinates (poles at +/-90); longitudes wrap around. Areas
+# are kept for the life of the process and saved on disk per grid.
+#---------------------------------------------------------------------------
+
+def returnCellAreas (lat, lon, radius=EARTH_RADIUS):
+
+   lat = numpy.asarray(lat[:], numpy.float64)
+   lon = numpy.asarray(lon[:], numpy.float64)
+
+   md5 = hashlib.md5()
+   for coord in [lat, lon, numpy.array([radius])]:
+      md5.update(numpy.ascontiguousarray(coord).tobytes())
+   signature = str(len(lat)) + "x" + str(len(lon)) + "_" + md5.hexdigest()
+
+   if signature in _areaCache: return _areaCache[signature]
+
+   cacheFile = os.path.join(returnCacheDir("areas"), signature + ".pkl")
+   areas = readCacheObject (cacheFile)
+
+   if areas is None:
+      # edges from south to north, whatever the order of lat
+      southToNorth = numpy.sort(lat)
+      latEdges = numpy.zeros(len(lat) + 1, numpy.float64)
+      latEdges[1:-1] = (southToNorth[1:] + southToNorth[:-1]) / 2.
+      latEdges[0] = -90.
+      latEdges[-1] = 90.
+
+      # longitude widths, with the wrap around cell widths at both ends
+      lonWidths = numpy.diff(numpy.concatenate(([lon[-1] - 360.], lon, [lon[0] + 360.])))
+      lonWidths = (lonWidths[:-1] + lonWidths[1:]) / 2.
+
+      bandAreas = radius * radius * numpy.diff(numpy.sin(numpy.radians(latEdges)))
+      if lat[0] > lat[-1]: bandAreas = bandAreas[::-1]
+      areas = bandAreas[:, numpy.newaxis] * numpy.radians(lonWidths)[numpy.newaxis, :]
+
+      writeCacheObject (cacheFile, areas)
+
+   _areaCache[signature] = areas
+
+   return areas
+
+
+#---------------------------------------------------------------------------
+# Cell areas (m2) of a model file in the longitude order of its fields:
+# the mcor field when the file has one (GMI), otherwise computed from the
+# lat/lon coordinates.
+#---------------------------------------------------------------------------
+
+def returnModelCellAreas (modelObject):
+
+   mcorName = modelObject.returnVariableName ("mcor")
+   if mcorName != None:
+      mcor = modelObject.hdfData.variables[mcorName]
+      if len(mcor.shape) == 2:
+         return numpy.asarray(modelObject.readVariable (mcor, (slice(None),)), \
+                                 numpy.float64)
+
+   return returnCellAreas (modelObject.lat[:], modelObject.returnLongitudes ())
+
+
+#---------------------------------------------------------------------------
+# Summary file written next to a plot (same name, .stats.json).
+#---------------------------------------------------------------------------
+
+def returnSummaryFile (plotFile):
+
+   if plotFile.endswith("."): plotFile = plotFile[:-1]
+
+   return plotFile + ".stats.json"
+
+
+def writeSummary (plotFile, summary):
+
+   summaryFile = returnSummaryFile (plotFile)
+
+   summaryDir = os.path.dirname(os.path.abspath(summaryFile))
+   if not os.path.exists(summaryDir): os.makedirs(summaryDir)
+
+   fileDesc, tmpFile = tempfile.mkstemp(dir=summaryDir)
+   myFile = os.fdopen(fileDesc, "w")
+   try:
+      json.dump(summary, myFile, indent=1, sort_keys=True)
+   finally:
+      myFile.close()
+   os.rename(tmpFile, summaryFile)
+
+   return summaryFile
+
+
+
+class StatisticsTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. lat is the latitude coordinate and areas the
+   # (lat, lon) cell areas of the fields (see returnCellAreas). regions
+   # maps a name to a (south, north) latitude band.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, lat, areas, regions=REGIONS):
+
+      self.lat = numpy.asarray(lat[:], numpy.float64)
+      self.areas = numpy.asarray(areas, numpy.float64)
+      self.regions = regions
+
+      if self.areas.ndim != 2 or self.areas.shape[0] != len(self.lat):
+         raise ValueError("Areas " + str(self.areas.shape) + " do not match " + \
+                             str(len(self.lat)) + " latitudes")
+
+
+   #---------------------------------------------------------------------------
+   # Weights with the shape of field: cell areas, times weights if given
+   # (i.e. layer mass per unit area for 3D fields), zero where any of
+   # fields is masked or not finite.
+   #---------------------------------------------------------------------------
+
+   def returnWeights (self, fields, weights=None):
+
+      shape = numpy.shape(fields[0])
+      for field in fields[1:]:
+         if numpy.shape(field) != shape:
+            raise ValueError("Field shapes differ: " + str(shape) + " and " + \
+                                str(numpy.shape(field)))
+
+      if shape[-2:] != self.areas.shape:
+         raise ValueError("Field shape " + str(shape) + " does not match the areas " + \
+                             str(self.areas.shape))
+
+      fieldWeights = numpy.broadcast_to(self.areas, shape)
+      if weights is not None:
+         fieldWeights = fieldWeights * numpy.asarray(weights, numpy.float64)
+
+      valid = numpy.ones(shape, bool)
+      for field in fields:
+         values = numpy.ma.filled(numpy.ma.asarray(field, numpy.float64), numpy.nan)
+         valid &= numpy.isfinite(values)
+
+      return numpy.where(valid, fieldWeights, 0.0)
+
+
+   def returnRegionWeights (self, weights, region):
+
+      south, north = self.regions[region]
+      inRegion = (self.lat >= south) & (self.lat <= north)
+
+      return weights * inRegion[:, numpy.newaxis]
+
+
+   #---------------------------------------------------------------------------
+   # {region : {'total', 'mean', 'min', 'max', 'count'}} of one field. The
+   # total is the sum of field * area (* weights); the mean is weighted.
+   #---------------------------------------------------------------------------
+
+   def returnFieldStatistics (self, field, weights=None):
+
+      fieldWeights = self.returnWeights ([field], weights)
+      values = numpy.nan_to_num(numpy.ma.filled(numpy.ma.asarray(field, numpy.float64), \
+                                                   numpy.nan))
+
+      statistics = {}
+      for region in self.regions:
+         regionWeights = self.returnRegionWeights (fieldWeights, region)
+         inRegion = regionWeights > 0.0
+         sumWeights = regionWeights.sum()
+
+         regionStats = {'count' : int(inRegion.sum()), 'total' : None, 'mean' : None, \
+                           'min' : None, 'max' : None}
+         if sumWeights > 0.0:
+            total = (values * regionWeights).sum()
+            regionStats['total'] = float(total)
+            regionStats['mean'] = float(total / sumWeights)
+            regionStats['min'] = float(values[inRegion].min())
+            regionStats['max'] = float(values[inRegion].max())
+
+         statistics[region] = regionStats
+
+      return statistics
+
+
+   #---------------------------------------------------------------------------
+   # {region : {...}} comparing field1 with field2 over the cells valid in
+   # both: the statistics of each field (suffixed 1 and 2), bias (mean of
+   # field1 - field2), rmse, correlation (weighted Pearson) and ratio
+   # (total1 / total2).
+   #---------------------------------------------------------------------------
+
+   def returnPairStatistics (self, field1, field2, weights=None):
+
+      fieldWeights = self.returnWeights ([field1, field2], weights)
+      values1 = numpy.nan_to_num(numpy.ma.filled(numpy.ma.asarray(field1, numpy.float64), \
+                                                    numpy.nan))
+      values2 = numpy.nan_to_num(numpy.ma.filled(numpy.ma.asarray(field2, numpy.float64), \
+                                                    numpy.nan))
+
+      statistics = {}
+      for region in self.regions:
+         regionWeights = self.returnRegionWeights (fieldWeights, region)
+         inRegion = regionWeights > 0.0
+         sumWeights = regionWeights.sum()
+
+         regionStats = {'count' : int(inRegion.sum())}
+         for name in ['total1', 'total2', 'mean1', 'mean2', 'min1', 'min2', \
+                         'max1', 'max2', 'bias', 'rmse', 'correlation', 'ratio']:
+            regionStats[name] = None
+
+         if sumWeights > 0.0:
+            total1 = (values1 * regionWeights).sum()
+            total2 = (values2 * regionWeights).sum()
+            mean1 = total1 / sumWeights
+            mean2 = total2 / sumWeights
+            anomaly1 = values1 - mean1
+            anomaly2 = values2 - mean2
+            variance1 = (anomaly1 * anomaly1 * regionWeights).sum() / sumWeights
+            variance2 = (anomaly2 * anomaly2 * regionWeights).sum() / sumWeights
+            covariance = (anomaly1 * anomaly2 * regionWeights).sum() / sumWeights
+            difference = values1 - values2
+
+            regionStats['total1'] = float(total1)
+            regionStats['total2'] = float(total2)
+            regionStats['mean1'] = float(mean1)
+            regionStats['mean2'] = float(mean2)
+            regionStats['min1'] = float(values1[inRegion].min())
+            regionStats['min2'] = float(values2[inRegion].min())
+            regionStats['max1'] = float(values1[inRegion].max())
+            regionStats['max2'] = float(values2[inRegion].max())
+            regionStats['bias'] = float(mean1 - mean2)
+            regionStats['rmse'] = float(numpy.sqrt((difference * difference * \
+                                                       regionWeights).sum() / sumWeights))
+            if variance1 > 0.0 and variance2 > 0.0:
+               regionStats['correlation'] = float(covariance / \
+                                                     numpy.sqrt(variance1 * variance2))
+            if total2 != 0.0:
+               regionStats['ratio'] = float(total1 / total2)
+
+         statistics[region] = regionStats
+
+      return statistics
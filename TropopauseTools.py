@@ -0,0 +1,304 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class finds the tropopause of every grid cell of a (lev, lat, lon)
+# field at once: the WMO lapse-rate tropopause from temperature, or the
+# dynamical (PV) tropopause when potential vorticity is available. The
+# result is a (lat, lon) level index and pressure that ColumnTools and the
+# zonal mean scripts use to split each column. Tropopauses found for a
+# model file are cached, so every species plotted from that file reuses
+# them.
+#------------------------------------------------------------------------------
+
+import os
+import numpy
+
+from CacheTools import returnCacheDir, returnFileKey, readCacheObject, writeCacheObject
+from PressureTools import createPressureObject
+from ColumnTools import GRAVITY
+
+
+
+RD = 287.04    # J/(kg K), dry air
+
+
+
+class TropopauseTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. levPressures (hPa) are the level pressures of the
+   # fields, either (lev,) or (lev, lat, lon), in the fields' level order
+   # (top-down or bottom-up; the order is taken from the pressures).
+   # Tropopauses are only looked for between minPressure and maxPressure.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, levPressures, minPressure=75., maxPressure=550.):
+
+      levPressures = numpy.asarray(levPressures, numpy.float64)
+      if levPressures.ndim == 1:
+         levPressures = levPressures[:, numpy.newaxis, numpy.newaxis]
+
+      self.numLevels = levPressures.shape[0]
+      self.bottomUp = bool(levPressures[0].mean() > levPressures[-1].mean())
+      self.minPressure = minPressure
+      self.maxPressure = maxPressure
+
+      # the search below always runs from the surface up
+      self.levPressures = self.returnBottomUp (levPressures)
+
+
+   def returnBottomUp (self, field):
+
+      if self.bottomUp: return field
+
+      return field[::-1]
+
+
+   #---------------------------------------------------------------------------
+   # (levelIndex, pressure) of the first level (counted from the surface) of
+   # each column where found is True. levelIndex is in the fields' level
+   # order and is -1 where nothing was found; pressure (hPa) is masked there.
+   #---------------------------------------------------------------------------
+
+   def returnFirstLevel (self, found):
+
+      anyFound = found.any(axis=0)
+      levelIndex = found.argmax(axis=0)
+
+      levPressures = numpy.broadcast_to(self.levPressures, \
+                                           (self.numLevels,) + levelIndex.shape)
+      latIndex, longIndex = numpy.ogrid[0:levelIndex.shape[0], 0:levelIndex.shape[1]]
+      pressure = numpy.ma.masked_where(~anyFound, \
+                                          levPressures[levelIndex, latIndex, longIndex])
+
+      if not self.bottomUp:
+         levelIndex = self.numLevels - 1 - levelIndex
+
+      return numpy.where(anyFound, levelIndex, -1), pressure
+
+
+   #---------------------------------------------------------------------------
+   # WMO lapse-rate tropopause: the lowest level at which the lapse rate
+   # drops to lapseRate (K/km) or less, provided the average lapse rate from
+   # that level to every level within depth (km) above it also stays at or
+   # below lapseRate. temperature (K) is (lev, lat, lon). Heights come from
+   # the hypsometric equation. The whole grid is done at once; the only loop
+   # is over the few level offsets that fit within depth.
+   #---------------------------------------------------------------------------
+
+   def returnLapseRateTropopause (self, temperature, lapseRate=2.0, depth=2.0):
+
+      temperature = self.returnBottomUp (numpy.ma.filled(temperature, numpy.nan))
+      temperature = numpy.asarray(temperature, numpy.float64)
+      logPressures = numpy.log(self.levPressures)
+
+      # heights (km) above the lowest level
+      layerHeights = RD / GRAVITY / 1000. * (temperature[1:] + temperature[:-1]) / 2. * \
+          (logPressures[:-1] - logPressures[1:])
+      heights = numpy.zeros(temperature.shape, numpy.float64)
+      heights[1:] = numpy.cumsum(layerHeights, axis=0)
+
+      # lapse rate (K/km) of the layer above each level
+      layerLapse = (temperature[:-1] - temperature[1:]) / layerHeights
+
+      levPressures = self.levPressures[:-1]
+      found = (layerLapse <= lapseRate) & \
+          (levPressures >= self.minPressure) & (levPressures <= self.maxPressure)
+
+      # the average lapse rate to each higher level within depth
+      for offset in range(2, self.numLevels):
+         thickness = heights[offset:] - heights[:-offset]
+         within = thickness <= depth
+         if not within.any(): break
+
+         averageLapse = (temperature[:-offset] - temperature[offset:]) / thickness
+         found[:self.numLevels - offset] &= ~(within & (averageLapse > lapseRate))
+
+      # no NaN temperatures in a layer that was used
+      found &= ~numpy.isnan(layerLapse)
+
+      found = numpy.concatenate([found, numpy.zeros((1,) + found.shape[1:], bool)])
+
+      return self.returnFirstLevel (found)
+
+
+   #---------------------------------------------------------------------------
+   # Dynamical tropopause: the bottom of the layer of |PV| >= threshold
+   # (PVU) that reaches down from minPressure. pv is (lev, lat, lon) in
+   # K m2 kg-1 s-1 (i.e. GEOS EPV). PV does not define a tropopause near the
+   # equator, so within tropicsLat of it, and wherever no PV tropopause is
+   # found, the lapse-rate tropopause is used when temperature is given.
+   #---------------------------------------------------------------------------
+
+   def returnPVTropopause (self, pv, lat, temperature=None, threshold=2.0, \
+                              tropicsLat=20.):
+
+      pv = self.returnBottomUp (numpy.ma.filled(pv, 0.0))
+      pvu = numpy.abs(numpy.asarray(pv, numpy.float64)) * 1.0e6
+
+      levPressures = numpy.broadcast_to(self.levPressures, pvu.shape)
+
+      # stratospheric PV from the top down: above minPressure counts as
+      # stratosphere, below maxPressure never does
+      stratospheric = ((pvu >= threshold) | (levPressures < self.minPressure)) & \
+          (levPressures <= self.maxPressure)
+      numTopLevels = numpy.cumprod(stratospheric[::-1], axis=0).sum(axis=0)
+
+      # the lowest level of that layer, unless the layer stays above minPressure
+      found = numpy.zeros(pvu.shape, bool)
+      lowest = self.numLevels - numTopLevels
+      latIndex, longIndex = numpy.ogrid[0:pvu.shape[1], 0:pvu.shape[2]]
+      found[numpy.minimum(lowest, self.numLevels - 1), latIndex, longIndex] = \
+          (numTopLevels > 0) & \
+          (levPressures[numpy.minimum(lowest, self.numLevels - 1), \
+                           latIndex, longIndex] >= self.minPressure)
+
+      levelIndex, pressure = self.returnFirstLevel (found)
+
+      if temperature is not None:
+         useLapse = numpy.ma.getmaskarray(pressure) | \
+             (numpy.abs(numpy.asarray(lat))[:, numpy.newaxis] < tropicsLat)
+         lapseIndex, lapsePressure = self.returnLapseRateTropopause (temperature)
+         levelIndex = numpy.where(useLapse, lapseIndex, levelIndex)
+         pressure = numpy.ma.where(useLapse, lapsePressure, pressure)
+
+      return levelIndex, pressure
+
+
+
+#---------------------------------------------------------------------------
+# Level pressures (hPa) of a model file in its level order: hybrid mid
+# pressures from PS when the file has PS and ak/bk (or a standard table
+# for its level count), otherwise the lev coordinate (pressure level
+# files, i.e. the GEOS *_Np collections, which carry PS too). Hybrid
+# pressures are top-down unless bottomUp. A lev coordinate that only
+# numbers the levels (GEOS hybrid files without PS) raises ValueError.
+#---------------------------------------------------------------------------
+
+def returnModelLevelPressures (modelObject, timeRecord, bottomUp=False):
+
+   levels = numpy.asarray(modelObject.lev[:], numpy.float64)
+
+   if modelObject.returnVariableName ("PS") != None:
+      try:
+         pressureObject = createPressureObject (modelObject)
+      except ValueError:
+         pressureObject = None
+
+      if pressureObject != None:
+         ps = modelObject.returnField ("PS", timeRecord)
+         levPressures = pressureObject.returnMidPressures (ps) / 100.
+
+         if bottomUp: return levPressures[::-1]
+
+         return levPressures
+
+   levelNumbers = numpy.arange(len(levels))
+   if numpy.array_equal(levels, levelNumbers) or numpy.array_equal(levels, levelNumbers + 1):
+      raise ValueError("The levels of " + modelObject.fileName + " are model level " + \
+                          "numbers and there is no PS to find their pressures")
+
+   return levels
+
+
+#---------------------------------------------------------------------------
+# One time record of a 3D variable of a model file, read straight from the
+# file in the current longitude order (GMI returnField only reads the
+# species arrays, so met fields such as T are read here).
+#---------------------------------------------------------------------------
+
+def returnRecordField (modelObject, fieldName, timeRecord):
+
+   variableName = modelObject.returnVariableName (fieldName)
+   if variableName == None:
+      raise KeyError("Field " + fieldName + " is not in " + modelObject.fileName)
+
+   variable = modelObject.hdfData.variables[variableName]
+   if len(variable.shape) == 3:
+      return modelObject.readVariable (variable, (slice(None), slice(None)))
+
+   return modelObject.readVariable (variable, (min(timeRecord, variable.shape[0] - 1), \
+                                                  slice(None), slice(None)))
+
+
+#---------------------------------------------------------------------------
+# Tropopause (levelIndex, pressure) of one time record of a model file.
+# method is "lapse" (temperature) or "pv" (PV, with the lapse-rate
+# tropopause in the tropics). Results are cached per file, time record,
+# longitude order and method. Pressures missing from the result (no
+# tropopause found) are set to missingPressure hPa.
+#---------------------------------------------------------------------------
+
+def returnModelTropopause (modelObject, timeRecord, method="lapse", \
+                              temperatureName="T", pvName="EPV", \
+                              bottomUp=False, missingPressure=100.):
+
+   if method not in ["lapse", "pv"]:
+      raise ValueError("Tropopause method must be lapse or pv, not: " + str(method))
+
+   cacheKey = returnFileKey (modelObject.fileName, \
+                                ["tropopause", method, timeRecord, \
+                                    modelObject.longStart, temperatureName, \
+                                    pvName, bottomUp])
+   cacheFile = os.path.join(returnCacheDir("tropopause"), cacheKey + ".pkl")
+
+   tropopause = readCacheObject (cacheFile)
+
+   if tropopause == None:
+      print ("Finding the " + method + " tropopause of: " + modelObject.fileName)
+
+      tropopauseObject = TropopauseTools \
+          (returnModelLevelPressures (modelObject, timeRecord, bottomUp))
+      temperature = returnRecordField (modelObject, temperatureName, timeRecord)
+
+      if method == "pv":
+         levelIndex, pressure = tropopauseObject.returnPVTropopause \
+             (returnRecordField (modelObject, pvName, timeRecord), modelObject.lat[:], \
+                 temperature)
+      else:
+         levelIndex, pressure = tropopauseObject.returnLapseRateTropopause (temperature)
+
+      tropopause = {'levelIndex':levelIndex, \
+                       'pressure':pressure.filled(numpy.nan), \
+                       'found':~numpy.ma.getmaskarray(pressure)}
+      writeCacheObject (cacheFile, tropopause)
+
+   return tropopause['levelIndex'], \
+       numpy.where(tropopause['found'], tropopause['pressure'], missingPressure)
+
+
+#---------------------------------------------------------------------------
+# (lat, lon) trop/strat split index of the columns of a model file at its
+# own tropopause, for ColumnTools.returnColumns (columnObject gives the
+# level order of the fields). Files without temperatureName are split at
+# defaultPressure (hPa) everywhere, as with a fixed level. Raises
+# ValueError when the level pressures are unknown (returnModelLevelPressures).
+#---------------------------------------------------------------------------
+
+def returnTropopauseSplit (modelObject, timeRecord, columnObject, \
+                              temperatureName="T", defaultPressure=100.):
+
+   levPressures = returnModelLevelPressures (modelObject, timeRecord, \
+                                                bottomUp=columnObject.bottomUp)
+
+   if modelObject.returnVariableName (temperatureName) == None:
+      print ("WARNING: no " + temperatureName + " in " + modelObject.fileName + \
+                ". Splitting columns at " + str(defaultPressure) + " hPa")
+      return columnObject.returnSplitAtPressure (levPressures, defaultPressure)
+
+   tropPressure = returnModelTropopause (modelObject, timeRecord, \
+                                            temperatureName=temperatureName, \
+                                            missingPressure=defaultPressure)[1]
+
+   return columnObject.returnSplitAtPressure (levPressures, tropPressure)
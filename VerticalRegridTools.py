@@ -0,0 +1,224 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class maps whole (lev, lat, lon) fields from one vertical grid onto
+# another (i.e. 72 hybrid levels onto 60, or onto 42 pressure levels), so
+# models on different level sets can be differenced everywhere. Grids are
+# hybrid (a PressureTools object and a PS field) or fixed pressure levels.
+# Two methods:
+#    logp         - linear in log-pressure between the two source levels
+#                   around each target level (constant beyond the ends)
+#    conservative - mass-weighted average of the source layers each target
+#                   layer overlaps, which conserves the column burden
+# Every column is done at once: one batched search over all columns
+# finds the source level of each target pressure.
+#------------------------------------------------------------------------------
+
+import numpy
+
+from PressureTools import PressureTools, createPressureObject
+
+
+
+VERTICAL_METHODS = ['logp', 'conservative']
+
+
+
+#---------------------------------------------------------------------------
+# For sorted columns (n, numColumns), increasing down each column, and
+# values (m, numColumns): the number of column entries <= each value, as
+# one searchsorted over all columns laid end to end.
+#---------------------------------------------------------------------------
+
+def returnColumnSearch (columns, values):
+
+   numLevels, numColumns = columns.shape
+
+   low = min(columns.min(), values.min())
+   span = max(columns.max(), values.max()) - low + 1.0
+   offsets = numpy.arange(numColumns) * span
+
+   flatColumns = ((columns - low) + offsets).T.ravel()
+   flatValues = ((values - low) + offsets).T.ravel()
+
+   counts = numpy.searchsorted(flatColumns, flatValues, side='right')
+   counts = counts.reshape(numColumns, values.shape[0]).T
+
+   return counts - numpy.arange(numColumns) * numLevels
+
+
+
+#---------------------------------------------------------------------------
+# Vertical grid of a model file: a PressureTools object for hybrid files
+# (the file has PS, and ak/bk or a standard table for its level count),
+# otherwise the lev coordinate as pressure levels (hPa).
+#---------------------------------------------------------------------------
+
+def returnVerticalGrid (modelObject):
+
+   if modelObject.returnVariableName ("PS") != None:
+      try:
+         return createPressureObject (modelObject)
+      except ValueError:
+         pass
+
+   return numpy.asarray(modelObject.lev[:], numpy.float64)
+
+
+
+class VerticalRegridTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. gridIn and gridOut are each a PressureTools object
+   # or a list of pressure levels (hPa) in the order the fields use (see
+   # returnVerticalGrid). The conservative method needs layer edges, so
+   # both grids must be hybrid.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, gridIn, gridOut, method="logp"):
+
+      if method not in VERTICAL_METHODS:
+         raise ValueError("Vertical regrid method not supported: " + str(method))
+
+      if method == "conservative" and \
+             not (isinstance(gridIn, PressureTools) and isinstance(gridOut, PressureTools)):
+         raise ValueError("The conservative method needs two hybrid grids")
+
+      self.gridIn = gridIn
+      self.gridOut = gridOut
+      self.method = method
+
+
+   #---------------------------------------------------------------------------
+   # Pressures (Pa) of a grid, (levels, numColumns), top-down, and whether
+   # fields on it are stored bottom-up. Hybrid grids follow bottomUp;
+   # pressure level grids follow their own order.
+   #---------------------------------------------------------------------------
+
+   def returnGridPressures (self, grid, ps, bottomUp, numColumns, edges=False):
+
+      if isinstance(grid, PressureTools):
+         if ps is None:
+            raise ValueError("PS is needed for a hybrid grid")
+         if edges:
+            pressures = grid.returnEdgePressures (ps)
+         else:
+            pressures = grid.returnMidPressures (ps)
+         return pressures.reshape(pressures.shape[0], -1), bottomUp
+
+      pressures = numpy.asarray(grid, numpy.float64) * 100.
+      bottomUp = bool(pressures[0] > pressures[-1])
+      if bottomUp: pressures = pressures[::-1]
+
+      return numpy.repeat(pressures[:, numpy.newaxis], numColumns, axis=1), bottomUp
+
+
+   #---------------------------------------------------------------------------
+   # Returns field (lev,) + horizontal shape on the output grid. psIn and
+   # psOut (Pa) are the surface pressures of the hybrid grids, on the
+   # field's horizontal grid; psOut defaults to psIn. bottomUpIn/Out give
+   # the level order of fields on hybrid grids. Masked or NaN values are
+   # masked in every output level that uses them.
+   #---------------------------------------------------------------------------
+
+   def regrid (self, field, psIn=None, psOut=None, bottomUpIn=False, bottomUpOut=False):
+
+      if psOut is None: psOut = psIn
+
+      field = numpy.ma.filled(numpy.ma.asarray(field, numpy.float64), numpy.nan)
+      horizontalShape = field.shape[1:]
+      numColumns = int(numpy.prod(horizontalShape))
+      field = field.reshape(field.shape[0], numColumns)
+
+      isEdges = self.method == "conservative"
+      pressuresIn, flipIn = self.returnGridPressures (self.gridIn, psIn, bottomUpIn, \
+                                                         numColumns, isEdges)
+      pressuresOut, flipOut = self.returnGridPressures (self.gridOut, psOut, bottomUpOut, \
+                                                           numColumns, isEdges)
+
+      numLevelsIn = pressuresIn.shape[0] - int(isEdges)
+      if field.shape[0] != numLevelsIn:
+         raise ValueError("Field has " + str(field.shape[0]) + " levels, the input grid has " + \
+                             str(numLevelsIn))
+
+      if flipIn: field = field[::-1]
+
+      if self.method == "conservative":
+         result = self.remapConservative (field, pressuresIn, pressuresOut)
+      else:
+         result = self.interpolateLogPressure (field, pressuresIn, pressuresOut)
+
+      if flipOut: result = result[::-1]
+
+      return numpy.ma.masked_invalid(result.reshape((result.shape[0],) + horizontalShape))
+
+
+   #---------------------------------------------------------------------------
+   # Linear interpolation in log-pressure; top-down (levels, numColumns).
+   #---------------------------------------------------------------------------
+
+   def interpolateLogPressure (self, field, pressuresIn, pressuresOut):
+
+      logIn = numpy.log(pressuresIn)
+      logOut = numpy.log(pressuresOut)
+      columnIndex = numpy.arange(field.shape[1])[numpy.newaxis, :]
+
+      if logIn.shape[0] == 1:
+         return numpy.repeat(field, logOut.shape[0], axis=0)
+
+      upper = numpy.clip(returnColumnSearch (logIn, logOut), 1, logIn.shape[0] - 1)
+      lower = upper - 1
+
+      logLower = logIn[lower, columnIndex]
+      weight = numpy.clip((logOut - logLower) / (logIn[upper, columnIndex] - logLower), \
+                             0.0, 1.0)
+
+      return field[lower, columnIndex] * (1.0 - weight) + \
+          field[upper, columnIndex] * weight
+
+
+   #---------------------------------------------------------------------------
+   # Mass-conserving remap; edges top-down (levels + 1, numColumns). The
+   # cumulative burden from the top is piecewise linear in pressure, so it
+   # is evaluated exactly at every target edge and differenced. Target
+   # layers beyond the source column take the nearest source layer.
+   #---------------------------------------------------------------------------
+
+   def remapConservative (self, field, edgesIn, edgesOut):
+
+      numLevelsIn = field.shape[0]
+      columnIndex = numpy.arange(field.shape[1])[numpy.newaxis, :]
+
+      valid = numpy.isfinite(field)
+      values = numpy.where(valid, field, 0.0)
+      invalid = numpy.where(valid, 0.0, 1.0)
+      thickness = numpy.diff(edgesIn, axis=0)
+
+      # burden and masked thickness above each source edge
+      burdenIn = numpy.zeros(edgesIn.shape, numpy.float64)
+      burdenIn[1:] = numpy.cumsum(values * thickness, axis=0)
+      invalidIn = numpy.zeros(edgesIn.shape, numpy.float64)
+      invalidIn[1:] = numpy.cumsum(invalid * thickness, axis=0)
+
+      # source layer holding each target edge
+      layer = numpy.clip(returnColumnSearch (edgesIn, edgesOut) - 1, 0, numLevelsIn - 1)
+      offset = edgesOut - edgesIn[layer, columnIndex]
+
+      burdenOut = burdenIn[layer, columnIndex] + values[layer, columnIndex] * offset
+      invalidOut = invalidIn[layer, columnIndex] + invalid[layer, columnIndex] * offset
+
+      result = numpy.diff(burdenOut, axis=0) / numpy.diff(edgesOut, axis=0)
+      result[numpy.diff(invalidOut, axis=0) > 0.0] = numpy.nan
+
+      return result
@@ -52,9 +52,9 @@ NUM_ARGS = 7
 def usage ():
     print ""
     print "usage: ZonalMean.py [-c] [-g] [-r] [-d] [-f] [-v] [-m]"
-    print "-c File1 (GEOS)"
-    print "-g File2 (GEOS)"
-    print "-r time record to plot"
+    print "-c File1 (GEOS) or comma separated list of (daily) files"
+    print "-g File2 (GEOS) or comma separated list of (daily) files"
+    print "-r time record to plot (all: mean over every record)"
     print "-d date of comparision (YYYYMMDD)"
     print "-f field to compare"
     print "-v which variable to extract field from"
@@ -62,6 +62,25 @@ def usage ():
     print ""
     sys.exit (0)
 
+#---------------------------------------------------------------
+# Zonal statistics of field over timeRecords (None: all) of the
+# first file (modelObject) and then each further file in fileNames
+#---------------------------------------------------------------
+def returnZonalStatistics (modelObject, fileNames, field, timeRecords, readArgs):
+
+    zonalStats = modelObject.returnZonalStatistics (field, timeRecords, readArgs)
+
+    for fileName in fileNames[1:]:
+        print "Adding to zonal mean: ", fileName
+        nextObject = GeosCtmPlotTools (fileName, 'lat','lon',\
+                                           'lev','time', 'lat', \
+                                           'lon', 'lev', 'time' )
+        zonalStats = nextObject.returnZonalStatistics (field, timeRecords, readArgs, \
+                                                           zonalStats)
+        del nextObject
+
+    return zonalStats
+
 def find_nearest(array, value):
     idx = (numpy.abs(array-value)).argmin()
     return array[idx]
@@ -169,9 +188,11 @@ if len (optList) != NUM_ARGS:
    usage ()
    sys.exit (0)
 
-geosCtmFile = optList[0][1]
-file2 = optList[1][1]
-timeRecord = int(optList[2][1])
+geosCtmFiles = optList[0][1].split(",")
+file2Files = optList[1][1].split(",")
+geosCtmFile = geosCtmFiles[0]
+file2 = file2Files[0]
+timeRecordArg = optList[2][1]
 dateYearMonth = optList[3][1]
 fieldToCompare = optList[4][1]
 variableExtractField = optList[5][1]
@@ -182,20 +203,23 @@ print ""
 print "Checking command line options... "
 print""
 #---------------------------------------------------------------
-if not os.path.exists (geosCtmFile):
-    print "The GEOS file you provided does not exist: ", geosCtmFile
-    sys.exit(0)
+for fileName in geosCtmFiles + file2Files:
+    if not os.path.exists (fileName):
+        print "The GEOS file you provided does not exist: ", fileName
+        sys.exit(0)
 
-if not os.path.exists (file2):
-    print "The GEOS file provided does not exist: ", file2
-    sys.exit(0)
+# None: every time record of every file
+timeRecords = None
+if timeRecordArg != "all":
+    timeRecord = int(timeRecordArg)
+    timeRecords = [timeRecord]
 
-if int(timeRecord) > 30: 
-    print "WARNING: time record is more than a typical daily file!"
+    if int(timeRecord) > 30: 
+        print "WARNING: time record is more than a typical daily file!"
 
-if int(timeRecord) < 0: 
-    print "ERROR: time record needs to be positive!"
-    sys.exit(0)
+    if int(timeRecord) < 0: 
+        print "ERROR: time record needs to be positive!"
+        sys.exit(0)
 
 if len(dateYearMonth) != 8:
     print "ERROR date must be in the format YYYYMMDD. Received: ", dateYearMonth
@@ -288,29 +312,6 @@ if foundField == False:
 
 
 
-# Arrays (one time record, one species or field)
-
-# file2 has the potential to have a different lognitude system and length 
-# This is because GMI is on a 0-360 system
-longRecords = numpy.zeros(file2Object.longSize, numpy.float32)
-
-remappedFile2Array = numpy.zeros((file2Object.levelSize, \
-                                    file2Object.latSize, \
-                                    file2Object.longSize), numpy.float32)
-
-newFile2Array = numpy.zeros((file2Object.levelSize, \
-                               file2Object.latSize, \
-                               geosCtmObject.longSize), numpy.float32)
-
-file2ZonalArray = numpy.zeros ((file2Object.levelSize, \
-                                  file2Object.latSize), numpy.float32)
-
-geosCtmZonalArray = numpy.zeros ((geosCtmObject.levelSize, \
-                                      geosCtmObject.latSize), numpy.float32)
-
-
-
-
 print ""
 print "Processing: ", fieldToCompare
 print ""
@@ -318,23 +319,24 @@ print ""
 
 field = fieldToCompare
 
+geosCtmReadArgs = []
 if variableExtractField == 'scav': 
-    geosCtmFieldArray = geosCtmObject.returnField (field, timeRecord, "SCAV_")
-else:
-    geosCtmFieldArray = geosCtmObject.returnField (field, timeRecord)
+    geosCtmReadArgs = ["SCAV_"]
 
-file2FieldArray = file2Object.returnField (field, timeRecord, variableExtractField)
+# One record at a time is read; the statistics run over every file given
+geosCtmStats = returnZonalStatistics (geosCtmObject, geosCtmFiles, field, \
+                                          timeRecords, geosCtmReadArgs)
+file2Stats = returnZonalStatistics (file2Object, file2Files, field, \
+                                        timeRecords, [variableExtractField])
 
 print ""
-print "shapes of arrays: ", geosCtmFieldArray.shape, file2FieldArray.shape
+print "Records in zonal means: ", geosCtmStats.numRecords, file2Stats.numRecords
 print ""
 
-print "file 2: array max/min: ", file2FieldArray.max(), file2FieldArray.min()
+print "file 2: array max/min: ", file2Stats.returnMax().max(), file2Stats.returnMin().min()
 print""
 
 
-lenFile2Long = len(file2Object.long[:])
-
 print ""
 print "File2 assumed to be in GEOS format. Will not remap longitude coordinate"
 print ""
@@ -347,11 +349,9 @@ print "File1 surface:", geosCtmSurface
 print ""
 
 
-zmFile2 = numpy.mean(file2FieldArray[:, :, :], \
-                                 axis=2)
+zmFile2 = file2Stats.returnMean()
 
-zmGeosCtm = numpy.mean (geosCtmFieldArray[:, :, :], \
-                            axis=2)
+zmGeosCtm = geosCtmStats.returnMean()
 
 print "zm file 2: array max/min: ", zmFile2.max(), zmFile2.min()
 print""
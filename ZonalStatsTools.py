@@ -0,0 +1,130 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# This class accumulates zonal statistics (mean, variance, min, max) of a
+# field one record at a time, so means over many time records or daily
+# files never hold more than one record in memory. Each record's zonal
+# statistics are merged into the running ones with the weighted
+# Welford/Chan update. Masked and NaN values get zero weight.
+#------------------------------------------------------------------------------
+
+import numpy
+
+
+
+class ZonalStatsTools:
+
+
+   #---------------------------------------------------------------------------
+   # AUTHORS: Megan Damon NASA GSFC
+   #
+   # DESCRIPTION:
+   # Constructor routine. weights (optional) broadcast against a (lat, lon)
+   # record, i.e. cell areas or a land mask; by default every longitude
+   # counts the same.
+   #---------------------------------------------------------------------------
+
+   def __init__(self, weights=None):
+
+      self.weights = weights
+      if weights is not None:
+         self.weights = numpy.asarray(weights, numpy.float64)
+
+      self.numRecords = 0
+      self.sumWeights = None
+      self.mean = None
+      self.sumSquares = None
+      self.minimum = None
+      self.maximum = None
+
+
+   #---------------------------------------------------------------------------
+   # Adds one record with dimensions (..., lat, lon), i.e. (lev, lat, lon).
+   # Statistics are kept per (..., lat).
+   #---------------------------------------------------------------------------
+
+   def addRecord (self, field):
+
+      field = numpy.ma.masked_invalid(numpy.ma.asarray(field, numpy.float64))
+      values = field.filled(0.0)
+
+      weights = numpy.ones(field.shape, numpy.float64)
+      if self.weights is not None:
+         weights = weights * self.weights
+      weights[numpy.ma.getmaskarray(field)] = 0.0
+
+      if self.mean is not None and self.mean.shape != field.shape[:-1]:
+         raise ValueError("Record shape " + str(field.shape) + \
+                             " does not match the accumulated statistics")
+
+      # statistics of this record along longitude
+      recordWeights = weights.sum(axis=-1)
+      safeWeights = numpy.where(recordWeights > 0.0, recordWeights, 1.0)
+      recordMean = (weights * values).sum(axis=-1) / safeWeights
+      recordSquares = (weights * (values - recordMean[..., numpy.newaxis])**2).sum(axis=-1)
+
+      recordMin = numpy.where(weights > 0.0, values, numpy.inf).min(axis=-1)
+      recordMax = numpy.where(weights > 0.0, values, -numpy.inf).max(axis=-1)
+
+      if self.mean is None:
+         self.sumWeights = recordWeights
+         self.mean = recordMean
+         self.sumSquares = recordSquares
+         self.minimum = recordMin
+         self.maximum = recordMax
+      else:
+         totalWeights = self.sumWeights + recordWeights
+         safeTotal = numpy.where(totalWeights > 0.0, totalWeights, 1.0)
+         delta = recordMean - self.mean
+
+         self.mean = self.mean + delta * recordWeights / safeTotal
+         self.sumSquares = self.sumSquares + recordSquares + \
+             delta**2 * self.sumWeights * recordWeights / safeTotal
+         self.sumWeights = totalWeights
+         self.minimum = numpy.minimum(self.minimum, recordMin)
+         self.maximum = numpy.maximum(self.maximum, recordMax)
+
+      self.numRecords = self.numRecords + 1
+
+
+   def returnMissingMask (self):
+
+      if self.sumWeights is None:
+         raise ValueError("No records have been added")
+
+      return self.sumWeights <= 0.0
+
+
+   def returnMean (self):
+
+      return numpy.ma.masked_where(self.returnMissingMask(), self.mean)
+
+
+   def returnVariance (self):
+
+      safeWeights = numpy.where(self.sumWeights > 0.0, self.sumWeights, 1.0)
+
+      return numpy.ma.masked_where(self.returnMissingMask(), \
+                                      self.sumSquares / safeWeights)
+
+
+   def returnStdDev (self):
+
+      return numpy.ma.sqrt(self.returnVariance())
+
+
+   def returnMin (self):
+
+      return numpy.ma.masked_where(self.returnMissingMask(), self.minimum)
+
+
+   def returnMax (self):
+
+      return numpy.ma.masked_where(self.returnMissingMask(), self.maximum)
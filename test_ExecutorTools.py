@@ -0,0 +1,64 @@
+#!/usr/bin/python
+
+#------------------------------------------------------------------------------
+# NASA/GSFC
+#------------------------------------------------------------------------------
+# AUTHORS:      Megan Damon
+# AFFILIATION:  NASA GSFC / SSAI
+# DATE:         October 18 2026
+#
+# DESCRIPTION:
+# Tests of ExecutorTools. The ssh executor runs its commands locally, so
+# slots that repeat a node name can be checked without any nodes.
+#------------------------------------------------------------------------------
+
+import unittest
+
+from ExecutorTools import SshExecutor, createTask
+
+
+
+class LocalSshExecutor (SshExecutor):
+
+   def returnCommand (self, command, node):
+
+      return command
+
+
+
+class ExecutorToolsTest (unittest.TestCase):
+
+
+   #---------------------------------------------------------------------------
+   # More tasks than slots, two workers per node: every task gets a result.
+   #---------------------------------------------------------------------------
+
+   def test_repeatedNodeSlots (self):
+
+      executor = LocalSshExecutor (["node1", "node2"], 2, pollInterval=0.05)
+
+      tasks = [createTask ("t" + str(count), "sleep 0.2") for count in range(0, 6)]
+      results = executor.runTasks (tasks)
+
+      self.assertEqual (len(results), len(tasks))
+      for task, result in zip(tasks, results):
+         self.assertNotEqual (result, None)
+         self.assertEqual (result['name'], task['name'])
+         self.assertEqual (result['returnCode'], 0)
+
+
+   def test_failedTaskIsRetried (self):
+
+      executor = LocalSshExecutor (["node1"], 2, numRetries=1, pollInterval=0.05)
+
+      results = executor.runTasks ([createTask ("fail", "exit 3"), \
+                                       createTask ("pass", "true")])
+
+      self.assertEqual (results[0]['returnCode'], 3)
+      self.assertEqual (results[0]['attempts'], 2)
+      self.assertEqual (results[1]['returnCode'], 0)
+
+
+
+if __name__ == '__main__':
+   unittest.main()